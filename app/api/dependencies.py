@@ -0,0 +1,19 @@
+from fastapi import Depends
+from starlette.requests import HTTPConnection
+
+from app.core.config import Settings, get_settings
+from app.core.database import DBSession, get_db
+from app.repositories.coil import AsyncCoilRepository
+
+
+def get_app_settings(connection: HTTPConnection) -> Settings:
+    """Настройки, с которыми приложение собрано в create_app."""
+    settings = getattr(connection.app.state, "settings", None)
+    return settings if settings is not None else get_settings()
+
+
+def get_coil_repository(
+    db: DBSession = Depends(get_db),
+    settings: Settings = Depends(get_app_settings),
+) -> AsyncCoilRepository:
+    return AsyncCoilRepository(db, settings)
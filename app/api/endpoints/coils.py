@@ -1,19 +1,66 @@
-from datetime import datetime, timezone
-from typing import List, Optional, Dict
+import csv
+import io
+import json
+from contextlib import aclosing
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 
-from app.core.database import get_db
-from app.repositories.coil import CoilRepository
+from app.api.dependencies import get_app_settings, get_coil_repository
+from app.api.responses import FastJSONResponse, dump_json
+from app.core.config import Settings
+from app.core.events import Event, get_broadcaster
+from app.domain.models import Coil
+from app.export import EXPORT_FORMATS, export_available, stream_export
+from app.feed import follow
+from app.repositories.coil import (
+    AsyncCoilRepository,
+    CoilAlreadyRemovedError,
+    CoilArchivedError,
+    VersionConflictError,
+)
+from app.repositories.idempotency import IdempotencyKeyReusedError
+from app.repositories.sql import SERIES_BUCKETS, to_utc_naive
 from app.schemas.coil import (
+    CoilBulkCreated,
+    CoilBulkError,
+    CoilBulkRemoveRequest,
+    CoilBulkRemoveResponse,
+    CoilBulkResponse,
     CoilCreate,
     CoilDeleteResponse,
     CoilFilter,
+    CoilListResponse,
     CoilResponse,
     CoilResponseWrapper,
     CoilUpdate,
     DateRange,
+    InventoryRequest,
+    StatisticsSeriesRequest,
 )
 
 router = APIRouter()
@@ -27,24 +74,363 @@ def healthcheck() -> Dict[str, str]:
 @router.post(
     "/coils/", response_model=CoilResponse, status_code=status.HTTP_201_CREATED
 )
-def create_coil(
-    coil: CoilCreate, db: Session = Depends(get_db)
+async def create_coil(
+    coil: CoilCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
 ) -> CoilResponse:
-    repo = CoilRepository(db)
-    db_coil = repo.create(length=coil.length, weight=coil.weight)
+    """Создание рулона; с Idempotency-Key повтор запроса не создает дубль."""
+    if idempotency_key is None:
+        db_coil = await repo.create(length=coil.length, weight=coil.weight)
+        return CoilResponse.model_validate(db_coil)
+
+    try:
+        db_coil, replayed = await repo.create_idempotent(
+            coil.length, coil.weight, idempotency_key
+        )
+    except IdempotencyKeyReusedError:
+        raise HTTPException(
+            status_code=422,
+            detail="Ключ идемпотентности уже использован с другим телом",
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
     return CoilResponse.model_validate(db_coil)
 
 
+async def _bulk_create(
+    rows: List[Any], repo: AsyncCoilRepository, settings: Settings
+) -> CoilBulkResponse:
+    if len(rows) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Не более {settings.BULK_MAX_ITEMS} рулонов за запрос",
+        )
+
+    # Ошибки валидации не прерывают загрузку остальных рулонов
+    indexes: List[int] = []
+    coils: List[CoilCreate] = []
+    errors: List[CoilBulkError] = []
+    for index, row in enumerate(rows):
+        if isinstance(row, ValueError):
+            errors.append(CoilBulkError(index=index, detail=str(row)))
+            continue
+        try:
+            coils.append(CoilCreate.model_validate(row))
+            indexes.append(index)
+        except ValidationError as exc:
+            detail = exc.errors(include_url=False, include_context=False)
+            errors.append(CoilBulkError(index=index, detail=detail))
+
+    ids = await repo.create_many(coils, batch_size=settings.BULK_BATCH_SIZE)
+
+    created = [
+        CoilBulkCreated(index=index, id=coil_id)
+        for index, coil_id in zip(indexes, ids)
+    ]
+    return CoilBulkResponse(Created=created, Errors=errors)
+
+
+def _parse_ndjson(text: str) -> List[Any]:
+    rows: List[Any] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            rows.append(ValueError(f"Некорректный JSON: {exc}"))
+    return rows
+
+
+def _parse_csv(text: str) -> List[Any]:
+    try:
+        dialect = csv.Sniffer().sniff(text[:1024], delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+    rows: List[Any] = []
+    for row in csv.DictReader(io.StringIO(text), dialect=dialect):
+        # Значения сверх заголовка DictReader складывает под ключ None
+        if None in row:
+            rows.append(ValueError("Полей больше, чем в заголовке CSV"))
+        else:
+            rows.append(row)
+    return rows
+
+
+@router.post(
+    "/coils/bulk",
+    response_model=CoilBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_coils_bulk(
+    coils: List[Dict[str, Any]] = Body(...),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> CoilBulkResponse:
+    return await _bulk_create(list(coils), repo, settings)
+
+
+@router.post(
+    "/coils/bulk/import",
+    response_model=CoilBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_coils_bulk(
+    request: Request,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> CoilBulkResponse:
+    content_type = request.headers.get("content-type", "").split(";")[0]
+    if content_type not in ("application/x-ndjson", "text/csv"):
+        raise HTTPException(
+            status_code=415,
+            detail="Поддерживаются форматы application/x-ndjson и text/csv",
+        )
+    try:
+        text = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Файл должен быть в кодировке UTF-8: {exc}",
+        )
+    parse = _parse_csv if content_type == "text/csv" else _parse_ndjson
+    return await _bulk_create(parse(text), repo, settings)
+
+
+@router.post("/coils/bulk/remove", response_model=CoilBulkRemoveResponse)
+async def remove_coils_bulk(
+    request: CoilBulkRemoveRequest,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> CoilBulkRemoveResponse:
+    """Списание рулонов по списку id или по фильтру одним запросом."""
+    if (request.ids is None) == (request.filter is None):
+        raise HTTPException(
+            status_code=400, detail="Укажите либо ids, либо filter"
+        )
+    if request.ids is not None and len(request.ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Не более {settings.BULK_MAX_ITEMS} рулонов за запрос",
+        )
+    # in_stock и order не сужают выборку
+    if request.filter is not None and not request.filter.selective:
+        raise HTTPException(
+            status_code=400,
+            detail="Пустой фильтр списал бы весь склад",
+        )
+
+    report = await repo.remove_many(
+        ids=request.ids, filters=request.filter
+    )
+    return CoilBulkRemoveResponse(
+        Removed=report["removed"],
+        AlreadyRemoved=report["already_removed"],
+        Missing=report["missing"],
+    )
+
+
+def _bounds(low: Any, high: Any) -> Optional[Tuple[Any, Any]]:
+    # Одна граница задает полуоткрытый диапазон; 0 - тоже граница
+    if low is None and high is None:
+        return None
+    return low, high
+
+
+def coil_filter(
+    id_min: Optional[int] = None,
+    id_max: Optional[int] = None,
+    weight_min: Optional[float] = None,
+    weight_max: Optional[float] = None,
+    length_min: Optional[float] = None,
+    length_max: Optional[float] = None,
+    added_after: Optional[datetime] = None,
+    added_before: Optional[datetime] = None,
+    removed_after: Optional[datetime] = None,
+    removed_before: Optional[datetime] = None,
+    in_stock: bool = False,
+    order: Literal["asc", "desc"] = "asc",
+) -> CoilFilter:
+    """Фильтр списка рулонов из параметров запроса."""
+    return CoilFilter(
+        id_range=_bounds(id_min, id_max),
+        weight_range=_bounds(weight_min, weight_max),
+        length_range=_bounds(length_min, length_max),
+        added_at_range=_bounds(added_after, added_before),
+        removed_at_range=_bounds(removed_after, removed_before),
+        in_stock=in_stock,
+        order=order,
+    )
+
+
+# Объявлен раньше /coils/{coil_id}, иначе "export" разбирался бы как id
+@router.get("/coils/export", response_class=StreamingResponse)
+async def export_coils(
+    filters: CoilFilter = Depends(coil_filter),
+    format: str = Query("parquet", pattern="^(arrow|parquet)$"),
+    compression: Optional[str] = Query(None, pattern="^(zstd|lz4|none)$"),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> StreamingResponse:
+    """Колоночная выгрузка рулонов в Arrow IPC или Parquet.
+
+    Без compression - сжатие EXPORT_COMPRESSION.
+    """
+    if not export_available():
+        raise HTTPException(
+            status_code=501,
+            detail="Выгрузка недоступна: не установлен pyarrow",
+        )
+    batches = repo.iter_row_batches(
+        filters, batch_size=settings.EXPORT_BATCH_SIZE
+    )
+    return StreamingResponse(
+        stream_export(
+            batches, format, compression or settings.EXPORT_COMPRESSION
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="coils.{format}"'
+        },
+    )
+
+
+FEED_DISABLED = "Лента изменений отключена"
+
+
+def _feed(
+    repo: AsyncCoilRepository, settings: Settings, after_id: Optional[int]
+) -> AsyncGenerator[List[Event], None]:
+    return follow(
+        repo,
+        get_broadcaster(),
+        after_id,
+        poll_seconds=settings.CHANGE_FEED_POLL_SECONDS,
+        batch_size=settings.CHANGE_FEED_BATCH_SIZE,
+        gap_seconds=settings.CHANGE_FEED_GAP_SECONDS,
+        queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+    )
+
+
+def _sse_message(event: Event) -> bytes:
+    return (
+        f"id: {event['id']}\nevent: {event['kind']}\ndata: ".encode()
+        + dump_json(event)
+        + b"\n\n"
+    )
+
+
+async def _sse(batches: AsyncIterator[List[Event]]) -> AsyncIterator[bytes]:
+    async for events in batches:
+        if not events:
+            # Комментарий не дает прокси закрыть простаивающее соединение
+            yield b": keep-alive\n\n"
+        for event in events:
+            yield _sse_message(event)
+
+
+# Объявлен раньше /coils/{coil_id}, иначе "events" разбирался бы как id
+@router.get("/coils/events", response_class=StreamingResponse)
+async def coil_events(
+    after_id: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> StreamingResponse:
+    """Лента изменений рулонов (Server-Sent Events).
+
+    Продолжается с after_id или с Last-Event-ID, который EventSource
+    присылает при переподключении; без них - с текущего момента.
+    """
+    if not settings.CHANGE_FEED_ENABLED:
+        raise HTTPException(status_code=404, detail=FEED_DISABLED)
+    if after_id is None and last_event_id and last_event_id.isdigit():
+        after_id = int(last_event_id)
+    return StreamingResponse(
+        _sse(_feed(repo, settings, after_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/coils/events/ws")
+async def coil_events_ws(
+    websocket: WebSocket,
+    after_id: Optional[int] = Query(None, ge=0),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> None:
+    """Лента изменений рулонов по WebSocket: событие на сообщение."""
+    if not settings.CHANGE_FEED_ENABLED:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason=FEED_DISABLED
+        )
+    batches = _feed(repo, settings, after_id)
+    await websocket.accept()
+    try:
+        async with aclosing(batches):
+            async for events in batches:
+                for event in events:
+                    await websocket.send_text(dump_json(event).decode())
+    except WebSocketDisconnect:
+        pass
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _if_match(
+    if_match: Optional[str] = Header(None, alias="If-Match"),
+) -> Optional[List[int]]:
+    """Допустимые версии рулона из If-Match; None - без условия.
+
+    If-Match сравнивает теги строго (RFC 7232), поэтому слабые теги
+    W/"..." не совпадают ни с одной версией.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    # Ни один тег не может совпасть с версией: условие заведомо ложно
+    if not versions:
+        raise HTTPException(
+            status_code=412, detail="Некорректный заголовок If-Match"
+        )
+    return versions
+
+
+def _not_found(coil_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=404, detail=f"Рулон с этим id: `{coil_id}` не найден"
+    )
+
+
+def _version_conflict(error: VersionConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=412,
+        detail="Рулон изменен другим запросом, перечитайте его",
+        headers={"ETag": _etag(error.current_version)},
+    )
+
+
 @router.get("/coils/{coil_id}", response_model=CoilResponseWrapper)
-def get_coil(
-    coil_id: int, db: Session = Depends(get_db)
+async def get_coil(
+    coil_id: int,
+    response: Response,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
 ) -> CoilResponseWrapper:
-    repo = CoilRepository(db)
-    coil = repo.get_by_id(coil_id)
+    coil = await repo.get_by_id(coil_id)
     if not coil:
-        raise HTTPException(
-            status_code=404, detail=f"Рулон с этим id: `{coil_id}` не найден"
-        )
+        raise _not_found(coil_id)
+    response.headers["ETag"] = _etag(coil.version)
     return CoilResponseWrapper(Coil=CoilResponse.model_validate(coil))
 
 
@@ -53,25 +439,27 @@ def get_coil(
     response_model=CoilResponseWrapper,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def update_coil(
-    coil_id: int, coil: CoilUpdate, db: Session = Depends(get_db)
+async def update_coil(
+    coil_id: int,
+    coil: CoilUpdate,
+    response: Response,
+    if_match: Optional[List[int]] = Depends(_if_match),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
 ) -> CoilResponseWrapper:
-    repo = CoilRepository(db)
-    db_coil = repo.get_by_id(coil_id)
-    if not db_coil:
+    try:
+        db_coil = await repo.update(
+            coil_id, length=coil.length, weight=coil.weight, if_match=if_match
+        )
+    except CoilArchivedError:
         raise HTTPException(
-            status_code=404, detail=f"Рулон с этим id: `{coil_id}` не найден"
+            status_code=409, detail="Рулон перенесен в архив и не изменяется"
         )
+    except VersionConflictError as error:
+        raise _version_conflict(error)
+    if not db_coil:
+        raise _not_found(coil_id)
 
-    if coil.length is not None:
-        db_coil.length = coil.length
-    if coil.weight is not None:
-        db_coil.weight = coil.weight
-
-    db_coil.updated_at = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(db_coil)
-
+    response.headers["ETag"] = _etag(db_coil.version)
     return CoilResponseWrapper(Coil=CoilResponse.model_validate(db_coil))
 
 
@@ -80,69 +468,155 @@ def update_coil(
     response_model=CoilDeleteResponse,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def remove_coil(
-    coil_id: int, db: Session = Depends(get_db)
+async def remove_coil(
+    coil_id: int,
+    response: Response,
+    if_match: Optional[List[int]] = Depends(_if_match),
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
 ) -> CoilDeleteResponse:
-    repo = CoilRepository(db)
-    coil = repo.get_by_id(coil_id)
+    try:
+        coil = await repo.remove(coil_id, if_match=if_match)
+    except CoilAlreadyRemovedError:
+        raise HTTPException(status_code=400, detail="Рулон уже удален")
+    except VersionConflictError as error:
+        raise _version_conflict(error)
     if not coil:
+        raise _not_found(coil_id)
+    response.headers["ETag"] = _etag(coil.version)
+    return CoilDeleteResponse()
+
+
+async def _ndjson_lines(
+    batches: AsyncIterator[List[Coil]],
+) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(
+            CoilResponse.model_validate(coil).model_dump_json().encode()
+            + b"\n"
+            for coil in batch
+        )
+
+
+async def _ndjson_rows(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(dump_json(row) + b"\n" for row in batch)
+
+
+@router.get("/coils/", response_model=CoilListResponse)
+async def get_coils(
+    filters: CoilFilter = Depends(coil_filter),
+    limit: Optional[int] = Query(None, ge=1),
+    after_id: Optional[int] = None,
+    stream: bool = False,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> CoilListResponse | Response:
+    """Страница списка рулонов; без limit - PAGE_SIZE_DEFAULT строк."""
+    if limit is None:
+        limit = settings.PAGE_SIZE_DEFAULT
+    elif limit > settings.PAGE_SIZE_MAX:
         raise HTTPException(
-            status_code=404, detail=f"Рулон с этим id: `{coil_id}` не найден"
+            status_code=422,
+            detail=f"limit не больше {settings.PAGE_SIZE_MAX}",
         )
-    if coil.removed_at:
-        raise HTTPException(status_code=400, detail="Рулон уже удален")
-    repo.remove(coil)
-    return CoilDeleteResponse()
+    if stream:
+        # Выгрузка всего склада в NDJSON без накопления в памяти
+        if settings.FAST_JSON_ENABLED:
+            lines = _ndjson_rows(
+                repo.iter_row_batches(
+                    filters, after_id, batch_size=settings.STREAM_BATCH_SIZE
+                )
+            )
+        else:
+            lines = _ndjson_lines(
+                repo.iter_batches(
+                    filters, after_id, batch_size=settings.STREAM_BATCH_SIZE
+                )
+            )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
 
+    if settings.FAST_JSON_ENABLED:
+        # Строки колонок сериализуются напрямую, без моделей на каждую
+        rows, next_cursor = await repo.get_page_rows(filters, limit, after_id)
+        return FastJSONResponse(
+            {"Status": "Success", "Coils": rows, "NextCursor": next_cursor}
+        )
 
-@router.get("/coils/", response_model=List[CoilResponse])
-def get_coils(
-    id_min: Optional[int] = None,
-    id_max: Optional[int] = None,
-    weight_min: Optional[float] = None,
-    weight_max: Optional[float] = None,
-    length_min: Optional[float] = None,
-    length_max: Optional[float] = None,
-    added_after: Optional[datetime] = None,
-    added_before: Optional[datetime] = None,
-    removed_after: Optional[datetime] = None,
-    removed_before: Optional[datetime] = None,
-    db: Session = Depends(get_db),
-) -> List[CoilResponse]:
-    filters = CoilFilter(
-        id_range=(id_min, id_max) if id_min and id_max else None,
-        weight_range=(
-            (weight_min, weight_max) if weight_min and weight_max else None
-        ),
-        length_range=(
-            (length_min, length_max) if length_min and length_max else None
-        ),
-        added_at_range=(
-            (added_after, added_before)
-            if added_after and added_before
-            else None
-        ),
-        removed_at_range=(
-            (removed_after, removed_before)
-            if removed_after and removed_before
-            else None
-        ),
+    coils, next_cursor = await repo.get_page(filters, limit, after_id)
+    return CoilListResponse(
+        Coils=[CoilResponse.model_validate(coil) for coil in coils],
+        NextCursor=next_cursor,
     )
 
-    repo = CoilRepository(db)
-    coils = repo.get_all(filters)
-    return [CoilResponse.model_validate(coil) for coil in coils]
-
 
 @router.post("/coils/statistics/", response_model=dict)
-def get_statistics(
-    date_range: DateRange, db: Session = Depends(get_db)
+async def get_statistics(
+    date_range: DateRange,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+) -> dict:
+    # Границы с часовым поясом и без него сравнимы только в UTC
+    start = to_utc_naive(date_range.start_date)
+    end = to_utc_naive(date_range.end_date)
+    if end < start:
+        raise HTTPException(
+            status_code=400,
+            detail="Дата окончания должна быть позже даты начала",
+        )
+
+    return await repo.get_statistics(start, end)
+
+
+@router.post("/coils/statistics/series", response_model=dict)
+async def get_statistics_series(
+    request: StatisticsSeriesRequest,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
 ) -> dict:
-    if date_range.end_date < date_range.start_date:
+    start = to_utc_naive(request.start_date)
+    end = to_utc_naive(request.end_date)
+    if end <= start:
         raise HTTPException(
             status_code=400,
             detail="Дата окончания должна быть позже даты начала",
         )
+    step = SERIES_BUCKETS[request.bucket]
+    if (end - start) / step > (
+        settings.STATS_SERIES_MAX_BUCKETS
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "Слишком много интервалов: не более "
+                f"{settings.STATS_SERIES_MAX_BUCKETS}"
+            ),
+        )
+
+    series = await repo.get_statistics_series(start, end, request.bucket)
+    return {"bucket": request.bucket, "series": series}
+
+
+@router.post("/coils/inventory", response_model=dict)
+async def get_inventory(
+    request: InventoryRequest,
+    repo: AsyncCoilRepository = Depends(get_coil_repository),
+    settings: Settings = Depends(get_app_settings),
+) -> dict:
+    """Остатки на складе на конец каждого дня периода."""
+    if request.end_date < request.start_date:
+        raise HTTPException(
+            status_code=400,
+            detail="Дата окончания должна быть позже даты начала",
+        )
+    days = (request.end_date - request.start_date).days + 1
+    if days > settings.STATS_SERIES_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "Слишком длинный период: не более "
+                f"{settings.STATS_SERIES_MAX_BUCKETS} дней"
+            ),
+        )
 
-    repo = CoilRepository(db)
-    return repo.get_statistics(date_range.start_date, date_range.end_date)
+    return await repo.get_inventory(request.start_date, request.end_date)
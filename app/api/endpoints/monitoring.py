@@ -0,0 +1,48 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import cache_stats
+from app.core.database import get_pool_status
+from app.core.metrics import Labels, get_registry, render_gauges
+
+router = APIRouter()
+
+# Эндпоинт для Prometheus подключается без префикса API
+metrics_router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/monitoring/pool", response_model=dict)
+def get_pool_metrics() -> Dict[str, Any]:
+    return get_pool_status()
+
+
+@router.get("/monitoring/cache", response_model=dict)
+def get_cache_metrics() -> Dict[str, Any]:
+    return cache_stats()
+
+
+@metrics_router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False
+)
+def get_prometheus_metrics() -> PlainTextResponse:
+    pool: Dict[Labels, float] = {
+        (("stat", name),): value
+        for name, value in get_pool_status().items()
+        if isinstance(value, (int, float))
+    }
+    caches: Dict[Labels, float] = {
+        (("cache", cache), ("stat", name)): value
+        for cache, stats in cache_stats().items()
+        for name, value in stats.items()
+        if isinstance(value, (int, float))
+    }
+    body = (
+        get_registry().render()
+        + render_gauges("db_pool", "Состояние пула соединений", pool)
+        + render_gauges("cache", "Состояние кэшей чтения", caches)
+    )
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
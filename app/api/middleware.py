@@ -0,0 +1,82 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import get_registry, start_request
+
+
+def _route_template(scope: Scope) -> str:
+    """Шаблон пути вместо фактического, чтобы не плодить метки по id.
+
+    Значения параметров пути заменяются на их имена: route.path у
+    вложенных роутеров не содержит префикса, поэтому шаблон
+    восстанавливается по фактическому пути.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {
+        str(value): name
+        for name, value in scope.get("path_params", {}).items()
+    }
+    return "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+def _server_timing(total: float, queries: int, db_seconds: float) -> str:
+    return (
+        f"app;dur={total * 1000:.1f}, "
+        f'db;dur={db_seconds * 1000:.1f};desc="{queries} queries"'
+    )
+
+
+class InstrumentationMiddleware:
+    """Время обработки запросов по маршрутам и учет SQL-запросов.
+
+    Для потоковых ответов Server-Timing отражает время до отправки
+    заголовков, а в метрики попадает полное время ответа.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = start_request()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        _server_timing(
+                            time.perf_counter() - started,
+                            stats.queries,
+                            stats.db_seconds,
+                        ),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            get_registry().observe_request(
+                scope["method"],
+                _route_template(scope),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
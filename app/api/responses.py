@@ -0,0 +1,31 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - orjson необязателен
+    HAS_ORJSON = False
+
+# Сериализация pydantic-core без валидации: используется без orjson
+_any_adapter: TypeAdapter[Any] = TypeAdapter(Any)
+
+
+def dump_json(content: Any) -> bytes:
+    """JSON из словарей, списков и datetime без построения моделей."""
+    if HAS_ORJSON:
+        return orjson.dumps(content)
+    return _any_adapter.dump_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, который сериализуется напрямую, минуя jsonable_encoder.
+
+    Содержимое не валидируется: эндпоинт отвечает за соответствие схеме.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
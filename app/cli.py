@@ -0,0 +1,192 @@
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.export import EXPORT_COMPRESSIONS, EXPORT_FORMATS
+
+# Репозитории и движок БД импортируются в командах: разбор аргументов и
+# --help не платят за их загрузку
+
+
+def rebuild_daily_stats_command(args: argparse.Namespace) -> int:
+    from app.core.database import get_session_factory
+    from app.repositories.daily_stats import rebuild_daily_stats
+
+    session_factory = get_session_factory()
+    with session_factory() as session:
+        days = rebuild_daily_stats(session)
+    print(f"Суточные агрегаты пересчитаны: {days} дн.")
+    return 0
+
+
+def export_coils_command(args: argparse.Namespace) -> int:
+    from app.core.database import get_session_factory
+    from app.export import export_to_file
+    from app.repositories.coil import CoilRepository
+    from app.schemas.coil import CoilFilter
+
+    filters = CoilFilter(
+        id_range=args.id_range,
+        weight_range=args.weight_range,
+        length_range=args.length_range,
+        added_at_range=args.added_range,
+        removed_at_range=args.removed_range,
+        in_stock=args.in_stock,
+    )
+    fmt = args.format or args.output.suffix.lstrip(".")
+    if fmt not in EXPORT_FORMATS:
+        print(f"Неизвестный формат выгрузки: {fmt}", file=sys.stderr)
+        return 2
+    session_factory = get_session_factory()
+    with session_factory() as session:
+        batches = CoilRepository(session).iter_row_batches(
+            filters, batch_size=args.batch_size
+        )
+        rows = export_to_file(batches, args.output, fmt, args.compression)
+    print(f"Выгружено рулонов: {rows} -> {args.output}")
+    return 0
+
+
+def archive_coils_command(args: argparse.Namespace) -> int:
+    from app.jobs import archive_coils
+
+    moved = archive_coils(args.days, args.batch_size)
+    print(f"Перенесено в архив рулонов: {moved}")
+    return 0
+
+
+def prune_coil_events_command(args: argparse.Namespace) -> int:
+    from app.jobs import prune_coil_events
+
+    deleted = prune_coil_events(args.hours)
+    print(f"Удалено событий ленты: {deleted}")
+    return 0
+
+
+def prune_idempotency_keys_command(args: argparse.Namespace) -> int:
+    from app.jobs import prune_idempotency_keys
+
+    deleted = prune_idempotency_keys(args.hours)
+    print(f"Удалено ключей идемпотентности: {deleted}")
+    return 0
+
+
+def _bound(convert: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Граница диапазона; "-" - граница не задана."""
+
+    def parse(value: str) -> Any:
+        return None if value == "-" else convert(value)
+
+    # По имени типа argparse сообщает об ошибке разбора
+    parse.__name__ = convert.__name__
+    return parse
+
+
+COMMANDS: Dict[str, Callable[[argparse.Namespace], int]] = {
+    "rebuild-daily-stats": rebuild_daily_stats_command,
+    "export-coils": export_coils_command,
+    "archive-coils": archive_coils_command,
+    "prune-coil-events": prune_coil_events_command,
+    "prune-idempotency-keys": prune_idempotency_keys_command,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Служебные команды API склада рулонов",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "rebuild-daily-stats",
+        help="Пересчитать таблицу coil_daily_stats по таблице coils",
+    )
+
+    settings = get_settings()
+    export = commands.add_parser(
+        "export-coils",
+        help="Выгрузить рулоны в Arrow IPC или Parquet",
+    )
+    export.add_argument("output", type=Path, help="Файл выгрузки")
+    export.add_argument(
+        "--format",
+        choices=sorted(EXPORT_FORMATS),
+        help="Формат; по умолчанию - по расширению файла",
+    )
+    export.add_argument(
+        "--compression",
+        choices=EXPORT_COMPRESSIONS,
+        default=settings.EXPORT_COMPRESSION,
+    )
+    export.add_argument(
+        "--batch-size", type=int, default=settings.EXPORT_BATCH_SIZE
+    )
+    ranges: List[Tuple[str, Callable[[str], Any]]] = [
+        ("--id-range", int),
+        ("--weight-range", float),
+        ("--length-range", float),
+        ("--added-range", datetime.fromisoformat),
+        ("--removed-range", datetime.fromisoformat),
+    ]
+    for option, value_type in ranges:
+        export.add_argument(
+            option,
+            nargs=2,
+            type=_bound(value_type),
+            metavar=("MIN", "MAX"),
+            help="Границы включаются; \"-\" вместо границы - без нее",
+        )
+    export.add_argument(
+        "--in-stock",
+        action="store_true",
+        help="Только рулоны, которые сейчас на складе",
+    )
+
+    archive = commands.add_parser(
+        "archive-coils",
+        help="Перенести давно списанные рулоны в coils_archive",
+    )
+    archive.add_argument(
+        "--days",
+        type=int,
+        default=settings.ARCHIVE_AFTER_DAYS,
+        help="Сколько дней должно пройти после списания",
+    )
+    archive.add_argument(
+        "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE
+    )
+
+    prune = commands.add_parser(
+        "prune-coil-events",
+        help="Удалить старые события из журнала ленты изменений",
+    )
+    prune.add_argument(
+        "--hours",
+        type=int,
+        default=settings.CHANGE_FEED_RETENTION_HOURS,
+        help="События старше стольких часов удаляются",
+    )
+
+    prune_keys = commands.add_parser(
+        "prune-idempotency-keys",
+        help="Удалить устаревшие ключи Idempotency-Key",
+    )
+    prune_keys.add_argument(
+        "--hours",
+        type=int,
+        default=settings.IDEMPOTENCY_TTL_HOURS,
+        help="Ключи старше стольких часов удаляются",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
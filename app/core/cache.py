@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from app.core.config import Settings, get_settings, multiple_workers
+
+
+class CacheBackend(Protocol):
+    """Интерфейс хранилища кэша (in-process LRU, Redis и т.п.)."""
+
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш с ограничением размера и TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class NullCache:
+    """Кэш-заглушка, когда кэширование отключено."""
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+
+_caches: Dict[str, CacheBackend] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, settings: Optional[Settings] = None) -> CacheBackend:
+    """Именованный кэш процесса; создается при первом обращении.
+
+    settings - настройки приложения (по умолчанию процесса): если кэш в
+    них выключен, возвращается NullCache. При нескольких воркерах кэш
+    выключен всегда: запись, измененная в другом воркере, отдавалась бы
+    из него со старой версией до истечения TTL.
+    """
+    if settings is None:
+        settings = get_settings()
+    if not settings.CACHE_ENABLED or multiple_workers(settings):
+        return NullCache()
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = LRUCache(
+                settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS
+            )
+        return _caches[name]
+
+
+def set_cache(name: str, backend: CacheBackend) -> None:
+    """Подменяет хранилище именованного кэша."""
+    with _caches_lock:
+        _caches[name] = backend
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def clear_caches() -> None:
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
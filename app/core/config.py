@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import List
 
 from pydantic_settings import BaseSettings
 
@@ -9,6 +10,106 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     SECRET_KEY: str = "supersecretkey"
 
+    # Пул соединений (для PostgreSQL и файловой SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
+    # Ограничение времени выполнения запроса в PostgreSQL, 0 - без лимита
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # PRAGMA для локального режима на SQLite
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+
+    # Кэш чтения рулонов и статистики
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: float = 30.0
+
+    # Статистика за полные дни берется из суточных агрегатов
+    STATS_ROLLUP_ENABLED: bool = True
+    # Одновременные запросы статистики за один период считаются один раз
+    STATS_SINGLE_FLIGHT: bool = True
+    # Наибольшее число интервалов в ряду статистики
+    STATS_SERIES_MAX_BUCKETS: int = 2000
+    # Остатки по дням считаются оконными функциями, если БД их поддерживает
+    INVENTORY_SQL_WINDOW: bool = True
+
+    # Постраничная выдача и потоковая выгрузка списка рулонов
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+    STREAM_BATCH_SIZE: int = 1000
+    # Список отдается строками колонок без валидации каждой строки
+    FAST_JSON_ENABLED: bool = True
+
+    # Колоночная выгрузка (Arrow/Parquet): строк в пачке и сжатие
+    EXPORT_BATCH_SIZE: int = 65536
+    EXPORT_COMPRESSION: str = "zstd"
+
+    # Архив давно списанных рулонов: через сколько дней после списания
+    # рулон переносится, размер пачки и период фонового переноса
+    # (0 - только командой archive-coils)
+    ARCHIVE_AFTER_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_INTERVAL_SECONDS: float = 0
+
+    # Production-запуск (python -m app.server): число воркеров (0 - по
+    # числу CPU), время на плавную остановку и keep-alive в секундах,
+    # перезапуск воркера после N запросов (0 - без перезапуска).
+    # app.server передает воркерам их итоговое число в SERVER_WORKERS
+    SERVER_WORKERS: int = 0
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_MAX_REQUESTS: int = 0
+
+    # Лента изменений рулонов (SSE и WebSocket): журнал событий хранится
+    # CHANGE_FEED_RETENTION_HOURS часов и очищается раз в
+    # CHANGE_FEED_PRUNE_INTERVAL_SECONDS (0 - только командой
+    # prune-coil-events); журнал опрашивается раз в
+    # CHANGE_FEED_POLL_SECONDS ради событий других воркеров. Событие с
+    # меньшим id может зафиксироваться позже (PostgreSQL): пропущенные id
+    # дочитываются CHANGE_FEED_GAP_SECONDS секунд
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_RETENTION_HOURS: int = 72
+    CHANGE_FEED_PRUNE_INTERVAL_SECONDS: float = 3600
+    CHANGE_FEED_POLL_SECONDS: float = 5
+    CHANGE_FEED_GAP_SECONDS: float = 60
+    CHANGE_FEED_BATCH_SIZE: int = 500
+    CHANGE_FEED_QUEUE_SIZE: int = 1000
+
+    # Повторы POST /coils/ с заголовком Idempotency-Key: сколько часов
+    # хранится ответ и период очистки (0 - только командой
+    # prune-idempotency-keys)
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_PRUNE_INTERVAL_SECONDS: float = 3600
+
+    # Пакетная загрузка рулонов
+    BULK_BATCH_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 10000
+
+    # Инструментирование: метрики запросов, учет SQL и Server-Timing
+    METRICS_ENABLED: bool = True
+    METRICS_SQL_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    METRICS_LATENCY_BUCKETS: List[float] = [
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    ]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -18,3 +119,8 @@ class Settings(BaseSettings):
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
+
+
+def multiple_workers(settings: Settings) -> bool:
+    """API обслуживают несколько процессов, у каждого своя память."""
+    return settings.SERVER_WORKERS > 1
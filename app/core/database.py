@@ -1,30 +1,296 @@
-from typing import Generator
+import os
+import threading
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import Settings, get_settings
+from app.core.pool import (
+    PoolStats,
+    instrumented_pool_class,
+    pool_status,
+    track_pool,
+)
 
-from app.core.config import get_settings
+# Асинхронные драйверы и их синхронные аналоги
+ASYNC_DRIVERS = {
+    "postgresql+asyncpg": "postgresql",
+    "sqlite+aiosqlite": "sqlite",
+}
 
-settings = get_settings()
 
-# Настройка подключения к базе данных в зависимости от типа
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+def is_async_url(url: str) -> bool:
+    return url.split("://", 1)[0] in ASYNC_DRIVERS
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    connect_args=connect_args,
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def to_sync_url(url: str) -> str:
+    """URL синхронного драйвера (для миграций и утилит)."""
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+def engine_options(
+    url: str, settings: Settings, stats: PoolStats
+) -> Dict[str, Any]:
+    """Параметры create_engine/create_async_engine из настроек."""
+    parsed = make_url(url)
+    connect_args: Dict[str, Any] = {}
+    options: Dict[str, Any] = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+    if parsed.get_backend_name() == "sqlite":
+        if not is_async_url(url):
+            connect_args["check_same_thread"] = False
+        # База в памяти живет в одном соединении, пул не настраивается
+        if parsed.database in (None, "", ":memory:"):
+            return options
+
+    if parsed.get_backend_name() == "postgresql":
+        timeout = settings.DB_STATEMENT_TIMEOUT_MS
+        if timeout and is_async_url(url):
+            connect_args["server_settings"] = {
+                "statement_timeout": str(timeout)
+            }
+        elif timeout:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    base = AsyncAdaptedQueuePool if is_async_url(url) else QueuePool
+    options.update(
+        poolclass=instrumented_pool_class(base, stats),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+    )
+    return options
+
+
+def set_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(
+            f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}"
+        )
+        # Отрицательное значение cache_size задается в килобайтах
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.close()
+
+
+DBSession = Session | AsyncSession
+
+
+class Database:
+    """Движки и фабрики сессий процесса, создаваемые при первом обращении.
+
+    При импорте модуля движок не создается. Воркер, запущенный через fork
+    после обращения к БД в родителе, создает собственные движки и пулы,
+    а не пользуется унаследованными соединениями.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._engine: Optional[Engine] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self.sync_pool_stats = PoolStats()
+        self.async_pool_stats = PoolStats()
+        # Сессии несут настройки, с которыми создана база (create_app):
+        # по ним репозитории решают, вести ли ленту, агрегаты и кэш
+        self._session_factory = sessionmaker(
+            autocommit=False, autoflush=False, info={"settings": settings}
+        )
+        self._async_session_factory: (
+            async_sessionmaker[AsyncSession] | None
+        ) = None
+
+    def _ensure(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._forget_inherited()
+            self._create()
+            self._pid = os.getpid()
+
+    def _forget_inherited(self) -> None:
+        # Соединения, унаследованные от родителя, закрывает он сам
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=False)
+
+    def _create(self) -> None:
+        settings = self.settings
+        url = to_sync_url(settings.DATABASE_URL)
+        self.sync_pool_stats = PoolStats()
+        self._engine = create_engine(
+            url,
+            future=True,
+            **engine_options(url, settings, self.sync_pool_stats),
+        )
+        track_pool(self._engine, self.sync_pool_stats)
+        set_sqlite_pragmas(self._engine, settings)
+        self._session_factory.configure(bind=self._engine)
+
+        # Асинхронный режим включается драйвером в DATABASE_URL
+        # (postgresql+asyncpg://..., sqlite+aiosqlite://...)
+        self._async_engine = None
+        self._async_session_factory = None
+        if is_async_url(settings.DATABASE_URL):
+            self.async_pool_stats = PoolStats()
+            self._async_engine = create_async_engine(
+                settings.DATABASE_URL,
+                **engine_options(
+                    settings.DATABASE_URL, settings, self.async_pool_stats
+                ),
+            )
+            track_pool(self._async_engine.sync_engine, self.async_pool_stats)
+            set_sqlite_pragmas(self._async_engine.sync_engine, settings)
+            self._async_session_factory = async_sessionmaker(
+                self._async_engine,
+                autoflush=False,
+                expire_on_commit=False,
+                info={"settings": settings},
+            )
+
+    @property
+    def engine(self) -> Engine:
+        self._ensure()
+        assert self._engine is not None
+        return self._engine
+
+    @property
+    def async_engine(self) -> Optional[AsyncEngine]:
+        self._ensure()
+        return self._async_engine
+
+    @property
+    def session_factory(self) -> sessionmaker[Session]:
+        self._ensure()
+        return self._session_factory
+
+    @property
+    def async_session_factory(
+        self,
+    ) -> async_sessionmaker[AsyncSession] | None:
+        self._ensure()
+        return self._async_session_factory
+
+    async def dispose(self) -> None:
+        """Закрывает соединения; движки создадутся при следующем обращении."""
+        with self._lock:
+            engine, async_engine = self._engine, self._async_engine
+            self._engine = self._async_engine = None
+            self._pid = None
+        if async_engine is not None:
+            await async_engine.dispose()
+        if engine is not None:
+            await run_in_threadpool(engine.dispose)
+
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = Database(get_settings())
+        return _database
+
+
+def configure_database(settings: Settings) -> Database:
+    """Задает настройки БД процесса (фабрика приложения, тесты).
+
+    Движки создаются при первом обращении; движки прежнего объекта
+    закрывает вызывающий.
+    """
+    global _database
+    with _database_lock:
+        _database = Database(settings)
+        return _database
+
+
+def session_settings(session: Session | AsyncSession) -> Settings:
+    """Настройки, с которыми создана сессия, иначе настройки процесса."""
+    settings = session.info.get("settings")
+    return settings if settings is not None else get_settings()
+
+
+def get_engine() -> Engine:
+    return get_database().engine
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    return get_database().session_factory
+
+
+def get_async_engine() -> Optional[AsyncEngine]:
+    return get_database().async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession] | None:
+    return get_database().async_session_factory
+
+
+# Прежние атрибуты модуля создают движок при первом обращении к ним
+_LAZY_ATTRIBUTES: Dict[str, Callable[[], Any]] = {
+    "engine": get_engine,
+    "SessionLocal": get_session_factory,
+    "async_engine": get_async_engine,
+    "AsyncSessionLocal": get_async_session_factory,
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Состояние пула соединений, которым пользуются эндпоинты."""
+    database = get_database()
+    async_engine = database.async_engine
+    if async_engine is not None:
+        return pool_status(async_engine.pool, database.async_pool_stats)
+    return pool_status(database.engine.pool, database.sync_pool_stats)
+
 
+async def get_db() -> AsyncGenerator[DBSession, None]:
+    """Сессия БД для эндпоинтов: AsyncSession в асинхронном режиме."""
+    database = get_database()
+    async_session_factory = database.async_session_factory
+    if async_session_factory is not None:
+        async with async_session_factory() as session:
+            yield session
+        return
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = database.session_factory()
     try:
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+Event = Dict[str, Any]
+
+
+class Subscription:
+    """Очередь событий одного подписчика в его event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[List[Event]] = asyncio.Queue(size)
+        # Очередь переполнялась: часть событий пропущена, их нужно
+        # дочитать из журнала
+        self.overflowed = False
+
+    def _deliver(self, events: List[Event]) -> None:
+        try:
+            self.queue.put_nowait(events)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def drain(self) -> None:
+        """Сбрасывает очередь и признак переполнения."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+    async def get(self) -> List[Event]:
+        return await self.queue.get()
+
+
+class ChangeBroadcaster:
+    """Рассылка событий подписчикам внутри процесса.
+
+    publish вызывается из любого потока (репозитории работают в пуле
+    потоков) и не ждет подписчиков: медленному подписчику достается
+    признак overflowed вместо блокировки записи.
+    """
+
+    def __init__(self, queue_size: int = 1000) -> None:
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, queue_size: Optional[int] = None) -> Subscription:
+        """Подписка для текущего event loop.
+
+        queue_size - размер очереди подписчика (по умолчанию общий).
+        """
+        subscription = Subscription(
+            asyncio.get_running_loop(), queue_size or self.queue_size
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, events: List[Event]) -> None:
+        if not events:
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription._deliver, events
+                )
+            except RuntimeError:
+                # Event loop подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+
+_broadcaster: Optional[ChangeBroadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> ChangeBroadcaster:
+    """Рассылка изменений рулонов процесса."""
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            # Размер очереди подписчика задает лента (follow)
+            _broadcaster = ChangeBroadcaster()
+        return _broadcaster
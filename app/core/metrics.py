@@ -0,0 +1,309 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings, get_settings
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Накопительная гистограмма в духе Prometheus."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield _format_value(bound), total
+        yield "+Inf", self.count
+
+
+class RequestStats:
+    """Запросы к БД, выполненные в рамках одного HTTP-запроса."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Статистика текущего HTTP-запроса. Объект изменяется на месте, поэтому
+# счетчики видны и из потоков, куда копируется контекст (anyio.to_thread)
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def start_request() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+class MetricsRegistry:
+    """Метрики HTTP-запросов и SQL-запросов процесса."""
+
+    def __init__(self, latency_buckets: Sequence[float]) -> None:
+        self._lock = threading.Lock()
+        self.latency_buckets = tuple(latency_buckets)
+        self.requests: Dict[Labels, int] = {}
+        self.latency: Dict[Labels, Histogram] = {}
+        self.request_queries: Dict[Labels, int] = {}
+        self.request_db_seconds: Dict[Labels, float] = {}
+        self.queries = 0
+        self.query_errors = 0
+        self.query_latency = Histogram(self.latency_buckets)
+        self.flight_executions: Dict[Labels, int] = {}
+        self.flight_coalesced: Dict[Labels, int] = {}
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        stats: Optional[RequestStats] = None,
+    ) -> None:
+        route_labels = (("method", method), ("route", route))
+        status_labels = route_labels + (("status", str(status)),)
+        with self._lock:
+            self.requests[status_labels] = (
+                self.requests.get(status_labels, 0) + 1
+            )
+            histogram = self.latency.get(route_labels)
+            if histogram is None:
+                histogram = Histogram(self.latency_buckets)
+                self.latency[route_labels] = histogram
+            histogram.observe(seconds)
+            if stats is not None:
+                self.request_queries[route_labels] = (
+                    self.request_queries.get(route_labels, 0) + stats.queries
+                )
+                self.request_db_seconds[route_labels] = (
+                    self.request_db_seconds.get(route_labels, 0.0)
+                    + stats.db_seconds
+                )
+
+    def observe_query(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.queries += 1
+            if failed:
+                self.query_errors += 1
+            self.query_latency.observe(seconds)
+
+    def observe_flight(self, name: str, coalesced: bool) -> None:
+        """Запрос через SingleFlight: выполнен сам или присоединился."""
+        labels = (("call", name),)
+        counters = (
+            self.flight_coalesced if coalesced else self.flight_executions
+        )
+        with self._lock:
+            counters[labels] = counters.get(labels, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.request_queries.clear()
+            self.request_db_seconds.clear()
+            self.queries = 0
+            self.query_errors = 0
+            self.query_latency = Histogram(self.latency_buckets)
+            self.flight_executions.clear()
+            self.flight_coalesced.clear()
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        lines: List[str] = []
+        with self._lock:
+            _counter(
+                lines,
+                "http_requests_total",
+                "Количество HTTP-запросов",
+                self.requests,
+            )
+            _histogram(
+                lines,
+                "http_request_duration_seconds",
+                "Время обработки HTTP-запроса",
+                self.latency,
+            )
+            _counter(
+                lines,
+                "http_request_db_queries_total",
+                "SQL-запросы, выполненные при обработке HTTP-запросов",
+                self.request_queries,
+            )
+            _counter(
+                lines,
+                "http_request_db_seconds_total",
+                "Время SQL-запросов при обработке HTTP-запросов",
+                self.request_db_seconds,
+            )
+            _counter(
+                lines,
+                "db_queries_total",
+                "Количество SQL-запросов",
+                {(): self.queries},
+            )
+            _counter(
+                lines,
+                "db_query_errors_total",
+                "Количество SQL-запросов, завершившихся ошибкой",
+                {(): self.query_errors},
+            )
+            _histogram(
+                lines,
+                "db_query_duration_seconds",
+                "Время выполнения SQL-запроса",
+                {(): self.query_latency},
+            )
+            _counter(
+                lines,
+                "singleflight_executions_total",
+                "Вычисления, выполненные для одинаковых запросов",
+                self.flight_executions,
+            )
+            _counter(
+                lines,
+                "singleflight_coalesced_total",
+                "Запросы, получившие результат чужого вычисления",
+                self.flight_coalesced,
+            )
+        return "\n".join(lines) + "\n"
+
+
+def render_gauges(
+    name: str, help_text: str, values: Dict[Labels, float]
+) -> str:
+    lines: List[str] = []
+    _metric(lines, name, help_text, "gauge", values)
+    return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _metric(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    kind: str,
+    values: Dict[Labels, Any],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+
+def _counter(
+    lines: List[str], name: str, help_text: str, values: Dict[Labels, Any]
+) -> None:
+    _metric(lines, name, help_text, "counter", values)
+
+
+def _histogram(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    values: Dict[Labels, Histogram],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in sorted(values.items()):
+        for bound, count in histogram.cumulative():
+            bucket_labels = _format_labels(labels + (("le", bound),))
+            lines.append(f"{name}_bucket{bucket_labels} {count}")
+        lines.append(
+            f"{name}_sum{_format_labels(labels)} "
+            f"{_format_value(histogram.sum)}"
+        )
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+
+registry = MetricsRegistry(get_settings().METRICS_LATENCY_BUCKETS)
+
+
+def get_registry() -> MetricsRegistry:
+    return registry
+
+
+def configure_registry(settings: Settings) -> MetricsRegistry:
+    """Реестр метрик процесса с корзинами из настроек приложения."""
+    global registry
+    if tuple(settings.METRICS_LATENCY_BUCKETS) != registry.latency_buckets:
+        registry = MetricsRegistry(settings.METRICS_LATENCY_BUCKETS)
+    return registry
+
+
+def _on_before_execute(conn: Any, *args: Any) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _finish_query(conn: Any, failed: bool) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    registry.observe_query(seconds, failed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+
+
+def _on_after_execute(conn: Any, *args: Any) -> None:
+    _finish_query(conn, failed=False)
+
+
+def _on_error(context: Any) -> None:
+    if context.connection is not None:
+        _finish_query(context.connection, failed=True)
+
+
+def track_queries(target: Any = Engine) -> None:
+    """Подписывает учет SQL-запросов на события движка.
+
+    По умолчанию подписка делается на класс Engine и действует для всех
+    движков процесса, включая sync_engine асинхронных движков.
+    """
+    if event.contains(target, "before_cursor_execute", _on_before_execute):
+        return
+    event.listen(target, "before_cursor_execute", _on_before_execute)
+    event.listen(target, "after_cursor_execute", _on_after_execute)
+    event.listen(target, "handle_error", _on_error)
@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolStats:
+    """Счетчики использования пула соединений."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "timeouts": self.timeouts,
+            }
+
+
+def instrumented_pool_class(
+    base: type[QueuePool], stats: PoolStats
+) -> type[QueuePool]:
+    """Подкласс QueuePool, учитывающий ожидания свободного соединения.
+
+    Ожиданием считается выдача соединения, когда в пуле нет свободных
+    соединений и лимит max_overflow исчерпан.
+    """
+
+    class InstrumentedPool(base):  # type: ignore[valid-type, misc]
+        def _do_get(self) -> Any:
+            exhausted = (
+                self.checkedin() == 0
+                and self._max_overflow > -1
+                and self.overflow() >= self._max_overflow
+            )
+            if not exhausted:
+                return super()._do_get()
+
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                stats.increment("timeouts")
+                raise
+            finally:
+                stats.increment("waits")
+                stats.increment("wait_seconds", time.perf_counter() - started)
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def track_pool(engine: Engine, stats: PoolStats) -> None:
+    """Подписывает счетчики на события пула движка."""
+
+    @event.listens_for(engine, "connect")
+    def on_connect(*args: Any) -> None:
+        stats.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(*args: Any) -> None:
+        stats.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(*args: Any) -> None:
+        stats.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(*args: Any) -> None:
+        stats.increment("invalidations")
+
+
+def pool_status(pool: Pool, stats: PoolStats) -> Dict[str, Any]:
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # overflow() отрицателен, пока пул не заполнен
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            }
+        )
+    status.update(stats.as_dict())
+    return status
+
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from app.core.metrics import get_registry
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Одно вычисление на ключ для одновременных одинаковых запросов.
+
+    Первый запрос с ключом (ведущий) запускает вычисление, остальные до
+    его завершения получают тот же результат или ту же ошибку. Отмена
+    ведущего отменяет вычисление (его сессия БД закрывается вместе с
+    запросом), и ожидавшие запросы повторяют его сами.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Tuple[Any, Hashable], asyncio.Task[Any]] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        # Задачи привязаны к event loop: ключ включает его
+        flight_key = (asyncio.get_running_loop(), key)
+        while True:
+            task = self._calls.get(flight_key)
+            if task is None:
+                leader = asyncio.ensure_future(call())
+                self._calls[flight_key] = leader
+                leader.add_done_callback(
+                    lambda done: self._forget(flight_key, done)
+                )
+                get_registry().observe_flight(self.name, coalesced=False)
+                return await leader
+
+            get_registry().observe_flight(self.name, coalesced=True)
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                # Отменен ведущий запрос, а не этот: вычисляем заново
+                if task.cancelled() and not (current and current.cancelling()):
+                    continue
+                raise
+
+    def _forget(self, flight_key: Tuple[Any, Hashable], task: Any) -> None:
+        if self._calls.get(flight_key) is task:
+            del self._calls[flight_key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Именованный SingleFlight процесса."""
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
@@ -1,7 +1,16 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from typing import Any, Dict
 
-from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -11,6 +20,37 @@ class Base(DeclarativeBase):
 
 class Coil(Base):
     __tablename__ = "coils"
+    __table_args__ = (
+        # Покрывающие индексы для фильтров по датам и для статистики
+        Index(
+            "ix_coils_added_at_period",
+            "added_at",
+            "removed_at",
+            "length",
+            "weight",
+        ),
+        Index(
+            "ix_coils_removed_at_period",
+            "removed_at",
+            "added_at",
+            "length",
+            "weight",
+        ),
+        # Частичный индекс по рулонам, которые сейчас на складе
+        Index(
+            "ix_coils_in_stock",
+            "added_at",
+            "length",
+            "weight",
+            postgresql_where=text("removed_at IS NULL"),
+            sqlite_where=text("removed_at IS NULL"),
+        ),
+        Index("ix_coils_weight", "weight"),
+        Index("ix_coils_length", "length"),
+        # Без AUTOINCREMENT SQLite повторно выдал бы id рулона,
+        # перенесенного в архив
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     length: Mapped[float] = mapped_column(Float, nullable=False)
@@ -24,6 +64,10 @@ class Coil(Base):
     updated_at: Mapped[datetime | None] = mapped_column(
         DateTime, nullable=True
     )
+    # Версия для оптимистической блокировки, растет при каждом изменении
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default=text("1")
+    )
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -33,4 +77,132 @@ class Coil(Base):
             "added_at": self.added_at,
             "removed_at": self.removed_at,
             "updated_at": self.updated_at,
+            "version": self.version,
         }
+
+
+class CoilDailyStats(Base):
+    """Суточные агрегаты по рулонам для статистики за длинные периоды.
+
+    Поля added_* и storage_* относятся к рулонам, добавленным в этот
+    день, removed_count - к рулонам, удаленным в этот день.
+    """
+
+    __tablename__ = "coil_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    added_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    added_length_sum: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0
+    )
+    added_length_min: Mapped[float | None] = mapped_column(
+        Float, nullable=True
+    )
+    added_length_max: Mapped[float | None] = mapped_column(
+        Float, nullable=True
+    )
+    added_weight_sum: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0
+    )
+    added_weight_min: Mapped[float | None] = mapped_column(
+        Float, nullable=True
+    )
+    added_weight_max: Mapped[float | None] = mapped_column(
+        Float, nullable=True
+    )
+    removed_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    storage_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    storage_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class CoilArchive(Base):
+    """Рулоны, списанные давно и перенесенные из coils в архив.
+
+    В PostgreSQL таблица секционирована по added_at (секция на год),
+    поэтому ключ включает added_at.
+    """
+
+    __tablename__ = "coils_archive"
+    __table_args__ = (
+        Index(
+            "ix_coils_archive_added_at_period",
+            "added_at",
+            "removed_at",
+            "length",
+            "weight",
+        ),
+        Index(
+            "ix_coils_archive_removed_at_period",
+            "removed_at",
+            "added_at",
+            "length",
+            "weight",
+        ),
+        {"postgresql_partition_by": "RANGE (added_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    added_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    length: Mapped[float] = mapped_column(Float, nullable=False)
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
+    removed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), nullable=False
+    )
+
+
+class CoilEvent(Base):
+    """Журнал изменений рулонов для ленты событий.
+
+    Хранится только то, что меняется событием: клиент ленты применяет
+    его к своей копии списка. id растет монотонно и служит позицией, с
+    которой клиент продолжает чтение после переподключения. Фиксируются
+    события не обязательно в порядке id (см. app.feed).
+    """
+
+    __tablename__ = "coil_events"
+    __table_args__ = (
+        Index("ix_coil_events_occurred_at", "occurred_at"),
+        # id удаленных при очистке событий не должны выдаваться повторно
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # created, updated или removed
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    coil_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    length: Mapped[float] = mapped_column(Float, nullable=False)
+    weight: Mapped[float] = mapped_column(Float, nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """Ответы на создание рулона по ключу Idempotency-Key.
+
+    Повтор запроса с тем же ключом получает сохраненный ответ, не
+    обращаясь к таблице coils. Ключи старше IDEMPOTENCY_TTL_HOURS
+    удаляются фоновой очисткой.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 тела запроса: тот же ключ с другим телом - ошибка клиента
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Созданный рулон в JSON
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), nullable=False
+    )
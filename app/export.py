@@ -0,0 +1,151 @@
+import importlib.util
+import io
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+# Форматы выгрузки и их MIME-типы
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXPORT_COMPRESSIONS = ("zstd", "lz4", "none")
+
+
+class ExportUnavailableError(RuntimeError):
+    pass
+
+
+def export_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@lru_cache()
+def _arrow() -> Tuple[Any, Any]:
+    # pyarrow импортируется при первой выгрузке, а не при старте
+    if not export_available():
+        raise ExportUnavailableError("Для выгрузки нужен пакет pyarrow")
+    import pyarrow
+    import pyarrow.parquet
+
+    return pyarrow, pyarrow.parquet
+
+
+def coil_schema() -> Any:
+    pa, _ = _arrow()
+    # Даты хранятся в БД без часового пояса, в UTC
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            pa.field("id", pa.int64(), nullable=False),
+            pa.field("length", pa.float64(), nullable=False),
+            pa.field("weight", pa.float64(), nullable=False),
+            pa.field("added_at", timestamp, nullable=False),
+            pa.field("removed_at", timestamp),
+            pa.field("updated_at", timestamp),
+            pa.field("version", pa.int64(), nullable=False),
+        ]
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Приемник, из которого записанные байты забираются по частям."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class CoilExportWriter:
+    """Запись пачек рулонов в Arrow IPC (поток) или Parquet.
+
+    Каждая пачка становится record batch в Arrow или группой строк в
+    Parquet, поэтому память ограничена размером пачки.
+    """
+
+    def __init__(self, sink: Any, fmt: str, compression: str) -> None:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+        if compression not in EXPORT_COMPRESSIONS:
+            raise ValueError(f"Неизвестное сжатие: {compression}")
+        self.schema = coil_schema()
+        self.rows = 0
+        pa, pq = _arrow()
+        codec = None if compression == "none" else compression
+        if fmt == "arrow":
+            options = pa.ipc.IpcWriteOptions(compression=codec)
+            self._writer = pa.ipc.new_stream(
+                sink, self.schema, options=options
+            )
+        else:
+            self._writer = pq.ParquetWriter(
+                sink, self.schema, compression=codec
+            )
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        columns = {
+            name: [row[name] for row in rows] for name in self.schema.names
+        }
+        pa, _ = _arrow()
+        self._writer.write_batch(
+            pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        )
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def export_to_file(
+    batches: Iterable[List[Dict[str, Any]]],
+    path: Path,
+    fmt: str,
+    compression: str = "zstd",
+) -> int:
+    """Выгрузка в файл, возвращает количество строк."""
+    with open(path, "wb") as sink:
+        writer = CoilExportWriter(sink, fmt, compression)
+        for batch in batches:
+            writer.write(batch)
+        writer.close()
+    return writer.rows
+
+
+async def stream_export(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    fmt: str,
+    compression: str = "zstd",
+) -> AsyncIterator[bytes]:
+    """Выгрузка для StreamingResponse: байты отдаются после каждой пачки."""
+    sink = _ChunkSink()
+    writer = CoilExportWriter(sink, fmt, compression)
+    async for batch in batches:
+        # Конвертация и сжатие - работа для CPU, не для цикла событий
+        await run_in_threadpool(writer.write, batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
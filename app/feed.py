@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import AsyncGenerator, List, Optional, Tuple
+
+from app.core.events import ChangeBroadcaster, Event
+from app.repositories.coil import AsyncCoilRepository
+
+
+class _Position:
+    """Позиция ленты и пропуски id под ней.
+
+    id события выдается при INSERT, а видно событие после commit, поэтому
+    в PostgreSQL событие с меньшим id может зафиксироваться позже
+    большего. Такие же пропуски дают живые события, обогнавшие еще не
+    прочитанные события других воркеров. Пропущенные id ждут
+    gap_seconds: после откатов транзакций они не заполнятся никогда.
+    """
+
+    def __init__(self, last: int, gap_seconds: float) -> None:
+        self.last = last
+        self.gap_seconds = gap_seconds
+        # Диапазоны [low, high] пропущенных id и срок их ожидания
+        self.gaps: List[Tuple[int, int, float]] = []
+
+    def accept(self, events: List[Event], gaps: bool = True) -> List[Event]:
+        """Новые события пачки в порядке id, без уже отданных."""
+        deadline = time.monotonic() + self.gap_seconds
+        fresh = []
+        for event in events:
+            event_id = event["id"]
+            if event_id > self.last:
+                if gaps and event_id > self.last + 1:
+                    self.gaps.append((self.last + 1, event_id - 1, deadline))
+                self.last = event_id
+            elif not self._fill(event_id):
+                continue
+            fresh.append(event)
+        return fresh
+
+    def _fill(self, event_id: int) -> bool:
+        for index, (low, high, deadline) in enumerate(self.gaps):
+            if low <= event_id <= high:
+                rest = [
+                    (low, event_id - 1, deadline),
+                    (event_id + 1, high, deadline),
+                ]
+                self.gaps[index : index + 1] = [
+                    gap for gap in rest if gap[0] <= gap[1]
+                ]
+                return True
+        return False
+
+    def oldest_gap(self) -> Optional[int]:
+        """Наименьший еще ожидаемый id."""
+        now = time.monotonic()
+        self.gaps = [gap for gap in self.gaps if gap[2] > now]
+        return min((gap[0] for gap in self.gaps), default=None)
+
+
+async def _late_events(
+    repo: AsyncCoilRepository, position: _Position, batch_size: int
+) -> List[Event]:
+    # Журнал под позицией перечитывается от наименьшего пропуска, уже
+    # отданные события отсекаются по id
+    late: List[Event] = []
+    oldest = position.oldest_gap()
+    if oldest is None:
+        return late
+    after_id = oldest - 1
+    while True:
+        events = await repo.get_events(after_id, batch_size, position.last)
+        late += position.accept(events)
+        if len(events) < batch_size or not position.gaps:
+            return late
+        after_id = events[-1]["id"]
+
+
+async def follow(
+    repo: AsyncCoilRepository,
+    broadcaster: ChangeBroadcaster,
+    after_id: Optional[int] = None,
+    poll_seconds: float = 5.0,
+    batch_size: int = 500,
+    gap_seconds: float = 60.0,
+    queue_size: Optional[int] = None,
+) -> AsyncGenerator[List[Event], None]:
+    """Пачки событий ленты после after_id, пока клиент не отключится.
+
+    Подписка оформляется до чтения журнала, поэтому события, записанные
+    во время чтения, не теряются, а повторы отсекаются по id. Журнал
+    перечитывается после переполнения очереди подписчика и раз в
+    poll_seconds: так приходят события других воркеров и события,
+    зафиксированные позже событий с большим id (см. _Position). Пустая
+    пачка - событий за poll_seconds не было (для keep-alive). Если часть
+    событий уже удалена из журнала, первым идет событие reset.
+    queue_size - размер очереди рассылки для этого подписчика.
+    """
+    subscription = broadcaster.subscribe(queue_size)
+    try:
+        start, lost = await repo.get_feed_start(after_id)
+        position = _Position(start, gap_seconds)
+        if lost:
+            yield [{"id": start, "kind": "reset"}]
+        # После reset пропуск перед первым событием - очищенный журнал
+        gaps = not lost
+        while True:
+            events = await repo.get_events(position.last, batch_size)
+            late = await _late_events(repo, position, batch_size)
+            yield late + position.accept(events, gaps)
+            gaps = True
+            if len(events) == batch_size:
+                continue
+
+            while True:
+                try:
+                    batch = await asyncio.wait_for(
+                        subscription.get(), poll_seconds
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if subscription.overflowed:
+                    # Пропущенное дочитывается из журнала
+                    subscription.drain()
+                    break
+                fresh = position.accept(batch)
+                if fresh:
+                    yield fresh
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import Settings, get_settings
+from app.core.database import get_session_factory
+from app.repositories.coil import CoilRepository
+from app.repositories.events import CoilEventRepository
+from app.repositories.idempotency import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+
+def archive_coils(
+    days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    settings: Optional[Settings] = None,
+) -> int:
+    """Переносит в архив рулоны, списанные больше days дней назад.
+
+    Значения по умолчанию берутся из settings (иначе - процесса).
+    """
+    settings = settings or get_settings()
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    before = datetime.now(timezone.utc) - timedelta(days=days)
+    session_factory = get_session_factory()
+    with session_factory() as session:
+        return CoilRepository(session).archive_removed(
+            before, batch_size or settings.ARCHIVE_BATCH_SIZE
+        )
+
+
+def prune_coil_events(
+    hours: Optional[int] = None, settings: Optional[Settings] = None
+) -> int:
+    """Удаляет из журнала ленты события старше hours часов."""
+    if hours is None:
+        hours = (settings or get_settings()).CHANGE_FEED_RETENTION_HOURS
+    before = datetime.now(timezone.utc) - timedelta(hours=hours)
+    session_factory = get_session_factory()
+    with session_factory() as session:
+        deleted = CoilEventRepository(session).prune(before)
+        session.commit()
+        return deleted
+
+
+def prune_idempotency_keys(
+    hours: Optional[int] = None, settings: Optional[Settings] = None
+) -> int:
+    """Удаляет ключи идемпотентности старше hours часов."""
+    if hours is None:
+        hours = (settings or get_settings()).IDEMPOTENCY_TTL_HOURS
+    before = datetime.now(timezone.utc) - timedelta(hours=hours)
+    session_factory = get_session_factory()
+    with session_factory() as session:
+        deleted = IdempotencyRepository(session).prune(before)
+        session.commit()
+        return deleted
+
+
+async def _periodically(
+    job: Callable[[], int], interval: float, done: str, failed: str
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            count = await run_in_threadpool(job)
+        except Exception:
+            # Ошибка (например, параллельный запуск в другом воркере)
+            # не должна останавливать задачу
+            logger.exception(failed)
+            continue
+        if count:
+            logger.info(done, count)
+
+
+async def archive_periodically(
+    interval: float, settings: Optional[Settings] = None
+) -> None:
+    """Фоновый перенос в архив раз в interval секунд."""
+    await _periodically(
+        partial(archive_coils, settings=settings),
+        interval,
+        "Перенесено в архив рулонов: %d",
+        "Ошибка переноса рулонов в архив",
+    )
+
+
+async def prune_events_periodically(
+    interval: float, settings: Optional[Settings] = None
+) -> None:
+    """Фоновая очистка журнала ленты раз в interval секунд."""
+    await _periodically(
+        partial(prune_coil_events, settings=settings),
+        interval,
+        "Удалено событий ленты: %d",
+        "Ошибка очистки журнала ленты",
+    )
+
+
+async def prune_idempotency_keys_periodically(
+    interval: float, settings: Optional[Settings] = None
+) -> None:
+    """Фоновая очистка ключей идемпотентности раз в interval секунд."""
+    await _periodically(
+        partial(prune_idempotency_keys, settings=settings),
+        interval,
+        "Удалено ключей идемпотентности: %d",
+        "Ошибка очистки ключей идемпотентности",
+    )
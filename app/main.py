@@ -1,26 +1,133 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-from app.api.endpoints import coils
-from app.core.config import get_settings
-
-settings = get_settings()
-
-app = FastAPI(
-    title="Severstal Coils API",
-    description="API для управления складом рулонов металла",
-    version="1.0.0",
-    debug=settings.DEBUG,
-)
-
-# Настройка CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Подключаем роутеры
-app.include_router(coils.router, prefix="/api/v1", tags=["coils"])
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+from app.core.config import Settings, get_settings, multiple_workers
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+
+def _lifespan(settings: Settings) -> Any:
+    @asynccontextmanager
+    async def lifespan(app: "FastAPI") -> AsyncIterator[None]:
+        from app.core.database import get_database
+        from app.jobs import (
+            archive_periodically,
+            prune_events_periodically,
+            prune_idempotency_keys_periodically,
+        )
+
+        # Фоновый перенос давно списанных рулонов в архив, очистка
+        # журнала ленты изменений и ключей идемпотентности. При нескольких
+        # воркерах задачи выполнялись бы в каждом из них, поэтому их
+        # запускают по расписанию командами app.cli
+        tasks = []
+        background = not multiple_workers(settings)
+        if background and settings.ARCHIVE_INTERVAL_SECONDS > 0:
+            tasks.append(
+                asyncio.create_task(
+                    archive_periodically(
+                        settings.ARCHIVE_INTERVAL_SECONDS, settings
+                    )
+                )
+            )
+        if (
+            background
+            and settings.CHANGE_FEED_ENABLED
+            and settings.CHANGE_FEED_PRUNE_INTERVAL_SECONDS > 0
+        ):
+            tasks.append(
+                asyncio.create_task(
+                    prune_events_periodically(
+                        settings.CHANGE_FEED_PRUNE_INTERVAL_SECONDS, settings
+                    )
+                )
+            )
+        if background and settings.IDEMPOTENCY_PRUNE_INTERVAL_SECONDS > 0:
+            tasks.append(
+                asyncio.create_task(
+                    prune_idempotency_keys_periodically(
+                        settings.IDEMPOTENCY_PRUNE_INTERVAL_SECONDS, settings
+                    )
+                )
+            )
+        yield
+        for task in tasks:
+            task.cancel()
+        await get_database().dispose()
+
+    return lifespan
+
+
+def create_app(settings: Optional[Settings] = None) -> "FastAPI":
+    """Фабрика приложения.
+
+    FastAPI, роутеры и репозитории импортируются здесь, а не при импорте
+    модуля; движок БД создается при первом запросе. Переданные settings
+    становятся настройками БД процесса и хранятся в app.state.settings:
+    эндпоинты получают их зависимостью get_app_settings и передают
+    репозиториям, кэшу и ленте изменений.
+    """
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app.api.endpoints import coils, monitoring
+    from app.api.middleware import InstrumentationMiddleware
+    from app.core.database import configure_database
+    from app.core.metrics import configure_registry, track_queries
+
+    if settings is None:
+        settings = get_settings()
+    else:
+        configure_database(settings)
+
+    app = FastAPI(
+        title="Severstal Coils API",
+        description="API для управления складом рулонов металла",
+        version="1.0.0",
+        debug=settings.DEBUG,
+        lifespan=_lifespan(settings),
+    )
+    app.state.settings = settings
+
+    # Настройка CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Метрики запросов и учет SQL
+    if settings.METRICS_SQL_ENABLED:
+        track_queries()
+    if settings.METRICS_ENABLED:
+        configure_registry(settings)
+        app.add_middleware(
+            InstrumentationMiddleware,
+            server_timing=settings.SERVER_TIMING_ENABLED,
+        )
+
+    # Подключаем роутеры
+    app.include_router(coils.router, prefix="/api/v1", tags=["coils"])
+    app.include_router(
+        monitoring.router, prefix="/api/v1", tags=["monitoring"]
+    )
+    if settings.METRICS_ENABLED:
+        app.include_router(monitoring.metrics_router, tags=["monitoring"])
+    return app
+
+
+_app: Optional["FastAPI"] = None
+
+
+def __getattr__(name: str) -> Any:
+    # app.main:app (uvicorn, тесты) собирается при первом обращении
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
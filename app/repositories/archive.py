@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, insert, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.selectable import Subquery
+
+from app.domain.models import Coil, CoilArchive
+from app.repositories.sql import to_utc_naive
+
+# Колонки рулона, общие для coils и coils_archive
+ARCHIVED_FIELDS = tuple(column.key for column in Coil.__table__.columns)
+
+
+def coils_with_archive() -> Subquery:
+    """Таблицы coils и coils_archive одной выборкой (UNION ALL)."""
+    return union_all(
+        select(*(Coil.__table__.c[name] for name in ARCHIVED_FIELDS)),
+        select(*(CoilArchive.__table__.c[name] for name in ARCHIVED_FIELDS)),
+    ).subquery("coils_all")
+
+
+def all_coils() -> Any:
+    """Сущность Coil поверх coils и архива.
+
+    Условия на ее колонки PostgreSQL и SQLite переносят внутрь ветвей
+    UNION ALL, так что индексы обеих таблиц используются.
+    """
+    return aliased(Coil, coils_with_archive())
+
+
+def ensure_partitions(connection: Connection, years: Iterable[int]) -> None:
+    """Создает годовые секции coils_archive (только PostgreSQL)."""
+    for year in sorted(set(years)):
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS coils_archive_y{year:d} "
+                "PARTITION OF coils_archive "
+                f"FOR VALUES FROM ('{year:d}-01-01') TO ('{year + 1:d}-01-01')"
+            )
+        )
+
+
+class CoilArchiveRepository:
+    """Архив давно списанных рулонов (холодное хранение).
+
+    Рулоны переносятся в архив целиком, суточные агрегаты при этом не
+    меняются. Запросам архив нужен, только если их период захватывает
+    даты списания архивных рулонов. Рулоны переносят и другие процессы,
+    поэтому граница (cutoff) не кэшируется в процессе: репозиторий
+    читает ее один раз, поиском по индексу removed_at, и запрос видит
+    все рулоны, перенесенные до его начала.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self._cutoff: Optional[datetime] = None
+        self._cutoff_loaded = False
+
+    def cutoff(self) -> Optional[datetime]:
+        """Последняя дата списания в архиве; None - архив пуст."""
+        if not self._cutoff_loaded:
+            self._cutoff = self.session.scalar(
+                select(func.max(CoilArchive.removed_at))
+            )
+            self._cutoff_loaded = True
+        return self._cutoff
+
+    def needed(self, since: Optional[datetime] = None) -> bool:
+        """Могут ли архивные рулоны быть списаны не раньше since."""
+        cutoff = self.cutoff()
+        if cutoff is None:
+            return False
+        return since is None or to_utc_naive(since) <= cutoff
+
+    def get(self, coil_id: int) -> Optional[Dict[str, Any]]:
+        if self.cutoff() is None:
+            return None
+        row = self.session.execute(
+            select(
+                *(getattr(CoilArchive, name) for name in ARCHIVED_FIELDS)
+            ).where(CoilArchive.id == coil_id)
+        ).one_or_none()
+        return dict(row._mapping) if row is not None else None
+
+    def existing(self, ids: Iterable[int]) -> Set[int]:
+        ids = list(ids)
+        if not ids or self.cutoff() is None:
+            return set()
+        return set(
+            self.session.scalars(
+                select(CoilArchive.id).where(CoilArchive.id.in_(ids))
+            )
+        )
+
+    def move_batch(self, before: datetime, batch_size: int) -> List[int]:
+        """Переносит пачку рулонов, списанных раньше before; без commit.
+
+        DELETE ... RETURNING блокирует строки и отдает их актуальное
+        состояние, поэтому параллельные изменения не теряются.
+        """
+        before = to_utc_naive(before)
+        batch = (
+            select(Coil.id)
+            .where(Coil.removed_at < before)
+            .order_by(Coil.id)
+            .limit(batch_size)
+        )
+        rows = self.session.execute(
+            delete(Coil)
+            .where(Coil.id.in_(batch.scalar_subquery()))
+            .returning(*(getattr(Coil, name) for name in ARCHIVED_FIELDS))
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not rows:
+            return []
+
+        connection = self.session.connection()
+        if connection.dialect.name == "postgresql":
+            ensure_partitions(
+                connection, (row.added_at.year for row in rows)
+            )
+        archived_at = datetime.now(timezone.utc)
+        self.session.execute(
+            insert(CoilArchive),
+            [{**row._mapping, "archived_at": archived_at} for row in rows],
+        )
+        self._cutoff_loaded = False
+        return [row.id for row in rows]
+
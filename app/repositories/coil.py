@@ -1,157 +1,1138 @@
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime, time, timedelta, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
-from sqlalchemy import and_, func, or_, select
-from sqlalchemy.orm import Session
+from anyio import to_thread
+from sqlalchemy import (
+    func,
+    insert,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from sqlalchemy.sql.selectable import Select
+from starlette.concurrency import iterate_in_threadpool
 
+from app.core.cache import CacheBackend, get_cache
+from app.core.config import Settings
+from app.core.database import session_settings
+from app.core.events import Event, get_broadcaster
+from app.core.singleflight import get_single_flight
 from app.domain.models import Coil
-from app.schemas.coil import CoilFilter
+from app.repositories.archive import CoilArchiveRepository, all_coils
+from app.repositories.daily_stats import DailyStatsRepository, rollup_enabled
+from app.repositories.events import CoilEventRepository
+from app.repositories.idempotency import (
+    IdempotencyKeyReusedError,
+    IdempotencyRepository,
+    fingerprint,
+)
+from app.repositories.inventory import (
+    Sweep,
+    extremes,
+    fill_forward,
+    snapshot,
+    sweep,
+    window_functions_supported,
+)
+from app.repositories.sql import (
+    SERIES_BUCKETS,
+    as_date,
+    as_datetime,
+    bucket_start,
+    day_of,
+    to_utc_naive,
+    truncate,
+)
+from app.repositories.statements import (
+    COIL_FIELDS,
+    coil_by_id_query,
+    filter_conditions,
+    filter_params,
+    filter_shape,
+    listing_query,
+    rollup_edge_queries,
+    statistics_query,
+)
+from app.schemas.coil import CoilCreate, CoilFilter
+
+T = TypeVar("T")
+
+EMPTY_STATISTICS: Dict[str, Any] = {
+    "added_count": 0,
+    "removed_count": 0,
+    "avg_length": 0,
+    "avg_weight": 0,
+    "min_length": 0,
+    "max_length": 0,
+    "min_weight": 0,
+    "max_weight": 0,
+    "total_weight": 0,
+    "min_storage_time": None,
+    "max_storage_time": None,
+}
+
+
+def _format_seconds(value: Optional[float]) -> Optional[str]:
+    return str(float(value)) if value is not None else None
+
+
+class CoilAlreadyRemovedError(Exception):
+    pass
+
+
+class CoilArchivedError(Exception):
+    """Рулон перенесен в архив и не изменяется."""
+
+
+class VersionConflictError(Exception):
+    """Версия рулона в БД не совпала с ожидаемой."""
+
+    def __init__(self, current_version: int) -> None:
+        super().__init__(f"Текущая версия рулона: {current_version}")
+        self.current_version = current_version
 
 
 class CoilRepository:
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        coil_cache: Optional[CacheBackend] = None,
+        statistics_cache: Optional[CacheBackend] = None,
+        settings: Optional[Settings] = None,
+    ) -> None:
         self.session = session
+        # Настройки приложения; без них - те, с которыми создана сессия
+        self.settings = (
+            settings if settings is not None else session_settings(session)
+        )
+        self.coil_cache = (
+            coil_cache
+            if coil_cache is not None
+            else get_cache("coils", self.settings)
+        )
+        self.statistics_cache = (
+            statistics_cache
+            if statistics_cache is not None
+            else get_cache("statistics", self.settings)
+        )
+        self.archive = CoilArchiveRepository(session)
+        self.events = CoilEventRepository(session)
+        self.idempotency = IdempotencyRepository(
+            session, get_cache("idempotency", self.settings)
+        )
+
+    def _record(self, kind: str, coils: List[Dict[str, Any]]) -> List[Event]:
+        # События пишутся в транзакцию изменения и рассылаются после
+        # commit, поэтому журнал и лента не расходятся с таблицей
+        if not self.settings.CHANGE_FEED_ENABLED:
+            return []
+        return self.events.record(kind, coils)
+
+    def _invalidate(self, coil_id: Optional[int] = None) -> None:
+        # Любое изменение склада меняет статистику за затронутые периоды
+        if coil_id is not None:
+            self.coil_cache.delete(f"coil:{coil_id}")
+        self.statistics_cache.clear()
+
+    def _coils(self, since: Optional[datetime] = None) -> Any:
+        """Рулоны для запроса о периоде, начинающемся с since.
+
+        Архив добавляется, только если в нем могут быть рулоны, списанные
+        не раньше since; иначе запрос идет к одной таблице coils.
+        """
+        return all_coils() if self.archive.needed(since) else Coil
+
+    def _listing_archived(self, filters: Optional[CoilFilter]) -> bool:
+        # В архиве только списанные рулоны
+        if filters and filters.in_stock:
+            return False
+        # Архивные рулоны добавлены и списаны до границы архива, поэтому
+        # нижняя граница фильтра по датам может исключить архив
+        bounds = [
+            period[0]
+            for period in (
+                filters.added_at_range if filters else None,
+                filters.removed_at_range if filters else None,
+            )
+            if period and period[0] is not None
+        ]
+        return self.archive.needed(max(bounds) if bounds else None)
 
-    def create(self, length: float, weight: float) -> Coil:
+    def _listing_coils(self, filters: Optional[CoilFilter]) -> Any:
+        return all_coils() if self._listing_archived(filters) else Coil
+
+    def create(
+        self,
+        length: float,
+        weight: float,
+        idempotency_key: Optional[str] = None,
+    ) -> Coil:
         coil = Coil(length=length, weight=weight)
         self.session.add(coil)
+        self.session.flush()
+        stored = None
+        if idempotency_key is not None:
+            # Ключ пишется в транзакцию рулона: рулон без ключа и ключ
+            # без рулона не фиксируются
+            stored = self.idempotency.save(
+                idempotency_key, fingerprint(length, weight), coil.to_dict()
+            )
+        events = self._record("created", [coil.to_dict()])
         self.session.commit()
         self.session.refresh(coil)
+        self._invalidate()
+        if idempotency_key is not None and stored is not None:
+            self.idempotency.remember(idempotency_key, stored)
+        get_broadcaster().publish(events)
         return coil
 
+    def create_idempotent(
+        self, length: float, weight: float, idempotency_key: str
+    ) -> Tuple[Coil, bool]:
+        """Создание рулона, безопасное для повторов запроса.
+
+        Повтор с тем же ключом возвращает первый рулон без обращения к
+        coils; второй элемент результата - ответ повторный.
+        """
+        stored = self.idempotency.get(idempotency_key)
+        if stored is None:
+            try:
+                coil = self.create(length, weight, idempotency_key)
+                return coil, False
+            except IntegrityError:
+                # Параллельный запрос с тем же ключом успел первым
+                self.session.rollback()
+                stored = self.idempotency.get(idempotency_key)
+                if stored is None:
+                    raise
+        if stored["fingerprint"] != fingerprint(length, weight):
+            raise IdempotencyKeyReusedError()
+        return Coil(**stored["coil"]), True
+
+    def create_many(
+        self, coils: Sequence[CoilCreate], batch_size: int = 500
+    ) -> List[int]:
+        """Создает рулоны пачками в одной транзакции.
+
+        Каждая пачка вставляется одним INSERT ... RETURNING, id
+        возвращаются в порядке входных данных.
+        """
+        ids: List[int] = []
+        events: List[Event] = []
+        connection = self.session.connection()
+        track_rollup = rollup_enabled(connection.dialect.name, self.settings)
+        query = insert(Coil).returning(
+            Coil.id,
+            Coil.added_at,
+            Coil.version,
+            Coil.length,
+            Coil.weight,
+            sort_by_parameter_order=True,
+        )
+        for start in range(0, len(coils), batch_size):
+            batch = coils[start : start + batch_size]
+            rows = [
+                {"length": coil.length, "weight": coil.weight}
+                for coil in batch
+            ]
+            result = self.session.execute(query, rows).all()
+            ids.extend(row.id for row in result)
+            events.extend(
+                self._record("created", [row._asdict() for row in result])
+            )
+            # Пакетная вставка идет мимо событий flush
+            if track_rollup:
+                DailyStatsRepository(connection).record_added(
+                    (row.added_at, coil.length, coil.weight)
+                    for row, coil in zip(result, batch)
+                )
+        self.session.commit()
+        self._invalidate()
+        get_broadcaster().publish(events)
+        return ids
+
     def get_by_id(self, coil_id: int) -> Optional[Coil]:
+        cached = self.coil_cache.get(f"coil:{coil_id}")
+        if cached is not None:
+            return self._attach(cached)
+
         result = self.session.execute(
-            select(Coil).where(Coil.id == coil_id)
+            coil_by_id_query(), {"coil_id": coil_id}
         ).scalar_one_or_none()  # type: Optional[Coil]
-        return result
+        if result is not None:
+            self.coil_cache.set(f"coil:{coil_id}", result.to_dict())
+            return result
+
+        archived = self.archive.get(coil_id)
+        if archived is None:
+            return None
+        self.coil_cache.set(f"coil:{coil_id}", archived)
+        return self._attach(archived)
+
+    def _attach(self, values: Dict[str, Any]) -> Coil:
+        # Привязываем копию к сессии без обращения к БД
+        coil = Coil(**values)
+        make_transient_to_detached(coil)
+        return self.session.merge(coil, load=False)
+
+    def _versioned_update(
+        self,
+        coil_id: int,
+        if_match: Optional[Sequence[int]],
+        values: Dict[str, Any],
+        *conditions: Any,
+    ) -> Optional[Coil]:
+        """UPDATE ... WHERE id AND version RETURNING одним запросом.
+
+        Если строка не обновилась, разбирается причина: рулона нет -
+        возвращается None, иначе исключение о конфликте.
+        """
+        query = (
+            update(Coil)
+            .where(Coil.id == coil_id, *conditions)
+            .values(**values, version=Coil.version + 1)
+            .returning(Coil)
+        )
+        if if_match is not None:
+            query = query.where(Coil.version.in_(if_match))
+        coil = self.session.scalars(query).one_or_none()
+        if coil is not None:
+            return coil
 
-    def remove(self, coil: Coil) -> Coil:
-        coil.removed_at = datetime.now(timezone.utc)
+        current = self.session.execute(
+            select(Coil.removed_at, Coil.version).where(Coil.id == coil_id)
+        ).one_or_none()
+        if current is None:
+            if not self.archive.existing([coil_id]):
+                return None
+            if "removed_at" in values:
+                raise CoilAlreadyRemovedError()
+            raise CoilArchivedError()
+        if "removed_at" in values and current.removed_at is not None:
+            raise CoilAlreadyRemovedError()
+        raise VersionConflictError(current.version)
+
+    def remove(
+        self, coil_id: int, if_match: Optional[Sequence[int]] = None
+    ) -> Optional[Coil]:
+        """Списание рулона; if_match - допустимые версии (If-Match)."""
+        coil = self._versioned_update(
+            coil_id,
+            if_match,
+            {"removed_at": datetime.now(timezone.utc)},
+            Coil.removed_at.is_(None),
+        )
+        if coil is None:
+            return None
+        assert coil.removed_at is not None
+
+        # UPDATE идет мимо flush, поэтому агрегаты обновляются явно
+        connection = self.session.connection()
+        if rollup_enabled(connection.dialect.name, self.settings):
+            DailyStatsRepository(connection).record_removed(
+                coil.added_at, coil.removed_at
+            )
+        events = self._record("removed", [coil.to_dict()])
+        # Отсоединяем до commit, чтобы не перечитывать строку после него
+        self.session.expunge(coil)
         self.session.commit()
-        self.session.refresh(coil)
+        self._invalidate(coil_id)
+        get_broadcaster().publish(events)
         return coil
 
-    def _apply_filters(self, query: Select, filters: CoilFilter) -> Select:
-        if filters.id_range:
-            query = query.where(
-                Coil.id.between(filters.id_range[0], filters.id_range[1])
+    def remove_many(
+        self,
+        ids: Optional[Sequence[int]] = None,
+        filters: Optional[CoilFilter] = None,
+    ) -> Dict[str, List[int]]:
+        """Списание рулонов по списку id или по фильтру одним UPDATE.
+
+        Для списка id дополнительно сообщается, какие из них уже были
+        списаны и каких нет вовсе.
+        """
+        selective = filters is not None and filters.selective
+        if ids is None and not selective:
+            raise ValueError("Нужен список id или непустой фильтр")
+        query = (
+            update(Coil)
+            .where(Coil.removed_at.is_(None))
+            .values(
+                removed_at=datetime.now(timezone.utc),
+                version=Coil.version + 1,
             )
-        if filters.weight_range:
-            query = query.where(
-                Coil.weight.between(
-                    filters.weight_range[0], filters.weight_range[1]
-                )
+            .returning(
+                Coil.id,
+                Coil.added_at,
+                Coil.removed_at,
+                Coil.version,
+                Coil.length,
+                Coil.weight,
             )
-        if filters.length_range:
+            .execution_options(synchronize_session=False)
+        )
+        if ids is not None:
+            query = query.where(Coil.id.in_(ids))
+        if filters:
             query = query.where(
-                Coil.length.between(
-                    filters.length_range[0], filters.length_range[1]
+                *filter_conditions(
+                    self.session.get_bind().dialect.name,
+                    filter_shape(filters),
                 )
             )
-        if filters.added_at_range:
-            query = query.where(
-                Coil.added_at.between(
-                    filters.added_at_range[0], filters.added_at_range[1]
+        rows = self.session.execute(query, filter_params(filters)).all()
+
+        removed = sorted(row.id for row in rows)
+        already_removed: List[int] = []
+        missing: List[int] = []
+        rest = set(ids or ()) - set(removed)
+        if rest:
+            existing = set(
+                self.session.scalars(
+                    select(Coil.id).where(Coil.id.in_(rest))
                 )
             )
-        if filters.removed_at_range:
-            query = query.where(
-                Coil.removed_at.between(
-                    filters.removed_at_range[0], filters.removed_at_range[1]
-                )
+            existing |= self.archive.existing(rest - existing)
+            already_removed = sorted(existing)
+            missing = sorted(rest - existing)
+
+        connection = self.session.connection()
+        if rows and rollup_enabled(connection.dialect.name, self.settings):
+            DailyStatsRepository(connection).record_removed_many(
+                (row.added_at, row.removed_at) for row in rows
             )
-        return query
+        events = self._record("removed", [row._asdict() for row in rows])
+        # Объекты в сессии не синхронизируются с UPDATE: сбрасываем их
+        self.session.expire_all()
+        self.session.commit()
+        for coil_id in removed:
+            self.coil_cache.delete(f"coil:{coil_id}")
+        self._invalidate()
+        get_broadcaster().publish(events)
+        return {
+            "removed": removed,
+            "already_removed": already_removed,
+            "missing": missing,
+        }
+
+    def archive_removed(self, before: datetime, batch_size: int = 1000) -> int:
+        """Переносит в архив рулоны, списанные раньше before.
+
+        Каждая пачка переносится отдельной транзакцией, поэтому перенос
+        можно прервать и продолжить. Возвращает число рулонов.
+        """
+        moved = 0
+        while True:
+            ids = self.archive.move_batch(before, batch_size)
+            self.session.commit()
+            if not ids:
+                break
+            moved += len(ids)
+            for coil_id in ids:
+                self.coil_cache.delete(f"coil:{coil_id}")
+        if moved:
+            self._invalidate()
+        return moved
+
+    def update(
+        self,
+        coil_id: int,
+        length: Optional[float] = None,
+        weight: Optional[float] = None,
+        if_match: Optional[Sequence[int]] = None,
+    ) -> Optional[Coil]:
+        """Изменение рулона; if_match - допустимые версии (If-Match)."""
+        values: Dict[str, Any] = {"updated_at": datetime.now(timezone.utc)}
+        if length is not None:
+            values["length"] = length
+        if weight is not None:
+            values["weight"] = weight
+        coil = self._versioned_update(coil_id, if_match, values)
+        if coil is None:
+            return None
+
+        connection = self.session.connection()
+        if rollup_enabled(connection.dialect.name, self.settings) and (
+            length is not None or weight is not None
+        ):
+            DailyStatsRepository(connection).refresh_days(
+                {to_utc_naive(coil.added_at).date()}
+            )
+        events = self._record("updated", [coil.to_dict()])
+        self.session.expunge(coil)
+        self.session.commit()
+        self._invalidate(coil_id)
+        get_broadcaster().publish(events)
+        return coil
+
+    def get_feed_start(self, after_id: Optional[int]) -> Tuple[int, bool]:
+        """Позиция начала ленты и признак потери событий.
+
+        Без after_id лента начинается с текущего момента. Если события
+        после after_id уже удалены очисткой журнала, клиенту нужно
+        перечитать список целиком.
+        """
+        bounds = self.events.bounds()
+        # Лента читается долго: соединение возвращается в пул между
+        # обращениями к журналу
+        self.session.commit()
+        if after_id is None:
+            return bounds["last"] or 0, False
+        first = bounds["first"]
+        return after_id, first is not None and first > after_id + 1
+
+    def get_events(
+        self, after_id: int, limit: int, until: Optional[int] = None
+    ) -> List[Event]:
+        events = self.events.since(after_id, limit, until)
+        self.session.commit()
+        return events
+
+    def _listing_query(
+        self,
+        filters: Optional[CoilFilter],
+        after_id: Optional[int],
+        archived: Optional[bool],
+        rows: bool,
+        limit: Optional[int],
+        ordered: bool = True,
+    ) -> Tuple[Select, Dict[str, Any]]:
+        # Запрос берется из кэша по форме фильтра, значения - параметры
+        if archived is None:
+            archived = self._listing_archived(filters)
+        params = filter_params(filters)
+        if after_id is not None:
+            params["after_id"] = after_id
+        if limit is not None:
+            params["limit"] = limit
+        order = (filters.order if filters else "asc") if ordered else None
+        query = listing_query(
+            self.session.get_bind().dialect.name,
+            archived,
+            rows,
+            filter_shape(filters),
+            order,
+            after_id is not None,
+            limit is not None,
+        )
+        return query, params
 
     def get_all(self, filters: Optional[CoilFilter] = None) -> List[Coil]:
-        query = select(Coil)
-        if filters:
-            query = self._apply_filters(query, filters)
-        result = self.session.execute(query)
+        query, params = self._listing_query(
+            filters, None, None, rows=False, limit=None, ordered=False
+        )
+        result = self.session.execute(query, params)
         return list(result.scalars().all())
 
+    def _keyset_query(
+        self,
+        filters: Optional[CoilFilter],
+        after_id: Optional[int],
+        archived: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Запрос страницы ORM-объектов и его параметры."""
+        return self._listing_query(
+            filters, after_id, archived, rows=False, limit=limit
+        )
+
+    def get_page(
+        self,
+        filters: Optional[CoilFilter] = None,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Coil], Optional[int]]:
+        """Страница рулонов по ключу id и курсор следующей страницы."""
+        query, params = self._keyset_query(filters, after_id, limit=limit + 1)
+        coils = list(self.session.execute(query, params).scalars().all())
+        if len(coils) > limit:
+            return coils[:limit], coils[limit - 1].id
+        return coils, None
+
+    def iter_batches(
+        self,
+        filters: Optional[CoilFilter] = None,
+        after_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[Coil]]:
+        """Потоковое чтение рулонов пачками по batch_size строк."""
+        query, params = self._keyset_query(filters, after_id)
+        result = self.session.execute(
+            query, params, execution_options={"yield_per": batch_size}
+        )
+        for partition in result.scalars().partitions():
+            yield list(partition)
+
+    def _rows_query(
+        self,
+        filters: Optional[CoilFilter],
+        after_id: Optional[int],
+        archived: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Запрос страницы строк COIL_COLUMNS и его параметры."""
+        return self._listing_query(
+            filters, after_id, archived, rows=True, limit=limit
+        )
+
+    def get_page_rows(
+        self,
+        filters: Optional[CoilFilter] = None,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """То же, что get_page, но строки - словари значений колонок."""
+        query, params = self._rows_query(filters, after_id, limit=limit + 1)
+        rows = [
+            dict(zip(COIL_FIELDS, row))
+            for row in self.session.execute(query, params)
+        ]
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1]["id"]
+        return rows, None
+
+    def iter_row_batches(
+        self,
+        filters: Optional[CoilFilter] = None,
+        after_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        query, params = self._rows_query(filters, after_id)
+        result = self.session.execute(
+            query, params, execution_options={"yield_per": batch_size}
+        )
+        for partition in result.partitions():
+            yield [dict(zip(COIL_FIELDS, row)) for row in partition]
+
+    def _statistics_query(
+        self, start_date: datetime, end_date: datetime
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Запрос статистики за период и его параметры."""
+        query = statistics_query(
+            self.session.get_bind().dialect.name,
+            self.archive.needed(start_date),
+        )
+        return query, {"start_date": start_date, "end_date": end_date}
+
     def get_statistics(
         self, start_date: datetime, end_date: datetime
     ) -> Dict[str, Any]:
-        # Получаем все рулоны в указанный период
-        removed_or_null = or_(
-            Coil.removed_at >= start_date, Coil.removed_at.is_(None)
-        )
-        condition = and_(Coil.added_at <= end_date, removed_or_null)
+        # Один и тот же момент в разных часовых поясах - один ключ
+        start, end = to_utc_naive(start_date), to_utc_naive(end_date)
+        key = f"{start.isoformat()}|{end.isoformat()}"
+        cached = self.statistics_cache.get(key)
+        if cached is not None:
+            return dict(cached)
 
-        coils_in_period = (
-            self.session.execute(select(Coil).where(condition)).scalars().all()
-        )
+        # Запрос получает те же UTC-моменты, что и ключ кэша
+        statistics = self._compute_statistics(start, end)
+        self.statistics_cache.set(key, statistics)
+        return dict(statistics)
+
+    def _compute_statistics(
+        self, start: datetime, end: datetime
+    ) -> Dict[str, Any]:
+        """Статистика за период в UTC без часового пояса."""
+        connection = self.session.connection()
+        if rollup_enabled(connection.dialect.name, self.settings):
+            # Полные сутки внутри периода: [first_day, last_day)
+            first_day = (start - timedelta(microseconds=1)).date()
+            first_day += timedelta(days=1)
+            last_day = end.date()
+            if first_day < last_day:
+                return self._compute_statistics_from_rollup(
+                    start, end, first_day, last_day
+                )
+
+        row = self.session.execute(*self._statistics_query(start, end)).one()
 
         # Если нет рулонов, возвращаем пустую статистику
-        if not coils_in_period:
-            return {
-                "added_count": 0,
-                "removed_count": 0,
-                "avg_length": 0,
-                "avg_weight": 0,
-                "min_length": 0,
-                "max_length": 0,
-                "min_weight": 0,
-                "max_weight": 0,
-                "total_weight": 0,
-                "min_storage_time": None,
-                "max_storage_time": None,
-            }
+        if not row.total_count:
+            return dict(EMPTY_STATISTICS)
+
+        return {
+            "added_count": row.added_count,
+            "removed_count": row.removed_count,
+            "avg_length": row.avg_length,
+            "avg_weight": row.avg_weight,
+            "min_length": row.min_length,
+            "max_length": row.max_length,
+            "min_weight": row.min_weight,
+            "max_weight": row.max_weight,
+            "total_weight": row.total_weight,
+            "min_storage_time": _format_seconds(row.min_storage_time),
+            "max_storage_time": _format_seconds(row.max_storage_time),
+        }
+
+    def _series_query(
+        self, start: datetime, end: datetime, bucket: str
+    ) -> Select:
+        """Движение рулонов по интервалам ряда одним запросом.
 
-        # Подсчет добавленных рулонов
-        added_count = self.session.scalar(
-            select(func.count()).where(
-                Coil.added_at.between(start_date, end_date)
+        Ветка без интервала (NULL) - остаток на складе к началу периода.
+        """
+        dialect = self.session.get_bind().dialect.name
+        coil = self._coils(start)
+        zero = literal(0)
+        opening = select(
+            null().label("bucket"),
+            zero.label("added_count"),
+            zero.label("added_weight"),
+            zero.label("removed_count"),
+            zero.label("removed_weight"),
+            func.count().label("opening_count"),
+            func.coalesce(func.sum(coil.weight), 0).label("opening_weight"),
+        ).where(
+            coil.added_at < start,
+            or_(coil.removed_at.is_(None), coil.removed_at >= start),
+        )
+        added = (
+            select(
+                bucket_start(dialect, coil.added_at, bucket).label("bucket"),
+                func.count().label("added_count"),
+                func.sum(coil.weight).label("added_weight"),
+                zero,
+                zero,
+                zero,
+                zero,
+            )
+            .where(coil.added_at >= start, coil.added_at < end)
+            .group_by(literal_column("bucket"))
+        )
+        removed = (
+            select(
+                bucket_start(dialect, coil.removed_at, bucket).label("bucket"),
+                zero,
+                zero,
+                func.count().label("removed_count"),
+                func.sum(coil.weight).label("removed_weight"),
+                zero,
+                zero,
             )
+            .where(coil.removed_at >= start, coil.removed_at < end)
+            .group_by(literal_column("bucket"))
         )
+        events = union_all(opening, added, removed).subquery()
+        return select(
+            events.c.bucket,
+            func.sum(events.c.added_count).label("added_count"),
+            func.sum(events.c.added_weight).label("added_weight"),
+            func.sum(events.c.removed_count).label("removed_count"),
+            func.sum(events.c.removed_weight).label("removed_weight"),
+            func.sum(events.c.opening_count).label("opening_count"),
+            func.sum(events.c.opening_weight).label("opening_weight"),
+        ).group_by(events.c.bucket)
 
-        # Подсчет удаленных рулонов
-        removed_count = self.session.scalar(
-            select(func.count()).where(
-                Coil.removed_at.between(start_date, end_date)
+    def get_statistics_series(
+        self, start_date: datetime, end_date: datetime, bucket: str
+    ) -> List[Dict[str, Any]]:
+        """Ряд статистики по интервалам [start_date, end_date).
+
+        Для каждого интервала: добавлено и удалено (штук и вес), остаток
+        на складе на конец интервала. Пустые интервалы тоже попадают в ряд.
+        """
+        start, end = to_utc_naive(start_date), to_utc_naive(end_date)
+        key = f"series:{bucket}|{start.isoformat()}|{end.isoformat()}"
+        cached = self.statistics_cache.get(key)
+        if cached is not None:
+            return [dict(point) for point in cached]
+
+        totals = {
+            None if row.bucket is None else as_datetime(row.bucket): row
+            for row in self.session.execute(
+                self._series_query(start, end, bucket)
             )
+        }
+        opening = totals.pop(None, None)
+        # sum() в PostgreSQL возвращает numeric, приводим к int и float
+        in_stock_count = int(opening.opening_count) if opening else 0
+        in_stock_weight = float(opening.opening_weight) if opening else 0.0
+
+        series: List[Dict[str, Any]] = []
+        step = SERIES_BUCKETS[bucket]
+        bucket_at = truncate(start, bucket)
+        while bucket_at < end:
+            row = totals.get(bucket_at)
+            point: Dict[str, Any] = {
+                "start": max(bucket_at, start),
+                "end": min(bucket_at + step, end),
+                "added_count": int(row.added_count) if row else 0,
+                "added_weight": float(row.added_weight) if row else 0.0,
+                "removed_count": int(row.removed_count) if row else 0,
+                "removed_weight": float(row.removed_weight) if row else 0.0,
+            }
+            in_stock_count += point["added_count"] - point["removed_count"]
+            in_stock_weight += point["added_weight"] - point["removed_weight"]
+            point["in_stock_count"] = in_stock_count
+            point["in_stock_weight"] = in_stock_weight
+            series.append(point)
+            bucket_at += step
+
+        self.statistics_cache.set(key, series)
+        return [dict(point) for point in series]
+
+    def _inventory_deltas(self, first_day: date, last_day: date) -> Select:
+        """Изменение остатка на складе по дням [first_day, last_day].
+
+        Остаток к началу периода относится к first_day, поэтому
+        накопительная сумма по дням дает остаток на конец каждого дня.
+        """
+        dialect = self.session.get_bind().dialect.name
+        start = datetime.combine(first_day, time.min)
+        end = datetime.combine(last_day + timedelta(days=1), time.min)
+        coil = self._coils(start)
+        opening = select(
+            day_of(dialect, literal(start)).label("day"),
+            func.count().label("coils"),
+            func.coalesce(func.sum(coil.weight), 0).label("weight"),
+            func.coalesce(func.sum(coil.length), 0).label("length"),
+        ).where(
+            coil.added_at < start,
+            or_(coil.removed_at.is_(None), coil.removed_at >= start),
         )
+        added = (
+            select(
+                day_of(dialect, coil.added_at).label("day"),
+                func.count(),
+                func.sum(coil.weight),
+                func.sum(coil.length),
+            )
+            .where(coil.added_at >= start, coil.added_at < end)
+            .group_by(literal_column("day"))
+        )
+        removed = (
+            select(
+                day_of(dialect, coil.removed_at).label("day"),
+                -func.count(),
+                -func.sum(coil.weight),
+                -func.sum(coil.length),
+            )
+            .where(coil.removed_at >= start, coil.removed_at < end)
+            .group_by(literal_column("day"))
+        )
+        events = union_all(opening, added, removed).subquery()
+        return select(
+            events.c.day,
+            func.sum(events.c.coils).label("coils"),
+            func.sum(events.c.weight).label("weight"),
+            func.sum(events.c.length).label("length"),
+        ).group_by(events.c.day)
+
+    def _inventory_query(self, first_day: date, last_day: date) -> Select:
+        """Остаток на конец каждого дня с событиями: оконная сумма."""
+        deltas = self._inventory_deltas(first_day, last_day).subquery()
+        day = deltas.c.day
+        return select(
+            day,
+            func.sum(deltas.c.coils).over(order_by=day).label("coils"),
+            func.sum(deltas.c.weight).over(order_by=day).label("weight"),
+            func.sum(deltas.c.length).over(order_by=day).label("length"),
+        ).order_by(deltas.c.day)
 
-        # Рассчитываем статистику
-        lengths = [coil.length for coil in coils_in_period]
-        weights = [coil.weight for coil in coils_in_period]
+    def get_inventory(self, first_day: date, last_day: date) -> Dict[str, Any]:
+        """Остатки на складе на конец каждого дня периода (включительно).
 
-        avg_length = sum(lengths) / len(lengths) if lengths else 0
-        avg_weight = sum(weights) / len(weights) if weights else 0
-        min_length = min(lengths) if lengths else 0
-        max_length = max(lengths) if lengths else 0
-        min_weight = min(weights) if weights else 0
-        max_weight = max(weights) if weights else 0
-        total_weight = sum(weights) if weights else 0
+        Возвращает ряд по дням и дни с наибольшим и наименьшим весом.
+        """
+        key = f"inventory:{first_day.isoformat()}|{last_day.isoformat()}"
+        cached = self.statistics_cache.get(key)
+        if cached is not None:
+            return {**cached, "days": [dict(day) for day in cached["days"]]}
 
-        # Максимальный и минимальный промежуток между добавлением и удалением
-        coils_with_removal = [
-            coil for coil in coils_in_period if coil.removed_at is not None
+        days = (last_day - first_day).days + 1
+        sweep_days: Sweep
+        if window_functions_supported(
+            self.session.connection(), self.settings
+        ):
+            query = self._inventory_query(first_day, last_day)
+            sweep_days = fill_forward
+        else:
+            # Без оконных функций накопительная сумма считается в NumPy
+            query = self._inventory_deltas(first_day, last_day)
+            sweep_days = sweep
+        rows = (
+            (
+                as_date(row.day),
+                int(row.coils),
+                float(row.weight),
+                float(row.length),
+            )
+            for row in self.session.execute(query)
+        )
+        levels = [
+            snapshot(level) for level in sweep_days(first_day, days, rows)
         ]
+        max_day, min_day = extremes(levels)
+        inventory = {"days": levels, "max_day": max_day, "min_day": min_day}
 
-        min_diff = None
-        max_diff = None
+        self.statistics_cache.set(key, inventory)
+        return {**inventory, "days": [dict(day) for day in levels]}
 
-        if coils_with_removal:
-            diffs = [
-                (coil.removed_at - coil.added_at).total_seconds()
-                for coil in coils_with_removal
-            ]
-            if diffs:
-                min_diff = str(min(diffs)) if diffs else None
-                max_diff = str(max(diffs)) if diffs else None
+    def _compute_statistics_from_rollup(
+        self,
+        start: datetime,
+        end: datetime,
+        first_day: date,
+        last_day: date,
+    ) -> Dict[str, Any]:
+        """Статистика из суточных агрегатов и крайних неполных суток.
+
+        Рулоны периода делятся на лежавшие на складе к его началу и
+        добавленные в период. Первые считаются по таблице coils через
+        индексы по removed_at, вторые - по coil_daily_stats за полные
+        сутки и по coils за неполные сутки на краях периода. Архив
+        добавляется к coils, если период его захватывает.
+        """
+        in_stock_query, added_query, removed_query = rollup_edge_queries(
+            self.session.get_bind().dialect.name, self.archive.needed(start)
+        )
+        params = {
+            "start": start,
+            "end": end,
+            "first_full": datetime.combine(first_day, datetime.min.time()),
+            "last_full": datetime.combine(last_day, datetime.min.time()),
+        }
+        in_stock = dict(
+            self.session.execute(in_stock_query, params).one()._mapping
+        )
+        added_on_edges = dict(
+            self.session.execute(added_query, params).one()._mapping
+        )
+        removed_on_edges = self.session.scalar(removed_query, params)
+        added_on_days = DailyStatsRepository(
+            self.session.connection()
+        ).summarize(first_day, last_day)
+
+        parts = (in_stock, added_on_edges, added_on_days)
+        count = sum(part["count"] for part in parts)
+        if not count:
+            return dict(EMPTY_STATISTICS)
+
+        def pick(key: str, choose: Callable[..., Any]) -> Any:
+            values = [part[key] for part in parts if part[key] is not None]
+            return choose(values) if values else None
 
+        length_sum = sum(part["length_sum"] for part in parts)
+        weight_sum = sum(part["weight_sum"] for part in parts)
         return {
-            "added_count": added_count or 0,
-            "removed_count": removed_count or 0,
-            "avg_length": avg_length,
-            "avg_weight": avg_weight,
-            "min_length": min_length,
-            "max_length": max_length,
-            "min_weight": min_weight,
-            "max_weight": max_weight,
-            "total_weight": total_weight,
-            "min_storage_time": min_diff,
-            "max_storage_time": max_diff,
+            "added_count": added_on_edges["count"] + added_on_days["count"],
+            "removed_count": (removed_on_edges or 0)
+            + added_on_days["removed_count"],
+            "avg_length": length_sum / count,
+            "avg_weight": weight_sum / count,
+            "min_length": pick("length_min", min),
+            "max_length": pick("length_max", max),
+            "min_weight": pick("weight_min", min),
+            "max_weight": pick("weight_max", max),
+            "total_weight": weight_sum,
+            "min_storage_time": _format_seconds(pick("storage_min", min)),
+            "max_storage_time": _format_seconds(pick("storage_max", max)),
         }
+
+
+class AsyncCoilRepository:
+    """Асинхронный вариант CoilRepository для эндпоинтов.
+
+    С AsyncSession запросы выполняются через AsyncSession.run_sync без
+    блокировки event loop; с обычной Session вызовы CoilRepository
+    уходят в пул потоков.
+    """
+
+    def __init__(
+        self,
+        session: Session | AsyncSession,
+        settings: Optional[Settings] = None,
+    ) -> None:
+        self.session = session
+        self.settings = (
+            settings if settings is not None else session_settings(session)
+        )
+
+    async def _run(
+        self, method: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        def call(session: Session) -> T:
+            repo = CoilRepository(session, settings=self.settings)
+            return method(repo, *args, **kwargs)
+
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(call)
+        return await to_thread.run_sync(call, self.session)
+
+    async def create(self, length: float, weight: float) -> Coil:
+        return await self._run(CoilRepository.create, length, weight)
+
+    async def create_idempotent(
+        self, length: float, weight: float, idempotency_key: str
+    ) -> Tuple[Coil, bool]:
+        return await self._run(
+            CoilRepository.create_idempotent, length, weight, idempotency_key
+        )
+
+    async def create_many(
+        self, coils: Sequence[CoilCreate], batch_size: int = 500
+    ) -> List[int]:
+        return await self._run(CoilRepository.create_many, coils, batch_size)
+
+    async def get_by_id(self, coil_id: int) -> Optional[Coil]:
+        return await self._run(CoilRepository.get_by_id, coil_id)
+
+    async def remove(
+        self, coil_id: int, if_match: Optional[Sequence[int]] = None
+    ) -> Optional[Coil]:
+        return await self._run(CoilRepository.remove, coil_id, if_match)
+
+    async def remove_many(
+        self,
+        ids: Optional[Sequence[int]] = None,
+        filters: Optional[CoilFilter] = None,
+    ) -> Dict[str, List[int]]:
+        return await self._run(CoilRepository.remove_many, ids, filters)
+
+    async def update(
+        self,
+        coil_id: int,
+        length: Optional[float] = None,
+        weight: Optional[float] = None,
+        if_match: Optional[Sequence[int]] = None,
+    ) -> Optional[Coil]:
+        return await self._run(
+            CoilRepository.update, coil_id, length, weight, if_match
+        )
+
+    async def get_feed_start(
+        self, after_id: Optional[int]
+    ) -> Tuple[int, bool]:
+        return await self._run(CoilRepository.get_feed_start, after_id)
+
+    async def get_events(
+        self, after_id: int, limit: int, until: Optional[int] = None
+    ) -> List[Event]:
+        return await self._run(
+            CoilRepository.get_events, after_id, limit, until
+        )
+
+    async def get_all(
+        self, filters: Optional[CoilFilter] = None
+    ) -> List[Coil]:
+        return await self._run(CoilRepository.get_all, filters)
+
+    async def get_page(
+        self,
+        filters: Optional[CoilFilter] = None,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Coil], Optional[int]]:
+        return await self._run(
+            CoilRepository.get_page, filters, limit, after_id
+        )
+
+    async def iter_batches(
+        self,
+        filters: Optional[CoilFilter] = None,
+        after_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Coil]]:
+        if isinstance(self.session, AsyncSession):
+            # Нужен ли архив, выясняется запросом, поэтому через run_sync
+            archived = await self._run(
+                CoilRepository._listing_archived, filters
+            )
+            query, params = CoilRepository(
+                self.session.sync_session
+            )._keyset_query(filters, after_id, archived)
+            result = await self.session.stream_scalars(
+                query, params, execution_options={"yield_per": batch_size}
+            )
+            async for partition in result.partitions():
+                yield list(partition)
+            return
+
+        batches = CoilRepository(self.session).iter_batches(
+            filters, after_id, batch_size
+        )
+        async for batch in iterate_in_threadpool(batches):
+            yield batch
+
+    async def get_page_rows(
+        self,
+        filters: Optional[CoilFilter] = None,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        return await self._run(
+            CoilRepository.get_page_rows, filters, limit, after_id
+        )
+
+    async def iter_row_batches(
+        self,
+        filters: Optional[CoilFilter] = None,
+        after_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        if isinstance(self.session, AsyncSession):
+            # Нужен ли архив, выясняется запросом, поэтому через run_sync
+            archived = await self._run(
+                CoilRepository._listing_archived, filters
+            )
+            query, params = CoilRepository(
+                self.session.sync_session
+            )._rows_query(filters, after_id, archived)
+            result = await self.session.stream(
+                query, params, execution_options={"yield_per": batch_size}
+            )
+            async for partition in result.partitions():
+                yield [dict(zip(COIL_FIELDS, row)) for row in partition]
+            return
+
+        batches = CoilRepository(self.session).iter_row_batches(
+            filters, after_id, batch_size
+        )
+        async for batch in iterate_in_threadpool(batches):
+            yield batch
+
+    async def get_statistics(
+        self, start_date: datetime, end_date: datetime
+    ) -> Dict[str, Any]:
+        if not self.settings.STATS_SINGLE_FLIGHT:
+            return await self._run(
+                CoilRepository.get_statistics, start_date, end_date
+            )
+        # Одинаковые одновременные запросы ждут одно вычисление
+        period = (to_utc_naive(start_date), to_utc_naive(end_date))
+        statistics = await get_single_flight("statistics").do(
+            period,
+            lambda: self._run(CoilRepository.get_statistics, *period),
+        )
+        return dict(statistics)
+
+    async def get_inventory(
+        self, first_day: date, last_day: date
+    ) -> Dict[str, Any]:
+        return await self._run(
+            CoilRepository.get_inventory, first_day, last_day
+        )
+
+    async def get_statistics_series(
+        self, start_date: datetime, end_date: datetime, bucket: str
+    ) -> List[Dict[str, Any]]:
+        return await self._run(
+            CoilRepository.get_statistics_series, start_date, end_date, bucket
+        )
@@ -0,0 +1,353 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, delete, event, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import Select
+
+from app.core.config import Settings
+from app.core.database import session_settings
+from app.domain.models import Coil, CoilDailyStats
+from app.repositories.archive import all_coils
+from app.repositories.sql import (
+    ROLLUP_DIALECTS,
+    as_date,
+    day_of,
+    greatest,
+    least,
+    storage_seconds,
+    storage_seconds_value,
+    to_utc_naive,
+)
+
+ROLLUP_FIELDS = (
+    "added_count",
+    "added_length_sum",
+    "added_length_min",
+    "added_length_max",
+    "added_weight_sum",
+    "added_weight_min",
+    "added_weight_max",
+    "removed_count",
+    "storage_min",
+    "storage_max",
+)
+
+
+def rollup_enabled(dialect_name: str, settings: Settings) -> bool:
+    return settings.STATS_ROLLUP_ENABLED and dialect_name in ROLLUP_DIALECTS
+
+
+def _empty_row(day: date) -> Dict[str, Any]:
+    row: Dict[str, Any] = dict.fromkeys(ROLLUP_FIELDS)
+    row.update(
+        day=day,
+        added_count=0,
+        added_length_sum=0.0,
+        added_weight_sum=0.0,
+        removed_count=0,
+    )
+    return row
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time())
+
+
+class DailyStatsRepository:
+    """Суточные агрегаты coil_daily_stats.
+
+    Работает с Connection, чтобы использоваться и из репозитория, и из
+    обработчиков событий flush. Агрегаты учитывают и рулоны архива:
+    include_archive=False нужен только миграциям до появления архива.
+    """
+
+    def __init__(
+        self, connection: Connection, include_archive: bool = True
+    ) -> None:
+        self.connection = connection
+        self.dialect_name = connection.dialect.name
+        self.coil = all_coils() if include_archive else Coil
+
+    def _insert(self) -> Any:
+        if self.dialect_name == "sqlite":
+            return sqlite_insert(CoilDailyStats)
+        return pg_insert(CoilDailyStats)
+
+    def _increment(self, row: Dict[str, Any]) -> None:
+        """Прибавляет агрегаты к строке дня (upsert)."""
+        stmt = self._insert().values(**row)
+        table = CoilDailyStats
+        new = stmt.excluded
+        dialect = self.dialect_name
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.day],
+            set_={
+                "added_count": table.added_count + new.added_count,
+                "added_length_sum": table.added_length_sum
+                + new.added_length_sum,
+                "added_length_min": least(
+                    dialect, table.added_length_min, new.added_length_min
+                ),
+                "added_length_max": greatest(
+                    dialect, table.added_length_max, new.added_length_max
+                ),
+                "added_weight_sum": table.added_weight_sum
+                + new.added_weight_sum,
+                "added_weight_min": least(
+                    dialect, table.added_weight_min, new.added_weight_min
+                ),
+                "added_weight_max": greatest(
+                    dialect, table.added_weight_max, new.added_weight_max
+                ),
+                "removed_count": table.removed_count + new.removed_count,
+                "storage_min": least(
+                    dialect, table.storage_min, new.storage_min
+                ),
+                "storage_max": greatest(
+                    dialect, table.storage_max, new.storage_max
+                ),
+            },
+        )
+        self.connection.execute(stmt)
+
+    def _replace(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            stmt = self._insert().values(**row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CoilDailyStats.day],
+                set_={field: stmt.excluded[field] for field in ROLLUP_FIELDS},
+            )
+            self.connection.execute(stmt)
+
+    def record_added(
+        self, coils: Iterable[Tuple[datetime, float, float]]
+    ) -> None:
+        """Учитывает добавленные рулоны (added_at, length, weight)."""
+        rows: Dict[date, Dict[str, Any]] = {}
+        for added_at, length, weight in coils:
+            day = to_utc_naive(added_at).date()
+            row = rows.setdefault(day, _empty_row(day))
+            row["added_count"] += 1
+            row["added_length_sum"] += length
+            row["added_weight_sum"] += weight
+            for field, value in (("length", length), ("weight", weight)):
+                low = row[f"added_{field}_min"]
+                high = row[f"added_{field}_max"]
+                row[f"added_{field}_min"] = (
+                    value if low is None else min(low, value)
+                )
+                row[f"added_{field}_max"] = (
+                    value if high is None else max(high, value)
+                )
+        for row in rows.values():
+            self._increment(row)
+
+    def record_removed(self, added_at: datetime, removed_at: datetime) -> None:
+        self.record_removed_many([(added_at, removed_at)])
+
+    def record_removed_many(
+        self, coils: Iterable[Tuple[datetime, datetime]]
+    ) -> None:
+        """Учитывает списанные рулоны (added_at, removed_at).
+
+        Приращения сводятся по дням, так что на каждый затронутый день
+        приходится один upsert.
+        """
+        rows: Dict[date, Dict[str, Any]] = {}
+        for added_at, removed_at in coils:
+            added_at = to_utc_naive(added_at)
+            removed_at = to_utc_naive(removed_at)
+            removed_day = removed_at.date()
+            row = rows.setdefault(removed_day, _empty_row(removed_day))
+            row["removed_count"] += 1
+
+            storage = storage_seconds_value(
+                self.dialect_name, added_at, removed_at
+            )
+            added_day = added_at.date()
+            row = rows.setdefault(added_day, _empty_row(added_day))
+            low, high = row["storage_min"], row["storage_max"]
+            row["storage_min"] = (
+                storage if low is None else min(low, storage)
+            )
+            row["storage_max"] = (
+                storage if high is None else max(high, storage)
+            )
+        for row in rows.values():
+            self._increment(row)
+
+    def _collect(
+        self,
+        added_filter: Optional[ColumnElement[bool]] = None,
+        removed_filter: Optional[ColumnElement[bool]] = None,
+    ) -> Dict[date, Dict[str, Any]]:
+        """Считает суточные агрегаты по рулонам coils и архива."""
+        coil = self.coil
+        added_day = day_of(self.dialect_name, coil.added_at)
+        storage = storage_seconds(self.dialect_name, coil)
+        added = select(
+            added_day.label("day"),
+            func.count().label("added_count"),
+            func.sum(coil.length).label("added_length_sum"),
+            func.min(coil.length).label("added_length_min"),
+            func.max(coil.length).label("added_length_max"),
+            func.sum(coil.weight).label("added_weight_sum"),
+            func.min(coil.weight).label("added_weight_min"),
+            func.max(coil.weight).label("added_weight_max"),
+            func.min(storage).label("storage_min"),
+            func.max(storage).label("storage_max"),
+        ).group_by(added_day)
+        if added_filter is not None:
+            added = added.where(added_filter)
+
+        removed_day = day_of(self.dialect_name, coil.removed_at)
+        removed = (
+            select(removed_day.label("day"), func.count().label("count"))
+            .where(coil.removed_at.is_not(None))
+            .group_by(removed_day)
+        )
+        if removed_filter is not None:
+            removed = removed.where(removed_filter)
+
+        rows: Dict[date, Dict[str, Any]] = {}
+        for row in self.connection.execute(added).mappings():
+            day = as_date(row["day"])
+            rows[day] = {**_empty_row(day), **row, "day": day}
+        for day_value, count in self.connection.execute(removed).all():
+            day = as_date(day_value)
+            rows.setdefault(day, _empty_row(day))["removed_count"] = count
+        return rows
+
+    def refresh_days(self, days: Set[date]) -> None:
+        """Пересчитывает строки указанных дней по рулонам."""
+        # Дни в одном порядке: два пересчета не ждут друг друга по кругу
+        for day in sorted(days):
+            # Нулевое приращение вставляет строку дня или блокирует
+            # существующую до commit. Иначе приращение рулона того же дня,
+            # зафиксированное между _collect и _replace, затиралось бы
+            self._increment(_empty_row(day))
+            start, end = _day_start(day), _day_start(day + timedelta(days=1))
+            rows = self._collect(
+                and_(self.coil.added_at >= start, self.coil.added_at < end),
+                and_(
+                    self.coil.removed_at >= start, self.coil.removed_at < end
+                ),
+            )
+            self._replace([rows.get(day, _empty_row(day))])
+
+    def rebuild(self) -> int:
+        """Полностью пересобирает coil_daily_stats, возвращает число дней."""
+        rows = self._collect()
+        self.connection.execute(delete(CoilDailyStats))
+        if rows:
+            self.connection.execute(
+                insert(CoilDailyStats), list(rows.values())
+            )
+        return len(rows)
+
+    def summarize(self, first_day: date, last_day: date) -> Dict[str, Any]:
+        """Агрегаты за дни [first_day, last_day)."""
+        row = self.connection.execute(
+            _summary_query(), {"first_day": first_day, "last_day": last_day}
+        ).one()
+        return dict(row._mapping)
+
+
+@lru_cache()
+def _summary_query() -> Select:
+    # Строится один раз, дни передаются параметрами
+    table = CoilDailyStats
+    return select(
+        func.coalesce(func.sum(table.added_count), 0).label("count"),
+        func.coalesce(func.sum(table.added_length_sum), 0).label("length_sum"),
+        func.min(table.added_length_min).label("length_min"),
+        func.max(table.added_length_max).label("length_max"),
+        func.coalesce(func.sum(table.added_weight_sum), 0).label("weight_sum"),
+        func.min(table.added_weight_min).label("weight_min"),
+        func.max(table.added_weight_max).label("weight_max"),
+        func.min(table.storage_min).label("storage_min"),
+        func.max(table.storage_max).label("storage_max"),
+        func.coalesce(func.sum(table.removed_count), 0).label(
+            "removed_count"
+        ),
+    ).where(
+        table.day >= bindparam("first_day"), table.day < bindparam("last_day")
+    )
+
+
+def rebuild_daily_stats(session: Session, include_archive: bool = True) -> int:
+    days = DailyStatsRepository(
+        session.connection(), include_archive
+    ).rebuild()
+    session.commit()
+    return days
+
+
+# Поддержка агрегатов при изменении рулонов через ORM (create, remove,
+# update); пакетная вставка create_many учитывается в репозитории.
+
+
+def _dates(values: Iterable[Any]) -> Set[date]:
+    return {to_utc_naive(value).date() for value in values if value}
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_daily_stats(session: Session, flush_context: Any) -> None:
+    connection = session.connection()
+    if not rollup_enabled(connection.dialect.name, session_settings(session)):
+        return
+
+    added = []
+    removed = []
+    refresh: Set[date] = set()
+    for coil in session.new:
+        if isinstance(coil, Coil):
+            added.append((coil.added_at, coil.length, coil.weight))
+            if coil.removed_at is not None:
+                removed.append((coil.added_at, coil.removed_at))
+
+    for coil in session.dirty:
+        if not isinstance(coil, Coil):
+            continue
+        history = {
+            name: get_history(coil, name)
+            for name in ("added_at", "removed_at", "length", "weight")
+        }
+        changed = {
+            name for name, item in history.items() if item.has_changes()
+        }
+        if not changed:
+            continue
+        # Обычное списание рулона учитывается инкрементально, остальные
+        # изменения - пересчетом затронутых дней
+        if (
+            changed == {"removed_at"}
+            and not any(history["removed_at"].deleted)
+            and coil.removed_at is not None
+        ):
+            removed.append((coil.added_at, coil.removed_at))
+            continue
+        refresh.add(to_utc_naive(coil.added_at).date())
+        for name in ("added_at", "removed_at"):
+            refresh.update(_dates(history[name].added))
+            refresh.update(_dates(history[name].deleted))
+
+    for coil in session.deleted:
+        if isinstance(coil, Coil):
+            refresh.update(_dates([coil.added_at, coil.removed_at]))
+
+    repo = DailyStatsRepository(connection)
+    if added:
+        repo.record_added(added)
+    if removed:
+        repo.record_removed_many(removed)
+    # Пересчет идет последним и перекрывает приращения тех же дней
+    if refresh:
+        repo.refresh_days(refresh)
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, cast
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from app.core.events import Event
+from app.domain.models import CoilEvent
+from app.repositories.sql import to_utc_naive
+
+# Поле рулона, которое хранит время события каждого вида
+EVENT_KINDS = {
+    "created": "added_at",
+    "updated": "updated_at",
+    "removed": "removed_at",
+}
+EVENT_COLUMNS = (
+    CoilEvent.id,
+    CoilEvent.kind,
+    CoilEvent.coil_id,
+    CoilEvent.version,
+    CoilEvent.length,
+    CoilEvent.weight,
+    CoilEvent.occurred_at,
+)
+EVENT_FIELDS = tuple(column.key for column in EVENT_COLUMNS)
+
+
+class CoilEventRepository:
+    """Журнал изменений рулонов (таблица coil_events)."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def record(
+        self, kind: str, coils: Iterable[Mapping[str, Any]]
+    ) -> List[Event]:
+        """Записывает события в текущую транзакцию, без commit.
+
+        coils - значения рулонов после изменения (id, version, length,
+        weight и поле времени события). Возвращает записанные события.
+        """
+        field = EVENT_KINDS[kind]
+        rows = [
+            {
+                "kind": kind,
+                "coil_id": coil["id"],
+                "version": coil["version"],
+                "length": coil["length"],
+                "weight": coil["weight"],
+                "occurred_at": to_utc_naive(coil[field]),
+            }
+            for coil in coils
+        ]
+        if not rows:
+            return []
+        result = self.session.execute(
+            insert(CoilEvent).returning(
+                *EVENT_COLUMNS, sort_by_parameter_order=True
+            ),
+            rows,
+        )
+        return [dict(zip(EVENT_FIELDS, row)) for row in result]
+
+    def since(
+        self, after_id: int, limit: int, until: Optional[int] = None
+    ) -> List[Event]:
+        """События после after_id (до until включительно) в порядке id."""
+        query = select(*EVENT_COLUMNS).where(CoilEvent.id > after_id)
+        if until is not None:
+            query = query.where(CoilEvent.id <= until)
+        result = self.session.execute(
+            query.order_by(CoilEvent.id).limit(limit)
+        )
+        return [dict(zip(EVENT_FIELDS, row)) for row in result]
+
+    def bounds(self) -> Dict[str, Optional[int]]:
+        """Наименьший и наибольший id в журнале."""
+        first, last = self.session.execute(
+            select(func.min(CoilEvent.id), func.max(CoilEvent.id))
+        ).one()
+        return {"first": first, "last": last}
+
+    def prune(self, before: datetime) -> int:
+        """Удаляет события старше before, без commit."""
+        result = self.session.execute(
+            delete(CoilEvent).where(
+                CoilEvent.occurred_at < to_utc_naive(before)
+            )
+        )
+        return cast(CursorResult[Any], result).rowcount
@@ -0,0 +1,93 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, cast
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, get_cache
+from app.core.database import session_settings
+from app.domain.models import IdempotencyKey
+from app.repositories.sql import to_utc_naive
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Ключ идемпотентности уже использован с другим телом запроса."""
+
+
+def fingerprint(*values: Any) -> str:
+    """Отпечаток тела запроса для сверки повторов."""
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+
+class IdempotencyRepository:
+    """Сохраненные ответы по ключам Idempotency-Key.
+
+    Перед таблицей стоит LRU-кэш процесса: повтор, пришедший в тот же
+    воркер, не обращается к БД.
+    """
+
+    def __init__(
+        self, session: Session, cache: Optional[CacheBackend] = None
+    ) -> None:
+        self.session = session
+        self.cache = (
+            cache
+            if cache is not None
+            else get_cache("idempotency", session_settings(session))
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Сохраненный ответ: fingerprint и значения рулона."""
+        cached: Optional[Dict[str, Any]] = self.cache.get(key)
+        if cached is not None:
+            return cached
+        row = self.session.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.response).where(
+                IdempotencyKey.key == key
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+        stored = {
+            "fingerprint": row.fingerprint,
+            "coil": json.loads(row.response),
+        }
+        self.cache.set(key, stored)
+        return stored
+
+    def save(
+        self, key: str, fingerprint: str, coil: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Записывает ответ в текущую транзакцию, без commit.
+
+        Повторный ключ дает IntegrityError: параллельный запрос с тем же
+        ключом уже создал рулон.
+        """
+        # Даты приводятся к виду, в котором их вернет БД
+        values = {
+            name: to_utc_naive(value) if isinstance(value, datetime) else value
+            for name, value in coil.items()
+        }
+        response = json.dumps(values, default=lambda value: value.isoformat())
+        self.session.execute(
+            insert(IdempotencyKey).values(
+                key=key, fingerprint=fingerprint, response=response
+            )
+        )
+        return {"fingerprint": fingerprint, "coil": json.loads(response)}
+
+    def remember(self, key: str, stored: Dict[str, Any]) -> None:
+        """Кладет ответ в кэш после commit."""
+        self.cache.set(key, stored)
+
+    def prune(self, before: datetime) -> int:
+        """Удаляет ключи старше before, без commit."""
+        result = self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.created_at < to_utc_naive(before)
+            )
+        )
+        return cast(CursorResult[Any], result).rowcount
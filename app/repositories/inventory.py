@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy.engine import Connection
+
+from app.core.config import Settings
+
+# Остаток на складе: количество, суммарный вес и длина
+Level = Tuple[int, float, float]
+DayLevel = Tuple[date, int, float, float]
+# Остатки по дням периода из строк запроса: fill_forward или sweep
+Sweep = Callable[[date, int, Iterable[DayLevel]], List[DayLevel]]
+
+# Минимальная версия SQLite с оконными функциями
+SQLITE_WINDOW_VERSION = (3, 25, 0)
+
+
+def window_functions_supported(
+    connection: Connection, settings: Settings
+) -> bool:
+    """Считать остатки оконными функциями в БД, а не на стороне Python."""
+    if not settings.INVENTORY_SQL_WINDOW:
+        return False
+    dialect = connection.dialect
+    if dialect.name == "postgresql":
+        return True
+    if dialect.name == "sqlite":
+        version = getattr(dialect.dbapi, "sqlite_version_info", (0, 0, 0))
+        return tuple(version) >= SQLITE_WINDOW_VERSION
+    return False
+
+
+@lru_cache()
+def _numpy() -> Any:
+    # numpy импортируется при первом расчете остатков, а не при старте
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - numpy необязателен
+        return None
+    return numpy
+
+
+def _day_index(first_day: date, days: int, day: date) -> int:
+    index = (day - first_day).days
+    if not 0 <= index < days:
+        raise ValueError(f"День {day} вне периода")
+    return index
+
+
+def fill_forward(
+    first_day: date, days: int, levels: Iterable[DayLevel]
+) -> List[DayLevel]:
+    """Остатки на каждый день по остаткам на дни с событиями."""
+    known = {level[0]: level[1:] for level in levels}
+    result: List[DayLevel] = []
+    level: Level = (0, 0.0, 0.0)
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        level = known.get(day, level)
+        result.append((day, *level))
+    return result
+
+
+def sweep(
+    first_day: date, days: int, deltas: Iterable[DayLevel]
+) -> List[DayLevel]:
+    """Остатки на каждый день по изменениям за день (накопительная сумма)."""
+    rows = list(deltas)
+    np = _numpy()
+    if np is not None:
+        changes = np.zeros((3, days))
+        for day, count, weight, length in rows:
+            changes[:, _day_index(first_day, days, day)] = (
+                count,
+                weight,
+                length,
+            )
+        counts, weights, lengths = np.cumsum(changes, axis=1)
+        return [
+            (
+                first_day + timedelta(days=offset),
+                int(round(counts[offset])),
+                float(weights[offset]),
+                float(lengths[offset]),
+            )
+            for offset in range(days)
+        ]
+
+    daily: List[Level] = [(0, 0.0, 0.0)] * days
+    for day, count, weight, length in rows:
+        daily[_day_index(first_day, days, day)] = (count, weight, length)
+    levels = accumulate(
+        daily,
+        lambda total, change: (
+            total[0] + change[0],
+            total[1] + change[1],
+            total[2] + change[2],
+        ),
+    )
+    return [
+        (first_day + timedelta(days=offset), *level)
+        for offset, level in enumerate(levels)
+    ]
+
+
+def snapshot(level: DayLevel) -> Dict[str, Any]:
+    day, count, weight, length = level
+    # Накопительные суммы float дают хвосты вроде 1e-13
+    return {
+        "day": day,
+        "count": int(count),
+        "total_weight": round(float(weight), 6),
+        "total_length": round(float(length), 6),
+    }
+
+
+def extremes(
+    levels: Sequence[Dict[str, Any]]
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Дни с наибольшим и наименьшим весом на складе (первые из равных)."""
+    if not levels:
+        return None, None
+    max_day = max(levels, key=lambda level: level["total_weight"])
+    min_day = min(levels, key=lambda level: level["total_weight"])
+    return max_day, min_day
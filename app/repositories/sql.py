@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Date, cast, func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.domain.models import Coil
+
+# Диалекты, для которых поддерживаются upsert и суточные агрегаты
+ROLLUP_DIALECTS = ("postgresql", "sqlite")
+
+
+def storage_seconds(dialect_name: str, coil: Any = Coil) -> ColumnElement[Any]:
+    """Время хранения рулона (removed_at - added_at) в секундах.
+
+    coil - Coil или его псевдоним (например, вместе с архивом).
+    """
+    if dialect_name == "sqlite":
+        # julianday имеет точность порядка десятков микросекунд,
+        # поэтому округляем до миллисекунд
+        return func.round(
+            (func.julianday(coil.removed_at) - func.julianday(coil.added_at))
+            * 86400.0,
+            3,
+        )
+    return func.extract("epoch", coil.removed_at - coil.added_at)
+
+
+def _sqlite_milliseconds(value: datetime) -> int:
+    # SQLite разбирает время с точностью до миллисекунды, округляя
+    # дробные секунды
+    seconds = value.second + value.microsecond / 1e6
+    minutes = (value.toordinal() * 24 + value.hour) * 60 + value.minute
+    return minutes * 60000 + int(seconds * 1000 + 0.5)
+
+
+def storage_seconds_value(
+    dialect_name: str, added_at: datetime, removed_at: datetime
+) -> float:
+    """Время хранения в секундах, как его считает storage_seconds."""
+    if dialect_name == "sqlite":
+        return (
+            _sqlite_milliseconds(removed_at) - _sqlite_milliseconds(added_at)
+        ) / 1000
+    return (removed_at - added_at).total_seconds()
+
+
+# Доля строк, которую SQLite без статистики отводит диапазону с обеими
+# границами
+_SQLITE_RANGE_LIKELIHOOD = "0.0625"
+
+
+def half_open(dialect_name: str, condition: Any) -> ColumnElement[Any]:
+    """Сравнение колонки с единственной границей диапазона.
+
+    Одностороннее сравнение SQLite считает малоизбирательным и вместо
+    индекса читает всю таблицу в порядке id. likelihood() дает ему ту же
+    оценку, что и у диапазона с двумя границами; индекс при этом
+    по-прежнему применим.
+    """
+    if dialect_name == "sqlite":
+        # Вероятность должна быть константой, а не параметром
+        return func.likelihood(
+            condition, literal_column(_SQLITE_RANGE_LIKELIHOOD)
+        )
+    return condition  # type: ignore[no-any-return]
+
+
+def day_of(dialect_name: str, column: Any) -> ColumnElement[Any]:
+    """Календарный день значения DateTime."""
+    if dialect_name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+# Размеры интервалов ряда статистики
+SERIES_BUCKETS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+# Начало интервала в SQLite: strftime с модификаторами; неделя с понедельника
+_SQLITE_BUCKETS = {
+    "hour": ("%Y-%m-%d %H:00:00",),
+    "day": ("%Y-%m-%d 00:00:00",),
+    "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+}
+
+
+def bucket_start(
+    dialect_name: str, column: Any, bucket: str
+) -> ColumnElement[Any]:
+    """Начало интервала ряда (час, день, неделя), в которое попадает дата."""
+    if dialect_name == "sqlite":
+        fmt, *modifiers = _SQLITE_BUCKETS[bucket]
+        return func.strftime(fmt, column, *modifiers)
+    return func.date_trunc(bucket, column)
+
+
+def truncate(value: datetime, bucket: str) -> datetime:
+    """То же, что bucket_start, но на стороне Python."""
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def least(dialect_name: str, a: Any, b: Any) -> ColumnElement[Any]:
+    """Минимум из двух значений, NULL не учитывается."""
+    name = "min" if dialect_name == "sqlite" else "least"
+    value: ColumnElement[Any] = getattr(func, name)(
+        func.coalesce(a, b), func.coalesce(b, a)
+    )
+    return value
+
+
+def greatest(dialect_name: str, a: Any, b: Any) -> ColumnElement[Any]:
+    """Максимум из двух значений, NULL не учитывается."""
+    name = "max" if dialect_name == "sqlite" else "greatest"
+    value: ColumnElement[Any] = getattr(func, name)(
+        func.coalesce(a, b), func.coalesce(b, a)
+    )
+    return value
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Даты хранятся в БД без часового пояса, в UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def as_datetime(value: Any) -> datetime:
+    # SQLite возвращает strftime(...) строкой
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value  # type: ignore[no-any-return]
+
+
+def as_date(value: Any) -> date:
+    # SQLite возвращает date(...) строкой
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value  # type: ignore[no-any-return]
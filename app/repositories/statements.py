@@ -0,0 +1,243 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import (
+    Integer,
+    and_,
+    bindparam,
+    case,
+    func,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.selectable import CompoundSelect, Select
+
+from app.domain.models import Coil
+from app.repositories.archive import all_coils
+from app.repositories.sql import half_open, storage_seconds
+from app.schemas.coil import CoilFilter
+
+# Запросы горячих путей строятся один раз на форму: диалект, нужен ли
+# архив, какие условия фильтра заданы. Значения подставляются при
+# выполнении через именованные параметры, поэтому каждый вызов не
+# собирает select() заново и не вычисляет для него ключ кэша компиляции.
+
+# Колонки для быстрой выдачи списка без ORM-объектов, в порядке полей
+# CoilResponse
+COIL_COLUMNS = (
+    Coil.length,
+    Coil.weight,
+    Coil.id,
+    Coil.added_at,
+    Coil.removed_at,
+    Coil.updated_at,
+    Coil.version,
+)
+COIL_FIELDS = tuple(column.key for column in COIL_COLUMNS)
+
+# Диапазоны CoilFilter: колонка и поле фильтра. Границы передаются
+# параметрами <колонка>_min и <колонка>_max
+FILTER_RANGES = (
+    ("id", "id_range"),
+    ("weight", "weight_range"),
+    ("length", "length_range"),
+    ("added_at", "added_at_range"),
+    ("removed_at", "removed_at_range"),
+)
+
+# Имена заданных параметров фильтра и "in_stock" - ключ кэша запросов
+FilterShape = Tuple[str, ...]
+
+
+def filter_params(filters: Optional[CoilFilter]) -> Dict[str, Any]:
+    """Значения заданных границ фильтра по именам параметров."""
+    params: Dict[str, Any] = {}
+    if filters is None:
+        return params
+    for column, field in FILTER_RANGES:
+        period = getattr(filters, field)
+        if period is None:
+            continue
+        for suffix, value in zip(("min", "max"), period):
+            if value is not None:
+                params[f"{column}_{suffix}"] = value
+    return params
+
+
+def filter_shape(filters: Optional[CoilFilter]) -> FilterShape:
+    """Какие условия фильтра заданы, без их значений."""
+    shape = tuple(filter_params(filters))
+    if filters is not None and filters.in_stock:
+        shape += ("in_stock",)
+    return shape
+
+
+def filter_conditions(
+    dialect_name: str, shape: FilterShape, coil: Any = Coil
+) -> List[Any]:
+    """Условия фильтра формы shape для SELECT и UPDATE."""
+    conditions = []
+    for name, _ in FILTER_RANGES:
+        column = getattr(coil, name)
+        low, high = f"{name}_min", f"{name}_max"
+        # Каждая граница - отдельное сравнение с колонкой, без функций
+        # над ней, поэтому индекс по колонке применим и к полуоткрытому
+        # диапазону
+        if low in shape and high in shape:
+            conditions += [column >= bindparam(low), column <= bindparam(high)]
+        elif low in shape:
+            conditions.append(
+                half_open(dialect_name, column >= bindparam(low))
+            )
+        elif high in shape:
+            conditions.append(
+                half_open(dialect_name, column <= bindparam(high))
+            )
+    if "in_stock" in shape:
+        # Условие частичного индекса ix_coils_in_stock
+        conditions.append(coil.removed_at.is_(None))
+    return conditions
+
+
+@lru_cache()
+def coil_by_id_query() -> Select:
+    """Рулон по параметру coil_id."""
+    return select(Coil).where(Coil.id == bindparam("coil_id"))
+
+
+@lru_cache(maxsize=1024)
+def listing_query(
+    dialect_name: str,
+    archived: bool,
+    rows: bool,
+    shape: FilterShape,
+    order: Optional[str],
+    after: bool,
+    limited: bool,
+) -> Select:
+    """Выборка рулонов для списка, страницы или выгрузки.
+
+    rows - колонки COIL_COLUMNS вместо ORM-объектов; order - порядок по
+    id ("asc", "desc") или None; after и limited добавляют параметры
+    after_id и limit.
+    """
+    coil = all_coils() if archived else Coil
+    if rows:
+        query = select(*(getattr(coil, field) for field in COIL_FIELDS))
+    else:
+        query = select(coil)
+    conditions = filter_conditions(dialect_name, shape, coil)
+    # Курсор - id последней строки страницы в выбранном порядке
+    if order == "desc":
+        query = query.order_by(coil.id.desc())
+        if after:
+            conditions.append(coil.id < bindparam("after_id"))
+    elif order == "asc":
+        query = query.order_by(coil.id)
+        if after:
+            conditions.append(coil.id > bindparam("after_id"))
+    if conditions:
+        query = query.where(*conditions)
+    if limited:
+        query = query.limit(bindparam("limit", type_=Integer))
+    return query
+
+
+@lru_cache()
+def statistics_query(dialect_name: str, archived: bool) -> Select:
+    """Статистика за период [start_date, end_date] одним запросом."""
+    coil = all_coils() if archived else Coil
+    start: BindParameter[datetime] = bindparam("start_date")
+    end: BindParameter[datetime] = bindparam("end_date")
+    # Рулоны, находившиеся на складе в указанный период
+    removed_or_null = or_(coil.removed_at >= start, coil.removed_at.is_(None))
+    condition = and_(coil.added_at <= end, removed_or_null)
+
+    # Вся статистика считается одним запросом без загрузки объектов
+    storage_time = storage_seconds(dialect_name, coil)
+    return select(
+        func.count(coil.id).label("total_count"),
+        func.count(case((coil.added_at.between(start, end), 1))).label(
+            "added_count"
+        ),
+        func.count(case((coil.removed_at.between(start, end), 1))).label(
+            "removed_count"
+        ),
+        func.avg(coil.length).label("avg_length"),
+        func.avg(coil.weight).label("avg_weight"),
+        func.min(coil.length).label("min_length"),
+        func.max(coil.length).label("max_length"),
+        func.min(coil.weight).label("min_weight"),
+        func.max(coil.weight).label("max_weight"),
+        func.sum(coil.weight).label("total_weight"),
+        func.min(storage_time).label("min_storage_time"),
+        func.max(storage_time).label("max_storage_time"),
+    ).where(condition)
+
+
+def _partial_statistics(source: Union[Select, CompoundSelect]) -> Select:
+    # Агрегаты по выборке с колонками length, weight, storage
+    rows = source.subquery()
+    return select(
+        func.count().label("count"),
+        func.coalesce(func.sum(rows.c.length), 0).label("length_sum"),
+        func.min(rows.c.length).label("length_min"),
+        func.max(rows.c.length).label("length_max"),
+        func.coalesce(func.sum(rows.c.weight), 0).label("weight_sum"),
+        func.min(rows.c.weight).label("weight_min"),
+        func.max(rows.c.weight).label("weight_max"),
+        func.min(rows.c.storage).label("storage_min"),
+        func.max(rows.c.storage).label("storage_max"),
+    )
+
+
+@lru_cache()
+def rollup_edge_queries(
+    dialect_name: str, archived: bool
+) -> Tuple[Select, Select, Select]:
+    """Запросы к coils для статистики по суточным агрегатам.
+
+    Параметры: start, end - период; first_full, last_full - начало
+    первых и конец последних полных суток. Возвращает агрегаты по
+    рулонам на складе к началу периода, по добавленным в неполные
+    сутки на краях и число списанных в эти сутки.
+    """
+    coil = all_coils() if archived else Coil
+    start: BindParameter[datetime] = bindparam("start")
+    end: BindParameter[datetime] = bindparam("end")
+    first_full: BindParameter[datetime] = bindparam("first_full")
+    last_full: BindParameter[datetime] = bindparam("last_full")
+    columns = (
+        coil.length,
+        coil.weight,
+        storage_seconds(dialect_name, coil).label("storage"),
+    )
+
+    in_stock = _partial_statistics(
+        union_all(
+            select(*columns).where(
+                coil.added_at < start, coil.removed_at >= start
+            ),
+            select(*columns).where(
+                coil.added_at < start, coil.removed_at.is_(None)
+            ),
+        )
+    )
+    added_on_edges = _partial_statistics(
+        select(*columns).where(
+            or_(
+                and_(coil.added_at >= start, coil.added_at < first_full),
+                and_(coil.added_at >= last_full, coil.added_at <= end),
+            )
+        )
+    )
+    removed_on_edges = select(func.count()).where(
+        or_(
+            and_(coil.removed_at >= start, coil.removed_at < first_full),
+            and_(coil.removed_at >= last_full, coil.removed_at <= end),
+        )
+    )
+    return in_stock, added_on_edges, removed_on_edges
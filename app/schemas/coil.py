@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional, Tuple
+from datetime import date, datetime
+from typing import Any, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -27,6 +27,7 @@ class CoilInDB(CoilBase):
     added_at: datetime
     removed_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    version: int = 1
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -40,12 +41,44 @@ class DateRange(BaseModel):
     end_date: datetime
 
 
+class StatisticsSeriesRequest(DateRange):
+    bucket: Literal["hour", "day", "week"] = "day"
+
+
+class InventoryRequest(BaseModel):
+    start_date: date
+    end_date: date
+
+
 class CoilFilter(BaseModel):
-    id_range: Optional[Tuple[int, int]] = None
-    weight_range: Optional[Tuple[float, float]] = None
-    length_range: Optional[Tuple[float, float]] = None
-    added_at_range: Optional[Tuple[datetime, datetime]] = None
-    removed_at_range: Optional[Tuple[datetime, datetime]] = None
+    """Диапазоны включают границы; None вместо границы - без ограничения"""
+
+    id_range: Optional[Tuple[Optional[int], Optional[int]]] = None
+    weight_range: Optional[Tuple[Optional[float], Optional[float]]] = None
+    length_range: Optional[Tuple[Optional[float], Optional[float]]] = None
+    added_at_range: Optional[
+        Tuple[Optional[datetime], Optional[datetime]]
+    ] = None
+    removed_at_range: Optional[
+        Tuple[Optional[datetime], Optional[datetime]]
+    ] = None
+    in_stock: bool = False
+    order: Literal["asc", "desc"] = "asc"
+
+    @property
+    def selective(self) -> bool:
+        """Задана хотя бы одна граница диапазона"""
+        return any(
+            bound is not None
+            for period in (
+                self.id_range,
+                self.weight_range,
+                self.length_range,
+                self.added_at_range,
+                self.removed_at_range,
+            )
+            for bound in period or ()
+        )
 
 
 class APIResponse(BaseModel):
@@ -60,6 +93,45 @@ class CoilResponseWrapper(APIResponse):
     Coil: CoilResponse
 
 
+class CoilListResponse(APIResponse):
+    """Wrapper for a page of coils"""
+
+    Coils: List[CoilResponse]
+    NextCursor: Optional[int] = None
+
+
+class CoilBulkCreated(BaseModel):
+    index: int
+    id: int
+
+
+class CoilBulkError(BaseModel):
+    index: int
+    detail: Any
+
+
+class CoilBulkResponse(APIResponse):
+    """Per-item report of a bulk create operation"""
+
+    Created: List[CoilBulkCreated]
+    Errors: List[CoilBulkError]
+
+
+class CoilBulkRemoveRequest(BaseModel):
+    """Either an id list or a filter selecting coils to remove"""
+
+    ids: Optional[List[int]] = None
+    filter: Optional[CoilFilter] = None
+
+
+class CoilBulkRemoveResponse(APIResponse):
+    """Per-id report of a bulk remove operation"""
+
+    Removed: List[int]
+    AlreadyRemoved: List[int]
+    Missing: List[int]
+
+
 class CoilDeleteResponse(APIResponse):
     """Response format for delete operation"""
 
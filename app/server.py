@@ -0,0 +1,152 @@
+"""Запуск API для production в нескольких воркерах.
+
+    python -m app.server --workers 4
+
+Если установлен gunicorn, он управляет воркерами uvicorn: SIGHUP
+мастеру плавно перезапускает воркеры (новый код и настройки), SIGTERM -
+плавная остановка. Без gunicorn воркерами управляет сам uvicorn (SIGHUP
+также перезапускает воркеры). Движок БД создается в каждом воркере
+при первом запросе, поэтому соединения не переходят через fork.
+
+Воркеры получают свое число в SERVER_WORKERS. При нескольких воркерах
+кэш процесса выключен, а перенос в архив и очистку журналов запускают
+по расписанию командами app.cli.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from app.core.config import Settings, get_settings
+
+APP = "app.main:app"
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def default_workers(settings: Settings) -> int:
+    """Число воркеров: из настроек или по числу CPU."""
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    if hasattr(os, "sched_getaffinity"):
+        # CPU, доступные процессу (учитывает ограничения контейнера)
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def event_loop() -> str:
+    return "uvloop" if _available("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if _available("httptools") else "h11"
+
+
+def worker_class() -> str:
+    # В новых версиях uvicorn воркер gunicorn вынесен в пакет uvicorn-worker
+    if _available("uvicorn_worker"):
+        return "uvicorn_worker.UvicornWorker"
+    return "uvicorn.workers.UvicornWorker"
+
+
+def gunicorn_command(
+    args: argparse.Namespace, settings: Settings
+) -> List[str]:
+    command = [
+        "gunicorn",
+        APP,
+        "--worker-class",
+        worker_class(),
+        "--workers",
+        str(args.workers),
+        "--bind",
+        f"{args.host}:{args.port}",
+        "--graceful-timeout",
+        str(settings.SERVER_GRACEFUL_TIMEOUT),
+        "--keep-alive",
+        str(settings.SERVER_KEEPALIVE_TIMEOUT),
+    ]
+    if settings.SERVER_MAX_REQUESTS:
+        # Перезапуск воркера после N запросов ограничивает рост памяти
+        command += [
+            "--max-requests",
+            str(settings.SERVER_MAX_REQUESTS),
+            "--max-requests-jitter",
+            str(max(1, settings.SERVER_MAX_REQUESTS // 10)),
+        ]
+    if args.preload:
+        # Код загружается в мастере до fork и делится воркерами
+        command.append("--preload")
+    return command
+
+
+def uvicorn_options(
+    args: argparse.Namespace, settings: Settings
+) -> Dict[str, Any]:
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "loop": event_loop(),
+        "http": http_protocol(),
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_TIMEOUT,
+        "limit_max_requests": settings.SERVER_MAX_REQUESTS or None,
+        "access_log": args.access_log,
+        "log_level": args.log_level,
+    }
+
+
+def build_parser(settings: Settings) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.server",
+        description="Production-запуск API склада рулонов",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=default_workers(settings)
+    )
+    parser.add_argument(
+        "--manager",
+        choices=("auto", "gunicorn", "uvicorn"),
+        default="auto",
+        help="Кто управляет воркерами; auto - gunicorn, если установлен",
+    )
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Загрузить приложение до fork (только gunicorn)",
+    )
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument("--log-level", default="warning")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    settings = get_settings()
+    args = build_parser(settings).parse_args(argv)
+    manager = args.manager
+    if manager == "auto":
+        manager = "gunicorn" if _available("gunicorn") else "uvicorn"
+    # Воркеры читают настройки заново: так они знают, что процесс не один
+    # (кэш процесса и фоновые задачи, см. multiple_workers)
+    os.environ["SERVER_WORKERS"] = str(args.workers)
+
+    if manager == "gunicorn":
+        command = gunicorn_command(args, settings)
+        # Процесс заменяется мастером gunicorn, сигналы идут ему напрямую
+        os.execvp(command[0], command)
+
+    import uvicorn
+
+    uvicorn.run(APP, **uvicorn_options(args, settings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
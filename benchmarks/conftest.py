@@ -0,0 +1,108 @@
+"""Бенчмарки репозитория и HTTP API (pytest-benchmark).
+
+Не входят в обычный прогон тестов, запускаются отдельно:
+
+    pytest benchmarks --bench-sizes=10000,100000 --bench-db=memory,file \\
+        --benchmark-json=bench.json
+
+Результаты в JSON сравниваются между коммитами через
+``pytest-benchmark compare`` или ``--benchmark-compare``.
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import get_settings
+from app.core.database import engine_options, set_sqlite_pragmas
+from app.core.pool import PoolStats
+from app.domain.models import Coil
+from benchmarks.data import populate
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("coils benchmarks")
+    group.addoption(
+        "--bench-sizes",
+        default="10000",
+        help="Размеры склада через запятую, например 10000,100000,1000000",
+    )
+    group.addoption(
+        "--bench-db",
+        default="memory",
+        help="Хранилище SQLite: memory, file или memory,file",
+    )
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "dataset" in metafunc.fixturenames:
+        sizes = [
+            int(size)
+            for size in metafunc.config.getoption("--bench-sizes").split(",")
+        ]
+        kinds = metafunc.config.getoption("--bench-db").split(",")
+        params = [(kind, size) for kind in kinds for size in sizes]
+        metafunc.parametrize(
+            "dataset",
+            params,
+            ids=[f"{kind}-{size}" for kind, size in params],
+            indirect=True,
+            scope="session",
+        )
+
+
+def _make_engine(kind: str, directory: Path) -> Engine:
+    settings = get_settings()
+    if kind == "memory":
+        return create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    url = f"sqlite:///{directory / 'coils.db'}"
+    engine = create_engine(url, **engine_options(url, settings, PoolStats()))
+    set_sqlite_pragmas(engine, settings)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def dataset(
+    request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory
+) -> Iterator[Tuple[Engine, int]]:
+    kind, size = request.param
+    engine = _make_engine(kind, tmp_path_factory.mktemp(f"{kind}-{size}"))
+    populate(engine, size)
+    yield engine, size
+    engine.dispose()
+
+
+@pytest.fixture()
+def session(dataset: Tuple[Engine, int]) -> Iterator[Session]:
+    """Сессия, изменения которой откатываются после бенчмарка."""
+    engine, _ = dataset
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture()
+def max_coil_id(session: Session) -> Any:
+    return session.scalar(select(func.max(Coil.id)))
+
+
+@pytest.fixture(autouse=True)
+def describe_dataset(request: pytest.FixtureRequest) -> None:
+    names = request.fixturenames
+    if "dataset" in names and "benchmark" in names:
+        kind, size = request.node.callspec.params["dataset"]
+        benchmark = request.getfixturevalue("benchmark")
+        benchmark.extra_info.update(db=kind, coils=size)
@@ -0,0 +1,51 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.domain.models import Base, Coil
+from app.repositories.daily_stats import rebuild_daily_stats
+
+# Синтетический склад: год поступлений, ~70% рулонов уже отгружены
+HISTORY_START = datetime(2025, 1, 1)
+HISTORY_DAYS = 365
+REMOVED_SHARE = 0.7
+
+
+def generate_coils(
+    count: int, seed: int = 20250101
+) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    span = HISTORY_DAYS * 24 * 3600
+    for _ in range(count):
+        added_at = HISTORY_START + timedelta(seconds=rng.randrange(span))
+        removed_at = None
+        if rng.random() < REMOVED_SHARE:
+            removed_at = added_at + timedelta(
+                seconds=rng.randrange(3600, 60 * 24 * 3600)
+            )
+        yield {
+            "length": round(rng.uniform(1.0, 100.0), 2),
+            "weight": round(rng.uniform(100.0, 10000.0), 2),
+            "added_at": added_at,
+            "removed_at": removed_at,
+        }
+
+
+def populate(engine: Engine, count: int, chunk_size: int = 50000) -> None:
+    """Создает схему и заполняет ее count рулонами."""
+    Base.metadata.create_all(bind=engine)
+    rows: List[Dict[str, Any]] = []
+    with engine.begin() as connection:
+        for row in generate_coils(count):
+            rows.append(row)
+            if len(rows) == chunk_size:
+                connection.execute(insert(Coil), rows)
+                rows.clear()
+        if rows:
+            connection.execute(insert(Coil), rows)
+    with Session(engine) as session:
+        rebuild_daily_stats(session)
@@ -0,0 +1,524 @@
+"""Нагрузочный генератор: складской трафик по HTTP (httpx, asyncio).
+
+Воспроизводит смесь операций create/get/patch/delete/list/statistics по
+профилю складской смены, считает p50/p95/p99 и пропускную способность
+по каждой операции и повышает параллельность ступенями, чтобы найти
+точку насыщения сервера.
+
+Против уже запущенного сервера:
+
+    python -m benchmarks.load --url http://127.0.0.1:8000 \\
+        --profile shift --concurrency 1,4,16,64 --duration 20
+
+С локальным uvicorn на SQLite-файле во временном каталоге:
+
+    python -m benchmarks.load --serve --concurrency 1,2,4,8,16,32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+API = "/api/v1"
+OPERATIONS = ("create", "get", "patch", "delete", "list", "statistics")
+
+# Веса операций по сменам склада
+PROFILES: Dict[str, Dict[str, float]] = {
+    # Приемка: поступление рулонов и проверка принятых
+    "intake": {
+        "create": 50,
+        "get": 20,
+        "patch": 10,
+        "delete": 5,
+        "list": 10,
+        "statistics": 5,
+    },
+    # Отгрузка: поиск рулонов на складе и списание
+    "shipping": {
+        "create": 5,
+        "get": 25,
+        "patch": 5,
+        "delete": 35,
+        "list": 25,
+        "statistics": 5,
+    },
+    # Отчетность: списки и статистика за периоды
+    "reporting": {
+        "create": 0,
+        "get": 15,
+        "patch": 0,
+        "delete": 0,
+        "list": 45,
+        "statistics": 40,
+    },
+}
+# Смена целиком: приемка, отгрузка и отчеты в пропорции рабочего дня
+PROFILES["shift"] = {
+    operation: 0.4 * PROFILES["intake"][operation]
+    + 0.4 * PROFILES["shipping"][operation]
+    + 0.2 * PROFILES["reporting"][operation]
+    for operation in OPERATIONS
+}
+
+# Ступень считается насыщенной, если дает не меньше этой доли от
+# наибольшей пропускной способности
+SATURATION_SHARE = 0.95
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Смесь операций из строки вида create=40,get=30,list=30."""
+    mix: Dict[str, float] = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Неизвестная операция: {name}")
+        mix[name] = float(weight)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("В смеси нет операций с положительным весом")
+    return mix
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией по отсортированным значениям."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class Warehouse:
+    """Рулоны, о которых знает генератор: id на складе."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.in_stock: List[int] = []
+
+    def add(self, coil_id: int) -> None:
+        self.in_stock.append(coil_id)
+
+    def pick(self) -> Optional[int]:
+        return self.rng.choice(self.in_stock) if self.in_stock else None
+
+    def take(self) -> Optional[int]:
+        """Убирает случайный рулон со склада (для списания)."""
+        if not self.in_stock:
+            return None
+        index = self.rng.randrange(len(self.in_stock))
+        self.in_stock[index], self.in_stock[-1] = (
+            self.in_stock[-1],
+            self.in_stock[index],
+        )
+        return self.in_stock.pop()
+
+
+# Операция над рулоном склада возвращает None, если склад пуст
+Operation = Callable[
+    [httpx.AsyncClient, Warehouse, random.Random],
+    Awaitable[Optional[httpx.Response]],
+]
+
+
+def _coil(rng: random.Random) -> Dict[str, float]:
+    return {
+        "length": round(rng.uniform(1.0, 100.0), 2),
+        "weight": round(rng.uniform(100.0, 10000.0), 2),
+    }
+
+
+async def _create(
+    client: httpx.AsyncClient, warehouse: Warehouse, rng: random.Random
+) -> httpx.Response:
+    response = await client.post(f"{API}/coils/", json=_coil(rng))
+    if response.status_code == 201:
+        warehouse.add(response.json()["id"])
+    return response
+
+
+async def _get(
+    client: httpx.AsyncClient, warehouse: Warehouse, rng: random.Random
+) -> Optional[httpx.Response]:
+    coil_id = warehouse.pick()
+    if coil_id is None:
+        return None
+    return await client.get(f"{API}/coils/{coil_id}")
+
+
+async def _patch(
+    client: httpx.AsyncClient, warehouse: Warehouse, rng: random.Random
+) -> Optional[httpx.Response]:
+    coil_id = warehouse.pick()
+    if coil_id is None:
+        return None
+    return await client.patch(
+        f"{API}/coils/{coil_id}",
+        json={"weight": round(rng.uniform(100.0, 10000.0), 2)},
+    )
+
+
+async def _delete(
+    client: httpx.AsyncClient, warehouse: Warehouse, rng: random.Random
+) -> Optional[httpx.Response]:
+    coil_id = warehouse.take()
+    if coil_id is None:
+        return None
+    return await client.delete(f"{API}/coils/{coil_id}")
+
+
+async def _list(
+    client: httpx.AsyncClient, warehouse: Warehouse, rng: random.Random
+) -> httpx.Response:
+    params: Dict[str, Any] = {"limit": 100}
+    if rng.random() < 0.5:
+        low = rng.uniform(100.0, 9000.0)
+        params.update(weight_min=low, weight_max=low + 1000.0)
+    return await client.get(f"{API}/coils/", params=params)
+
+
+async def _statistics(
+    client: httpx.AsyncClient, warehouse: Warehouse, rng: random.Random
+) -> httpx.Response:
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=rng.choice((1, 7, 30)))
+    return await client.post(
+        f"{API}/coils/statistics/",
+        json={"start_date": start.isoformat(), "end_date": end.isoformat()},
+    )
+
+
+HANDLERS: Dict[str, Operation] = {
+    "create": _create,
+    "get": _get,
+    "patch": _patch,
+    "delete": _delete,
+    "list": _list,
+    "statistics": _statistics,
+}
+
+
+class LatencyRecorder:
+    """Время ответа и ошибки по операциям одной ступени.
+
+    fallbacks - сколько раз операция над рулоном заменялась созданием,
+    потому что склад был пуст; время таких запросов учтено в create.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.fallbacks: Dict[str, int] = defaultdict(int)
+
+    def record(self, operation: str, seconds: float, ok: bool) -> None:
+        self.latencies[operation].append(seconds)
+        if not ok:
+            self.errors[operation] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        """Запросы, ошибки, замены, запросы в секунду и перцентили (мс)."""
+        groups = dict(self.latencies)
+        for operation in self.fallbacks:
+            groups.setdefault(operation, [])
+        groups["all"] = [
+            value for values in self.latencies.values() for value in values
+        ]
+        result: Dict[str, Dict[str, float]] = {}
+        for operation, values in groups.items():
+            ordered = sorted(values)
+            if operation == "all":
+                errors = sum(self.errors.values())
+                fallbacks = sum(self.fallbacks.values())
+            else:
+                errors = self.errors[operation]
+                fallbacks = self.fallbacks[operation]
+            row: Dict[str, float] = {
+                "requests": len(ordered),
+                "errors": errors,
+                "fallbacks": fallbacks,
+                "throughput": len(ordered) / elapsed if elapsed else 0.0,
+            }
+            for q in PERCENTILES:
+                row[f"p{q}_ms"] = percentile(ordered, q) * 1000
+            result[operation] = row
+        return result
+
+
+async def seed(
+    client: httpx.AsyncClient,
+    warehouse: Warehouse,
+    count: int,
+    batch_size: int = 500,
+) -> None:
+    """Начальный остаток склада через пакетное добавление."""
+    rng = warehouse.rng
+    for start in range(0, count, batch_size):
+        rows = [_coil(rng) for _ in range(min(batch_size, count - start))]
+        response = await client.post(f"{API}/coils/bulk", json=rows)
+        response.raise_for_status()
+        for created in response.json()["Created"]:
+            warehouse.add(created["id"])
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    warehouse: Warehouse,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, Any]:
+    """Ступень нагрузки: concurrency клиентов в течение duration секунд.
+
+    Каждый клиент отправляет следующий запрос сразу после ответа на
+    предыдущий (закрытая модель нагрузки).
+    """
+    recorder = LatencyRecorder()
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    rng = warehouse.rng
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            request_started = time.perf_counter()
+            try:
+                response = await HANDLERS[operation](client, warehouse, rng)
+                if response is None:
+                    # Склад пуст: вместо операции над рулоном - создание
+                    recorder.fallbacks[operation] += 1
+                    operation = "create"
+                    request_started = time.perf_counter()
+                    response = await _create(client, warehouse, rng)
+                ok = response.is_success
+            except httpx.HTTPError:
+                ok = False
+            recorder.record(
+                operation, time.perf_counter() - request_started, ok
+            )
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "operations": recorder.summary(elapsed),
+    }
+
+
+def saturation_point(stages: List[Dict[str, Any]]) -> Optional[int]:
+    """Наименьшая параллельность с почти наибольшей пропускной способностью.
+
+    Дальше с ростом параллельности растет только время ответа.
+    """
+    if not stages:
+        return None
+    best = max(stage["operations"]["all"]["throughput"] for stage in stages)
+    for stage in stages:
+        throughput = stage["operations"]["all"]["throughput"]
+        if throughput >= best * SATURATION_SHARE:
+            return int(stage["concurrency"])
+    return None
+
+
+async def run_ramp(
+    client: httpx.AsyncClient,
+    mix: Dict[str, float],
+    levels: List[int],
+    duration: float,
+    seed_coils: int = 1000,
+    random_seed: int = 20250101,
+    report: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Ступени нагрузки с растущей параллельностью на одном складе."""
+    warehouse = Warehouse(random.Random(random_seed))
+    await seed(client, warehouse, seed_coils)
+    stages = []
+    for concurrency in levels:
+        stage = await run_stage(client, warehouse, mix, concurrency, duration)
+        stages.append(stage)
+        if report is not None:
+            report(stage)
+    return {
+        "mix": mix,
+        "stages": stages,
+        "saturation": saturation_point(stages),
+    }
+
+
+def format_stage(stage: Dict[str, Any]) -> str:
+    operations = stage["operations"]
+    lines = [
+        f"Параллельность {stage['concurrency']}: "
+        f"{operations['all']['throughput']:.1f} запр/с "
+        f"за {stage['elapsed']:.1f} с",
+        f"  {'операция':<12}{'запросов':>10}{'ошибок':>8}{'замен':>8}"
+        f"{'запр/с':>10}"
+        + "".join(f"{f'p{q} мс':>10}" for q in PERCENTILES),
+    ]
+    for name in (*OPERATIONS, "all"):
+        row = operations.get(name)
+        if row is None:
+            continue
+        lines.append(
+            f"  {name:<12}{row['requests']:>10}{row['errors']:>8}"
+            f"{row['fallbacks']:>8}{row['throughput']:>10.1f}"
+            + "".join(f"{row[f'p{q}_ms']:>10.1f}" for q in PERCENTILES)
+        )
+    return "\n".join(lines)
+
+
+class LocalServer:
+    """Запущенный локальный сервер: базовый URL и время холодного старта."""
+
+    def __init__(self, url: str, startup_seconds: float) -> None:
+        self.url = url
+        self.startup_seconds = startup_seconds
+
+
+def uvicorn_command(port: int, workers: int = 1) -> List[str]:
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+    ]
+
+
+@contextmanager
+def local_server(command: List[str], port: int) -> Iterator[LocalServer]:
+    """Сервер с SQLite-файлом во временном каталоге.
+
+    Время старта считается от запуска процесса до первого ответа.
+    """
+    from sqlalchemy import create_engine
+
+    from app.domain.models import Base
+
+    directory = tempfile.mkdtemp(prefix="coils-load-")
+    database_url = f"sqlite:///{Path(directory) / 'load.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        command, env={**os.environ, "DATABASE_URL": database_url}
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base_url, server)
+        yield LocalServer(base_url, time.perf_counter() - started)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _wait_ready(
+    base_url: str, server: subprocess.Popen, timeout: float = 30.0
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Сервер завершился при запуске")
+        try:
+            httpx.get(f"{base_url}{API}/healthchecker", timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Сервер не ответил за {timeout:.0f} с")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="Нагрузочный тест API склада рулонов",
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Запустить локальный uvicorn на временной SQLite",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES), default="shift"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        help="Своя смесь операций, например create=40,get=30,list=30",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,2,4,8,16,32",
+        help="Ступени параллельности через запятую",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Секунд на ступень"
+    )
+    parser.add_argument("--seed-coils", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", type=Path, help="Файл для результатов")
+    return parser
+
+
+async def _run(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    levels = [int(level) for level in args.concurrency.split(",")]
+    limits = httpx.Limits(
+        max_connections=max(levels), max_keepalive_connections=max(levels)
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        return await run_ramp(
+            client,
+            args.mix or PROFILES[args.profile],
+            levels,
+            args.duration,
+            seed_coils=args.seed_coils,
+            report=lambda stage: print(format_stage(stage), flush=True),
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.serve:
+        command = uvicorn_command(args.port, args.workers)
+        with local_server(command, args.port) as server:
+            result = asyncio.run(_run(args, server.url))
+    else:
+        result = asyncio.run(_run(args, args.url))
+
+    print(f"Точка насыщения: параллельность {result['saturation']}")
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
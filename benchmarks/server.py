@@ -0,0 +1,120 @@
+"""Запуск для разработки против production: холодный старт и нагрузка.
+
+Оба варианта поднимаются на временной SQLite и получают одинаковый
+складской трафик из benchmarks.load с фиксированной параллельностью:
+
+    python -m benchmarks.server --workers 4 --concurrency 32 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.load import PROFILES, local_server, run_ramp
+
+# Команды запуска по вариантам: порт и число воркеров
+VARIANTS: Dict[str, Callable[[int, int], List[str]]] = {
+    # Команда из docker-compose.yml: один воркер с перезагрузкой по коду
+    "dev": lambda port, workers: [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(port),
+        "--reload",
+        "--log-level",
+        "warning",
+    ],
+    "prod": lambda port, workers: [
+        sys.executable,
+        "-m",
+        "app.server",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+    ],
+}
+
+
+async def _load(url: str, args: argparse.Namespace) -> Dict[str, float]:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=url, timeout=args.timeout, limits=limits
+    ) as client:
+        result = await run_ramp(
+            client,
+            PROFILES[args.profile],
+            [args.concurrency],
+            args.duration,
+            seed_coils=args.seed_coils,
+        )
+    return result["stages"][0]["operations"]["all"]
+
+
+def measure(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    command = VARIANTS[name](args.port, args.workers)
+    with local_server(command, args.port) as server:
+        totals = asyncio.run(_load(server.url, args))
+    return {
+        "variant": name,
+        "startup_seconds": server.startup_seconds,
+        **totals,
+    }
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'вариант':<8}{'старт, с':>10}{'запр/с':>10}{'ошибок':>8}"
+        f"{'p50 мс':>10}{'p95 мс':>10}{'p99 мс':>10}"
+    ]
+    for row in results:
+        lines.append(
+            f"{row['variant']:<8}{row['startup_seconds']:>10.2f}"
+            f"{row['throughput']:>10.1f}{row['errors']:>8}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+            f"{row['p99_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.server",
+        description="Холодный старт и пропускная способность dev и prod",
+    )
+    parser.add_argument(
+        "--variants", default="dev,prod", help="Варианты через запятую"
+    )
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES), default="shift"
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed-coils", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", type=Path, help="Файл для результатов")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    results = [measure(name, args) for name in args.variants.split(",")]
+    print(format_results(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
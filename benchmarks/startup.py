@@ -0,0 +1,85 @@
+"""Время старта по ``python -X importtime``.
+
+Каждое измерение - отдельный интерпретатор, поэтому модули, уже
+загруженные тестами, не искажают результат:
+
+    python -m benchmarks.startup cli --top 15
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Сценарии старта: CLI и фоновые задачи, импорт модуля приложения и
+# сборка приложения фабрикой
+SCENARIOS = {
+    "cli": "import app.cli",
+    "jobs": "import app.jobs",
+    "main": "import app.main",
+    "app": "from app.main import create_app; create_app()",
+}
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Накопленное время импорта каждого модуля, мкс."""
+    times: Dict[str, int] = {}
+    report = _python("-X", "importtime", "-c", statement).stderr
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def startup_seconds(statement: str) -> float:
+    """Время работы интерпретатора, выполняющего statement."""
+    started = time.perf_counter()
+    _python("-c", statement)
+    return time.perf_counter() - started
+
+
+def format_top(times: Dict[str, int], top: int) -> str:
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)
+    return "\n".join(
+        f"{cumulative / 1000:>10.1f} мс  {module}"
+        for module, cumulative in slowest[:top]
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Самые долгие импорты при старте",
+    )
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--top", type=int, default=20)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    statement = SCENARIOS[args.scenario]
+    print(f"{statement}: {startup_seconds(statement):.3f} с")
+    print(format_top(import_times(statement), args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from typing import Any, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.orm import Session
+
+from app.core.cache import NullCache, get_cache, set_cache
+from app.core.database import get_db
+from app.main import app
+from benchmarks.data import HISTORY_START
+
+INSERT_COUNT = 100
+PAYLOAD = {"length": 10.0, "weight": 1000.0}
+STATISTICS_RANGE = {
+    "start_date": (HISTORY_START + timedelta(days=200)).isoformat(),
+    "end_date": (HISTORY_START + timedelta(days=230)).isoformat(),
+}
+
+
+@pytest.fixture()
+def client(session: Session) -> Iterator[TestClient]:
+    def override_get_db() -> Iterator[Session]:
+        yield session
+
+    caches = {name: get_cache(name) for name in ("coils", "statistics")}
+    for name in caches:
+        set_cache(name, NullCache())
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+    for name, cache in caches.items():
+        set_cache(name, cache)
+
+
+def _ok(response: Any) -> Any:
+    assert response.status_code < 300, response.text
+    return response
+
+
+def test_http_list_page(
+    benchmark: BenchmarkFixture, client: TestClient
+) -> None:
+    params = {"limit": 100}
+    benchmark(lambda: _ok(client.get("/api/v1/coils/", params=params)))
+
+
+def test_http_list_filtered(
+    benchmark: BenchmarkFixture, client: TestClient
+) -> None:
+    params = {"weight_min": 1000.0, "weight_max": 1200.0, "limit": 100}
+    benchmark(lambda: _ok(client.get("/api/v1/coils/", params=params)))
+
+
+def test_http_get_coil(
+    benchmark: BenchmarkFixture, client: TestClient, max_coil_id: int
+) -> None:
+    coil_id = max_coil_id // 2
+    benchmark(lambda: _ok(client.get(f"/api/v1/coils/{coil_id}")))
+
+
+def test_http_statistics(
+    benchmark: BenchmarkFixture, client: TestClient
+) -> None:
+    benchmark(
+        lambda: _ok(
+            client.post("/api/v1/coils/statistics/", json=STATISTICS_RANGE)
+        )
+    )
+
+
+def test_http_create_single(
+    benchmark: BenchmarkFixture, client: TestClient
+) -> None:
+    def create() -> None:
+        for _ in range(INSERT_COUNT):
+            _ok(client.post("/api/v1/coils/", json=PAYLOAD))
+
+    benchmark.extra_info["coils_per_round"] = INSERT_COUNT
+    benchmark.pedantic(create, rounds=3, iterations=1)
+
+
+def test_http_create_bulk(
+    benchmark: BenchmarkFixture, client: TestClient
+) -> None:
+    payload = [PAYLOAD] * INSERT_COUNT
+    benchmark.extra_info["coils_per_round"] = INSERT_COUNT
+    benchmark.pedantic(
+        lambda: _ok(client.post("/api/v1/coils/bulk", json=payload)),
+        rounds=3,
+        iterations=1,
+    )
@@ -0,0 +1,52 @@
+import io
+from typing import Callable, Dict
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.orm import Session
+
+from app.api.responses import dump_json
+from app.core.cache import NullCache
+from app.export import CoilExportWriter
+from app.repositories.coil import CoilRepository
+
+pytest.importorskip("pyarrow")
+
+BATCH_SIZE = 65536
+
+
+def _ndjson(repo: CoilRepository) -> int:
+    size = 0
+    for batch in repo.iter_row_batches(batch_size=BATCH_SIZE):
+        size += sum(len(dump_json(row)) + 1 for row in batch)
+    return size
+
+
+def _columnar(fmt: str) -> Callable[[CoilRepository], int]:
+    def export(repo: CoilRepository) -> int:
+        sink = io.BytesIO()
+        writer = CoilExportWriter(sink, fmt, "zstd")
+        for batch in repo.iter_row_batches(batch_size=BATCH_SIZE):
+            writer.write(batch)
+        writer.close()
+        return len(sink.getvalue())
+
+    return export
+
+
+EXPORTS: Dict[str, Callable[[CoilRepository], int]] = {
+    "ndjson": _ndjson,
+    "arrow": _columnar("arrow"),
+    "parquet": _columnar("parquet"),
+}
+
+
+@pytest.mark.parametrize("fmt", EXPORTS)
+def test_full_export(
+    benchmark: BenchmarkFixture, session: Session, fmt: str
+) -> None:
+    repo = CoilRepository(
+        session, coil_cache=NullCache(), statistics_cache=NullCache()
+    )
+    size = benchmark.pedantic(EXPORTS[fmt], args=(repo,), rounds=3)
+    benchmark.extra_info["bytes"] = size
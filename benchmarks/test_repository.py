@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.orm import Session
+
+from app.core.cache import NullCache
+from app.core.config import get_settings
+from app.repositories.coil import CoilRepository
+from app.schemas.coil import CoilCreate, CoilFilter
+from benchmarks.data import HISTORY_START
+
+WINDOW_START = HISTORY_START + timedelta(days=200, hours=6)
+
+FILTERS: Dict[str, Optional[CoilFilter]] = {
+    "none": None,
+    "id": CoilFilter(id_range=(1000, 2000)),
+    "weight": CoilFilter(weight_range=(1000.0, 1200.0)),
+    "length": CoilFilter(length_range=(10.0, 12.0)),
+    "added_at": CoilFilter(
+        added_at_range=(WINDOW_START, WINDOW_START + timedelta(days=7))
+    ),
+    "removed_at": CoilFilter(
+        removed_at_range=(WINDOW_START, WINDOW_START + timedelta(days=7))
+    ),
+    "weight_min": CoilFilter(weight_range=(1900.0, None)),
+    "added_after": CoilFilter(
+        added_at_range=(WINDOW_START + timedelta(days=300), None)
+    ),
+    "in_stock": CoilFilter(in_stock=True),
+}
+
+WINDOWS = {"1d": 1, "7d": 7, "30d": 30, "365d": 365}
+
+INSERT_COUNT = 100
+
+
+def _repo(session: Session) -> CoilRepository:
+    # Кэш отключен: измеряется работа с базой
+    return CoilRepository(
+        session, coil_cache=NullCache(), statistics_cache=NullCache()
+    )
+
+
+@pytest.mark.parametrize("name", FILTERS)
+def test_get_page(
+    benchmark: BenchmarkFixture, session: Session, name: str
+) -> None:
+    repo = _repo(session)
+    coils, _ = benchmark(repo.get_page, FILTERS[name], 100)
+    assert len(coils) <= 100
+
+
+@pytest.mark.parametrize("name", [name for name in FILTERS if name != "none"])
+def test_get_all_filtered(
+    benchmark: BenchmarkFixture, session: Session, name: str
+) -> None:
+    repo = _repo(session)
+    benchmark(repo.get_all, FILTERS[name])
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+@pytest.mark.parametrize("rollup", [False, True], ids=["raw", "rollup"])
+def test_statistics(
+    benchmark: BenchmarkFixture,
+    session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    window: str,
+    rollup: bool,
+) -> None:
+    monkeypatch.setattr(get_settings(), "STATS_ROLLUP_ENABLED", rollup)
+    repo = _repo(session)
+    end: datetime = WINDOW_START + timedelta(days=WINDOWS[window])
+    statistics: Any = benchmark(repo._compute_statistics, WINDOW_START, end)
+    assert statistics["added_count"] >= 0
+
+
+def test_create_single(benchmark: BenchmarkFixture, session: Session) -> None:
+    repo = _repo(session)
+
+    def create() -> None:
+        for _ in range(INSERT_COUNT):
+            repo.create(length=10.0, weight=1000.0)
+
+    benchmark.extra_info["coils_per_round"] = INSERT_COUNT
+    benchmark.pedantic(create, rounds=5, iterations=1)
+
+
+def test_create_many(benchmark: BenchmarkFixture, session: Session) -> None:
+    repo = _repo(session)
+    coils = [CoilCreate(length=10.0, weight=1000.0)] * INSERT_COUNT
+    benchmark.extra_info["coils_per_round"] = INSERT_COUNT
+    benchmark.pedantic(repo.create_many, args=(coils,), rounds=5, iterations=1)
+
+
+def test_statistics_series(
+    benchmark: BenchmarkFixture, session: Session
+) -> None:
+    repo = _repo(session)
+    end = WINDOW_START + timedelta(days=30)
+    series: Any = benchmark(
+        repo.get_statistics_series, WINDOW_START, end, "day"
+    )
+    assert len(series) == 31
+
+
+def test_statistics_daily_windows(
+    benchmark: BenchmarkFixture, session: Session
+) -> None:
+    # То, что заменяет ряд: отдельный запрос статистики на каждый день
+    repo = _repo(session)
+
+    def windows() -> None:
+        for day in range(30):
+            start = WINDOW_START + timedelta(days=day)
+            repo._compute_statistics(start, start + timedelta(days=1))
+
+    benchmark(windows)
+
+
+@pytest.mark.parametrize("sql_window", [True, False], ids=["sql", "numpy"])
+def test_inventory(
+    benchmark: BenchmarkFixture,
+    session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    sql_window: bool,
+) -> None:
+    monkeypatch.setattr(get_settings(), "INVENTORY_SQL_WINDOW", sql_window)
+    repo = _repo(session)
+    first_day = WINDOW_START.date()
+    inventory: Any = benchmark(
+        repo.get_inventory, first_day, first_day + timedelta(days=364)
+    )
+    assert len(inventory["days"]) == 365
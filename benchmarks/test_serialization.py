@@ -0,0 +1,52 @@
+from typing import Callable, Dict
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.orm import Session
+
+from app.api.responses import FastJSONResponse
+from app.core.cache import NullCache
+from app.repositories.coil import CoilRepository
+from app.schemas.coil import CoilListResponse, CoilResponse
+
+PAGE_SIZE = 1000
+
+
+def _models(repo: CoilRepository) -> bytes:
+    # Прежний путь: ORM-объекты, модель на строку, повторная валидация
+    # по response_model и jsonable_encoder
+    coils, next_cursor = repo.get_page(limit=PAGE_SIZE)
+    response = CoilListResponse(
+        Coils=[CoilResponse.model_validate(coil) for coil in coils],
+        NextCursor=next_cursor,
+    )
+    content = CoilListResponse.model_validate(response.model_dump())
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _rows(repo: CoilRepository) -> bytes:
+    rows, next_cursor = repo.get_page_rows(limit=PAGE_SIZE)
+    return FastJSONResponse(
+        {"Status": "Success", "Coils": rows, "NextCursor": next_cursor}
+    ).body
+
+
+PATHS: Dict[str, Callable[[CoilRepository], bytes]] = {
+    "models": _models,
+    "rows": _rows,
+}
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_list_serialization(
+    benchmark: BenchmarkFixture, session: Session, path: str
+) -> None:
+    repo = CoilRepository(
+        session, coil_cache=NullCache(), statistics_cache=NullCache()
+    )
+    # Время на строку: mean / rows
+    benchmark.extra_info["rows"] = PAGE_SIZE
+    body = benchmark(PATHS[path], repo)
+    assert body.startswith(b'{"Status":"Success"')
@@ -0,0 +1,12 @@
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from benchmarks.startup import SCENARIOS, startup_seconds
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_startup(benchmark: BenchmarkFixture, scenario: str) -> None:
+    # Интерпретатор каждый раз новый: меряется холодный старт
+    benchmark.pedantic(
+        startup_seconds, args=(SCENARIOS[scenario],), rounds=5, iterations=1
+    )
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from typing import Any, Callable, Dict
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy.orm import Session
+
+from app.core.cache import NullCache
+from app.core.config import get_settings
+from app.repositories.coil import CoilRepository
+from app.repositories.daily_stats import _summary_query
+from app.repositories.statements import (
+    coil_by_id_query,
+    listing_query,
+    rollup_edge_queries,
+    statistics_query,
+)
+from app.schemas.coil import CoilFilter
+from benchmarks.data import HISTORY_START
+
+# Накладные расходы Python на один короткий запрос: сами запросы читают
+# единицы строк, разница между вариантами - сборка select() и вычисление
+# ключа кэша компиляции
+
+WINDOW_START = HISTORY_START + timedelta(days=200, hours=6)
+
+CALLS: Dict[str, Callable[[CoilRepository, int], Any]] = {
+    "get_by_id": lambda repo, coil_id: repo.get_by_id(coil_id),
+    "get_page": lambda repo, coil_id: repo.get_page(
+        CoilFilter(id_range=(coil_id, None)), limit=10
+    ),
+    "get_page_rows": lambda repo, coil_id: repo.get_page_rows(
+        CoilFilter(weight_range=(1000.0, 1200.0), in_stock=True), limit=10
+    ),
+    "statistics_raw": lambda repo, coil_id: repo.get_statistics(
+        WINDOW_START, WINDOW_START + timedelta(hours=1)
+    ),
+    "statistics_rollup": lambda repo, coil_id: repo.get_statistics(
+        WINDOW_START, WINDOW_START + timedelta(days=3)
+    ),
+}
+
+BUILDERS = (
+    coil_by_id_query,
+    listing_query,
+    statistics_query,
+    rollup_edge_queries,
+    _summary_query,
+)
+
+
+@pytest.mark.parametrize("variant", ["rebuilt", "cached"])
+@pytest.mark.parametrize("name", CALLS)
+def test_hot_query(
+    benchmark: BenchmarkFixture,
+    session: Session,
+    max_coil_id: int,
+    monkeypatch: pytest.MonkeyPatch,
+    name: str,
+    variant: str,
+) -> None:
+    monkeypatch.setattr(
+        get_settings(), "STATS_ROLLUP_ENABLED", name == "statistics_rollup"
+    )
+    # Кэши данных отключены: каждый вызов идет в базу
+    repo = CoilRepository(
+        session, coil_cache=NullCache(), statistics_cache=NullCache()
+    )
+    call = CALLS[name]
+
+    def rebuilt(repo: CoilRepository, coil_id: int) -> Any:
+        # Как до кэширования: запрос строится заново на каждый вызов
+        for builder in BUILDERS:
+            builder.cache_clear()
+        return call(repo, coil_id)
+
+    benchmark(rebuilt if variant == "rebuilt" else call, repo, max_coil_id - 5)
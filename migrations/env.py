@@ -10,6 +10,7 @@ from sqlalchemy import engine_from_config, pool
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.config import get_settings
+from app.core.database import to_sync_url
 from app.domain.models import Base
 
 config = context.config
@@ -20,7 +21,8 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
-database_url = settings.DATABASE_URL
+# Миграции всегда выполняются синхронным драйвером
+database_url = to_sync_url(settings.DATABASE_URL)
 config.set_main_option("sqlalchemy.url", database_url)
 
 
@@ -0,0 +1,41 @@
+"""add_coil_events
+
+Revision ID: a6d3f8b2c4e7
+Revises: f1c7a3e9b5d2
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a6d3f8b2c4e7"
+down_revision = "f1c7a3e9b5d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Журнал ленты изменений; AUTOINCREMENT в SQLite не дает повторно
+    # выдать id событий, удаленных очисткой
+    op.create_table(
+        "coil_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("coil_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Float(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(
+        "ix_coil_events_occurred_at", "coil_events", ["occurred_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_coil_events_occurred_at", table_name="coil_events")
+    op.drop_table("coil_events")
@@ -0,0 +1,39 @@
+"""add_idempotency_keys
+
+Revision ID: b8e4c1d7a9f3
+Revises: a6d3f8b2c4e7
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b8e4c1d7a9f3"
+down_revision = "a6d3f8b2c4e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        "ix_idempotency_keys_created_at",
+        "idempotency_keys",
+        ["created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_idempotency_keys_created_at", table_name="idempotency_keys"
+    )
+    op.drop_table("idempotency_keys")
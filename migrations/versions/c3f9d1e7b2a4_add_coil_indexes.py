@@ -0,0 +1,64 @@
+"""add_coil_indexes
+
+Revision ID: c3f9d1e7b2a4
+Revises: a28614ab4514
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3f9d1e7b2a4"
+down_revision = "a28614ab4514"
+branch_labels = None
+depends_on = None
+
+IN_STOCK = sa.text("removed_at IS NULL")
+
+
+def upgrade() -> None:
+    # На PostgreSQL индексы строятся CONCURRENTLY, чтобы не блокировать
+    # запись в большую таблицу на время миграции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_coils_added_at_period",
+            "coils",
+            ["added_at", "removed_at", "length", "weight"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_coils_removed_at_period",
+            "coils",
+            ["removed_at", "added_at", "length", "weight"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_coils_in_stock",
+            "coils",
+            ["added_at", "length", "weight"],
+            postgresql_where=IN_STOCK,
+            sqlite_where=IN_STOCK,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_coils_weight",
+            "coils",
+            ["weight"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_coils_length",
+            "coils",
+            ["length"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_coils_length", table_name="coils")
+    op.drop_index("ix_coils_weight", table_name="coils")
+    op.drop_index("ix_coils_in_stock", table_name="coils")
+    op.drop_index("ix_coils_removed_at_period", table_name="coils")
+    op.drop_index("ix_coils_added_at_period", table_name="coils")
@@ -0,0 +1,47 @@
+"""coils_sqlite_autoincrement
+
+Revision ID: c9e2f4a6b8d1
+Revises: b8e4c1d7a9f3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c9e2f4a6b8d1"
+down_revision = "b8e4c1d7a9f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Без AUTOINCREMENT SQLite выдает новому рулону наибольший id + 1
+    # среди оставшихся, и id рулона, перенесенного в архив, повторяется.
+    # В PostgreSQL последовательность id и так не возвращается назад.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        "coils",
+        recreate="always",
+        table_kwargs={"sqlite_autoincrement": True},
+    ):
+        pass
+    # Счетчик продолжается после наибольшего id и в coils, и в архиве
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'coils'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'coils', "
+        "max(coalesce((SELECT max(id) FROM coils), 0), "
+        "coalesce((SELECT max(id) FROM coils_archive), 0))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    with op.batch_alter_table(
+        "coils",
+        recreate="always",
+        table_kwargs={"sqlite_autoincrement": False},
+    ):
+        pass
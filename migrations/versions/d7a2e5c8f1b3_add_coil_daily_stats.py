@@ -0,0 +1,43 @@
+"""add_coil_daily_stats
+
+Revision ID: d7a2e5c8f1b3
+Revises: c3f9d1e7b2a4
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.orm import Session
+
+from app.repositories.daily_stats import rebuild_daily_stats
+
+# revision identifiers, used by Alembic.
+revision = "d7a2e5c8f1b3"
+down_revision = "c3f9d1e7b2a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coil_daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("added_count", sa.Integer(), nullable=False),
+        sa.Column("added_length_sum", sa.Float(), nullable=False),
+        sa.Column("added_length_min", sa.Float(), nullable=True),
+        sa.Column("added_length_max", sa.Float(), nullable=True),
+        sa.Column("added_weight_sum", sa.Float(), nullable=False),
+        sa.Column("added_weight_min", sa.Float(), nullable=True),
+        sa.Column("added_weight_max", sa.Float(), nullable=True),
+        sa.Column("removed_count", sa.Integer(), nullable=False),
+        sa.Column("storage_min", sa.Float(), nullable=True),
+        sa.Column("storage_max", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    # Заполняем агрегаты по уже накопленным рулонам; архива еще нет
+    rebuild_daily_stats(Session(bind=op.get_bind()), include_archive=False)
+
+
+def downgrade() -> None:
+    op.drop_table("coil_daily_stats")
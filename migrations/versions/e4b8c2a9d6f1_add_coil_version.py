@@ -0,0 +1,33 @@
+"""add_coil_version
+
+Revision ID: e4b8c2a9d6f1
+Revises: d7a2e5c8f1b3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4b8c2a9d6f1"
+down_revision = "d7a2e5c8f1b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "coils",
+        sa.Column(
+            "version",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("1"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("coils") as batch_op:
+        batch_op.drop_column("version")
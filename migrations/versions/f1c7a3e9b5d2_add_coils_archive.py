@@ -0,0 +1,61 @@
+"""add_coils_archive
+
+Revision ID: f1c7a3e9b5d2
+Revises: e4b8c2a9d6f1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f1c7a3e9b5d2"
+down_revision = "e4b8c2a9d6f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # В PostgreSQL архив секционирован по added_at: секции по годам
+    # создаются при переносе, секция по умолчанию ловит остальное.
+    # В SQLite это обычная таблица с теми же индексами.
+    op.create_table(
+        "coils_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("added_at", sa.DateTime(), nullable=False),
+        sa.Column("length", sa.Float(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("removed_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "added_at"),
+        postgresql_partition_by="RANGE (added_at)",
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE coils_archive_default "
+            "PARTITION OF coils_archive DEFAULT"
+        )
+    op.create_index(
+        "ix_coils_archive_added_at_period",
+        "coils_archive",
+        ["added_at", "removed_at", "length", "weight"],
+    )
+    op.create_index(
+        "ix_coils_archive_removed_at_period",
+        "coils_archive",
+        ["removed_at", "added_at", "length", "weight"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_coils_archive_removed_at_period", table_name="coils_archive"
+    )
+    op.drop_index(
+        "ix_coils_archive_added_at_period", table_name="coils_archive"
+    )
+    # Секции удаляются вместе с секционированной таблицей
+    op.drop_table("coils_archive")
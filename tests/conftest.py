@@ -1,10 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from typing import Dict, Iterator
 
+from app.core.cache import clear_caches
 from app.core.database import get_db
 from app.domain.models import Base
 from app.main import app
@@ -12,24 +14,33 @@ from app.main import app
 
 SQLITE_DATABASE_URL = "sqlite:///:memory:"
 
+# Create a sessionmaker to manage sessions
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-engine = create_engine(
-    SQLITE_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
 
-# Create a sessionmaker to manage sessions
-TestingSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine
-)
+@pytest.fixture(scope="session")
+def engine() -> Iterator[Engine]:
+    """Create the in-memory database and its tables once per test run."""
+    engine = create_engine(
+        SQLITE_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
 
-# Create tables in the database
-Base.metadata.create_all(bind=engine)
+@pytest.fixture(autouse=True)
+def reset_caches() -> Iterator[None]:
+    """Caches are process-wide, so they must not leak between tests."""
+    clear_caches()
+    yield
+    clear_caches()
 
 
 @pytest.fixture(scope="function")
-def db_session() -> Iterator[Session]:
+def db_session(engine: Engine) -> Iterator[Session]:
     """Create a new database session with a rollback at the end of the test."""
     connection = engine.connect()
     transaction = connection.begin()
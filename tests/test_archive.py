@@ -0,0 +1,213 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.domain.models import Coil, CoilArchive
+from app.repositories.archive import ARCHIVED_FIELDS
+from app.repositories.coil import CoilRepository
+from app.repositories.daily_stats import DailyStatsRepository
+from app.schemas.coil import CoilFilter
+from tests.test_daily_stats import _snapshot
+
+BASE = datetime(2024, 1, 1)
+# Рулоны, списанные раньше этой даты, уходят в архив
+BEFORE = BASE + timedelta(days=30)
+
+PERIODS = [
+    (BASE, BASE + timedelta(days=60)),
+    (BASE + timedelta(days=3, hours=5), BASE + timedelta(days=20, hours=7)),
+    (BASE + timedelta(days=25), BASE + timedelta(days=45)),
+    (BASE + timedelta(days=40, hours=1), BASE + timedelta(days=55)),
+]
+
+
+@pytest.fixture()
+def repo(db_session: Session) -> CoilRepository:
+    rng = random.Random(17)
+    for _ in range(150):
+        added_at = BASE + timedelta(minutes=rng.randint(0, 60 * 24 * 50))
+        removed_at = None
+        if rng.random() < 0.7:
+            removed_at = added_at + timedelta(
+                minutes=rng.randint(1, 60 * 24 * 10)
+            )
+        db_session.add(
+            Coil(
+                length=round(rng.uniform(1, 100), 2),
+                weight=round(rng.uniform(100, 1000), 2),
+                added_at=added_at,
+                removed_at=removed_at,
+            )
+        )
+    db_session.commit()
+    return CoilRepository(db_session)
+
+
+def _rounded(value: Any) -> Any:
+    # Порядок суммирования float меняется вместе с составом выборки
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rounded(item) for item in value]
+    return value
+
+
+def _results(repo: CoilRepository) -> List[Any]:
+    results: List[Any] = []
+    for start, end in PERIODS:
+        results.append(repo._compute_statistics(start, end))
+        results.append(repo.get_statistics_series(start, end, "day"))
+        results.append(repo.get_inventory(start.date(), end.date()))
+        repo.statistics_cache.clear()
+    coils = sorted(repo.get_all(), key=lambda coil: coil.id)
+    results.append([coil.to_dict() for coil in coils])
+    return _rounded(results)
+
+
+def _archived(db_session: Session) -> int:
+    return db_session.scalar(select(func.count()).select_from(CoilArchive))
+
+
+def test_archive_moves_long_removed_coils(
+    repo: CoilRepository, db_session: Session
+) -> None:
+    expected = db_session.scalar(
+        select(func.count()).where(Coil.removed_at < BEFORE)
+    )
+    assert expected
+
+    moved = repo.archive_removed(BEFORE, batch_size=7)
+
+    assert moved == expected
+    assert _archived(db_session) == expected
+    assert not db_session.scalar(
+        select(func.count()).where(Coil.removed_at < BEFORE)
+    )
+    assert repo.archive.cutoff() < BEFORE
+    assert repo.archive_removed(BEFORE) == 0
+
+
+def test_queries_include_archive_transparently(
+    repo: CoilRepository, db_session: Session
+) -> None:
+    expected = _results(repo)
+    rollup = _rounded(_snapshot(db_session))
+
+    repo.archive_removed(BEFORE)
+
+    assert _results(repo) == expected
+    # Суточные агрегаты не меняются ни при переносе, ни при пересборке
+    assert _rounded(_snapshot(db_session)) == rollup
+    DailyStatsRepository(db_session.connection()).rebuild()
+    assert _rounded(_snapshot(db_session)) == rollup
+
+
+def test_archive_used_only_when_period_needs_it(
+    repo: CoilRepository,
+) -> None:
+    assert repo._coils(None) is Coil
+
+    repo.archive_removed(BEFORE)
+    cutoff = repo.archive.cutoff()
+
+    assert repo._coils(cutoff + timedelta(seconds=1)) is Coil
+    assert repo._coils(cutoff) is not Coil
+    assert repo._coils(None) is not Coil
+
+    recent = (cutoff + timedelta(seconds=1), BASE + timedelta(days=90))
+    assert repo._listing_coils(CoilFilter(removed_at_range=recent)) is Coil
+    assert repo._listing_coils(CoilFilter(added_at_range=recent)) is Coil
+    assert repo._listing_coils(CoilFilter(id_range=(1, 10))) is not Coil
+    # Архив не нужен рулонам на складе; верхняя граница его не исключает
+    assert repo._listing_coils(CoilFilter(in_stock=True)) is Coil
+    upto = CoilFilter(added_at_range=(None, recent[1]))
+    assert repo._listing_coils(upto) is not Coil
+
+
+def test_archive_moved_by_other_process_is_visible(
+    repo: CoilRepository, db_session: Session
+) -> None:
+    assert repo._coils(None) is Coil
+
+    # Перенос в другом процессе: кэши этого процесса о нем не знают
+    rows = db_session.execute(
+        delete(Coil)
+        .where(Coil.removed_at < BEFORE)
+        .returning(*(getattr(Coil, name) for name in ARCHIVED_FIELDS))
+    ).all()
+    db_session.execute(
+        insert(CoilArchive),
+        [{**row._mapping, "archived_at": datetime.now()} for row in rows],
+    )
+    db_session.commit()
+
+    request_repo = CoilRepository(db_session)
+    assert request_repo._coils(None) is not Coil
+    assert request_repo.archive.existing([rows[0].id]) == {rows[0].id}
+
+
+def test_archived_coil_api(
+    test_client: TestClient, repo: CoilRepository, db_session: Session
+) -> None:
+    repo.archive_removed(BEFORE)
+    coil_id = db_session.scalars(select(CoilArchive.id).limit(1)).one()
+
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    assert response.status_code == 200
+    assert response.json()["Coil"]["removed_at"] is not None
+
+    response = test_client.patch(
+        f"/api/v1/coils/{coil_id}", json={"length": 1.0}
+    )
+    assert response.status_code == 409
+    assert test_client.delete(f"/api/v1/coils/{coil_id}").status_code == 400
+
+    response = test_client.post(
+        "/api/v1/coils/bulk/remove", json={"ids": [coil_id]}
+    )
+    assert response.json()["AlreadyRemoved"] == [coil_id]
+
+    listing = test_client.get("/api/v1/coils/", params={"limit": 1000})
+    ids = [coil["id"] for coil in listing.json()["Coils"]]
+    assert coil_id in ids
+
+
+def test_archive_statistics_api(
+    test_client: TestClient, repo: CoilRepository
+) -> None:
+    payload: Dict[str, Any] = {
+        "start_date": BASE.isoformat(),
+        "end_date": (BASE + timedelta(days=60)).isoformat(),
+    }
+    url = "/api/v1/coils/statistics/"
+    expected = _rounded(test_client.post(url, json=payload).json())
+
+    repo.archive_removed(BEFORE)
+
+    assert _rounded(test_client.post(url, json=payload).json()) == expected
+
+
+def test_archived_id_not_reused(
+    test_client: TestClient, db_session: Session
+) -> None:
+    repo = CoilRepository(db_session)
+    ids = []
+    # Дважды: наибольший id уходит в архив, затем создается новый рулон
+    for _ in range(2):
+        coil = repo.create(length=1.0, weight=1.0)
+        repo.remove(coil.id)
+        assert repo.archive_removed(datetime.now() + timedelta(days=1)) == 1
+        ids.append(coil.id)
+    ids.append(repo.create(length=1.0, weight=1.0).id)
+
+    assert len(set(ids)) == 3
+    response = test_client.get(f"/api/v1/coils/{ids[0]}")
+    assert response.status_code == 200
+    assert response.json()["Coil"]["id"] == ids[0]
@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+
+from app.core.database import get_db, is_async_url, to_sync_url
+from app.domain.models import Base
+from app.main import app
+
+
+def test_async_url_detection() -> None:
+    assert is_async_url("postgresql+asyncpg://user@db/severstal")
+    assert is_async_url("sqlite+aiosqlite:///./app.db")
+    assert not is_async_url("postgresql://user@db/severstal")
+    assert (
+        to_sync_url("postgresql+asyncpg://user@db/severstal")
+        == "postgresql://user@db/severstal"
+    )
+    assert to_sync_url("sqlite:///./app.db") == "sqlite:///./app.db"
+
+
+@pytest.fixture()
+def async_client(tmp_path: Path) -> Iterator[TestClient]:
+    """Test client running the endpoints on an AsyncSession (aiosqlite)."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'coils.db'}"
+    sync_engine = create_engine(to_sync_url(url))
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(url, poolclass=NullPool)
+    session_factory = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def test_async_session_crud_flow(async_client: TestClient) -> None:
+    response = async_client.post(
+        "/api/v1/coils/", json={"length": 10.0, "weight": 100.0}
+    )
+    assert response.status_code == 201
+    coil_id = response.json()["id"]
+
+    response = async_client.patch(
+        f"/api/v1/coils/{coil_id}", json={"weight": 150.0}
+    )
+    assert response.status_code == 202
+    assert response.json()["Coil"]["weight"] == 150.0
+
+    response = async_client.post(
+        "/api/v1/coils/bulk",
+        json=[{"length": 20.0, "weight": 200.0}, {"length": 0}],
+    )
+    assert len(response.json()["Created"]) == 1
+
+    response = async_client.get("/api/v1/coils/", params={"limit": 1})
+    assert response.json()["NextCursor"] == coil_id
+
+    response = async_client.get("/api/v1/coils/", params={"stream": True})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["weight"] for row in rows] == [150.0, 200.0]
+
+    response = async_client.delete(f"/api/v1/coils/{coil_id}")
+    assert response.status_code == 202
+    response = async_client.delete(f"/api/v1/coils/{coil_id}")
+    assert response.status_code == 400
+
+    response = async_client.post(
+        "/api/v1/coils/statistics/",
+        json={
+            "start_date": "2000-01-01T00:00:00",
+            "end_date": "2100-01-01T00:00:00",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["added_count"] == 2
+    assert response.json()["removed_count"] == 1
@@ -0,0 +1,96 @@
+from fastapi.testclient import TestClient
+
+
+def test_bulk_create_reports_item_errors(test_client: TestClient) -> None:
+    payload = [
+        {"length": 10.0, "weight": 100.0},
+        {"length": -1.0, "weight": 100.0},
+        {"length": 20.0, "weight": 200.0},
+        {"weight": 300.0},
+    ]
+    response = test_client.post("/api/v1/coils/bulk", json=payload)
+    assert response.status_code == 201
+    response_json = response.json()
+    assert [item["index"] for item in response_json["Created"]] == [0, 2]
+    assert [error["index"] for error in response_json["Errors"]] == [1, 3]
+
+    coil_id = response_json["Created"][1]["id"]
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    assert response.status_code == 200
+    assert response.json()["Coil"]["weight"] == 200.0
+
+
+def test_bulk_create_in_several_batches(test_client: TestClient) -> None:
+    payload = [
+        {"length": float(i + 1), "weight": 10.0} for i in range(1200)
+    ]
+    response = test_client.post("/api/v1/coils/bulk", json=payload)
+    assert response.status_code == 201
+    created = response.json()["Created"]
+    assert len(created) == 1200
+    ids = [item["id"] for item in created]
+    assert ids == sorted(ids)
+
+
+def test_bulk_import_ndjson(test_client: TestClient) -> None:
+    body = "\n".join(
+        [
+            '{"length": 10, "weight": 100}',
+            "not json",
+            '{"length": 5, "weight": 1}',
+        ]
+    )
+    response = test_client.post(
+        "/api/v1/coils/bulk/import",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    response_json = response.json()
+    assert [item["index"] for item in response_json["Created"]] == [0, 2]
+    assert response_json["Errors"][0]["index"] == 1
+
+
+def test_bulk_import_csv(test_client: TestClient) -> None:
+    body = "length;weight\n10.5;1000\n11;abc\n"
+    response = test_client.post(
+        "/api/v1/coils/bulk/import",
+        content=body,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 201
+    response_json = response.json()
+    assert len(response_json["Created"]) == 1
+    assert response_json["Errors"][0]["index"] == 1
+
+
+def test_bulk_import_csv_extra_fields(test_client: TestClient) -> None:
+    body = "length,weight\n10.5,1000\n11,20,30\n12,40\n"
+    response = test_client.post(
+        "/api/v1/coils/bulk/import",
+        content=body,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 201
+    response_json = response.json()
+    assert [item["index"] for item in response_json["Created"]] == [0, 2]
+    assert [item["index"] for item in response_json["Errors"]] == [1]
+
+
+def test_bulk_import_unsupported_format(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/api/v1/coils/bulk/import",
+        content="<coils/>",
+        headers={"Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
+
+
+def test_bulk_import_not_utf8(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/api/v1/coils/bulk/import",
+        content="length;weight\nдлина;вес\n".encode("cp1251"),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 400
+    assert "UTF-8" in response.json()["detail"]
@@ -0,0 +1,89 @@
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.repositories.daily_stats import DailyStatsRepository
+from tests.test_daily_stats import _snapshot
+
+
+def _create_coils(
+    test_client: TestClient, weights: list[float]
+) -> list[int]:
+    return [
+        test_client.post(
+            "/api/v1/coils/", json={"length": 10.0, "weight": weight}
+        ).json()["id"]
+        for weight in weights
+    ]
+
+
+def test_bulk_remove_by_ids(test_client: TestClient) -> None:
+    ids = _create_coils(test_client, [100.0, 200.0, 300.0])
+    test_client.delete(f"/api/v1/coils/{ids[0]}")
+    missing_id = ids[-1] + 1000
+
+    response = test_client.post(
+        "/api/v1/coils/bulk/remove",
+        json={"ids": [ids[0], ids[1], ids[2], missing_id]},
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["Removed"] == [ids[1], ids[2]]
+    assert response_json["AlreadyRemoved"] == [ids[0]]
+    assert response_json["Missing"] == [missing_id]
+
+    coil = test_client.get(f"/api/v1/coils/{ids[1]}").json()["Coil"]
+    assert coil["removed_at"] is not None
+    assert coil["version"] == 2
+
+
+def test_bulk_remove_by_filter(test_client: TestClient) -> None:
+    ids = _create_coils(test_client, [100.0, 200.0, 300.0, 400.0])
+
+    response = test_client.post(
+        "/api/v1/coils/bulk/remove",
+        json={"filter": {"weight_range": [150.0, 350.0]}},
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["Removed"] == ids[1:3]
+    assert response_json["AlreadyRemoved"] == []
+    assert response_json["Missing"] == []
+
+    statistics = test_client.post(
+        "/api/v1/coils/statistics/",
+        json={
+            "start_date": "2000-01-01T00:00:00",
+            "end_date": "2100-01-01T00:00:00",
+        },
+    ).json()
+    assert statistics["removed_count"] == 2
+
+
+def test_bulk_remove_validation(test_client: TestClient) -> None:
+    url = "/api/v1/coils/bulk/remove"
+    payloads: list[Dict[str, Any]] = [
+        {},
+        {"ids": [1], "filter": {"id_range": [1, 2]}},
+        {"filter": {}},
+        {"filter": {"id_range": None}},
+        {"filter": {"weight_range": [None, None], "in_stock": True}},
+    ]
+    for payload in payloads:
+        assert test_client.post(url, json=payload).status_code == 400
+
+
+def test_bulk_remove_keeps_rollup_consistent(
+    test_client: TestClient, db_session: Session
+) -> None:
+    ids = _create_coils(test_client, [100.0, 200.0, 300.0])
+    test_client.post("/api/v1/coils/bulk/remove", json={"ids": ids[:2]})
+
+    incremental = _snapshot(db_session)
+    DailyStatsRepository(db_session.connection()).rebuild()
+    rebuilt = _snapshot(db_session)
+    assert len(incremental) == len(rebuilt)
+    for left, right in zip(incremental, rebuilt):
+        assert left == pytest.approx(right, abs=1e-2)
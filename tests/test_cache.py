@@ -0,0 +1,86 @@
+import time
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import cache
+from app.core.cache import LRUCache, NullCache, get_cache
+from app.core.config import get_settings
+
+STATISTICS_RANGE = {
+    "start_date": "2000-01-01T00:00:00",
+    "end_date": "2100-01-01T00:00:00",
+}
+
+
+def _cache_stats(test_client: TestClient, name: str) -> Dict[str, Any]:
+    response = test_client.get("/api/v1/monitoring/cache")
+    return response.json()[name]
+
+
+def test_lru_cache_eviction_and_ttl() -> None:
+    cache = LRUCache(max_entries=2, ttl_seconds=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_disabled_with_multiple_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(cache, "_caches", {})
+    monkeypatch.setattr(get_settings(), "SERVER_WORKERS", 1)
+    assert isinstance(get_cache("single"), LRUCache)
+    # Воркеры не видят изменений друг друга в своих кэшах
+    monkeypatch.setattr(get_settings(), "SERVER_WORKERS", 4)
+    assert isinstance(get_cache("shared"), NullCache)
+
+
+def test_get_coil_is_cached_and_invalidated(
+    test_client: TestClient,
+    coil_payload: Dict[str, Any],
+    coil_payload_updated: Dict[str, Any],
+) -> None:
+    response = test_client.post("/api/v1/coils/", json=coil_payload)
+    coil_id = response.json()["id"]
+    before = _cache_stats(test_client, "coils")
+    test_client.get(f"/api/v1/coils/{coil_id}")
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    assert response.json()["Coil"]["weight"] == coil_payload["weight"]
+    after = _cache_stats(test_client, "coils")
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+    # PATCH по закэшированному рулону сохраняется и сбрасывает кэш
+    test_client.patch(f"/api/v1/coils/{coil_id}", json=coil_payload_updated)
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    coil = response.json()["Coil"]
+    assert coil["weight"] == coil_payload_updated["weight"]
+    assert coil["updated_at"] is not None
+
+    test_client.delete(f"/api/v1/coils/{coil_id}")
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    assert response.json()["Coil"]["removed_at"] is not None
+
+
+def test_statistics_cache_invalidated_on_create(
+    test_client: TestClient, coil_payload: Dict[str, Any]
+) -> None:
+    test_client.post("/api/v1/coils/", json=coil_payload)
+    url = "/api/v1/coils/statistics/"
+    first = test_client.post(url, json=STATISTICS_RANGE).json()
+    before = _cache_stats(test_client, "statistics")
+    assert test_client.post(url, json=STATISTICS_RANGE).json() == first
+    after = _cache_stats(test_client, "statistics")
+    assert after["hits"] - before["hits"] == 1
+
+    test_client.post("/api/v1/coils/", json=coil_payload)
+    second = test_client.post(url, json=STATISTICS_RANGE).json()
+    assert second["added_count"] == first["added_count"] + 1
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.endpoints.coils import _sse
+from app.core.events import ChangeBroadcaster, get_broadcaster
+from app.domain.models import CoilEvent
+from app.feed import _Position, follow
+from app.repositories.coil import AsyncCoilRepository, CoilRepository
+from app.repositories.events import CoilEventRepository
+from app.schemas.coil import CoilCreate
+
+
+def _kinds(events: List[Any]) -> List[Any]:
+    return [(event["kind"], event["coil_id"]) for event in events]
+
+
+def test_changes_recorded_in_log(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    coil = repo.create(length=10.0, weight=100.0)
+    repo.update(coil.id, weight=150.0)
+    repo.remove(coil.id)
+    ids = repo.create_many(
+        [CoilCreate(length=5.0, weight=50.0) for _ in range(3)]
+    )
+    repo.remove_many(ids=ids[:2])
+
+    events = CoilEventRepository(db_session).since(0, 100)
+
+    assert _kinds(events) == [
+        ("created", coil.id),
+        ("updated", coil.id),
+        ("removed", coil.id),
+        *(("created", coil_id) for coil_id in ids),
+        *(("removed", coil_id) for coil_id in ids[:2]),
+    ]
+    assert [event["version"] for event in events[:3]] == [1, 2, 3]
+    assert events[1]["weight"] == 150.0
+    assert [event["id"] for event in events] == sorted(
+        event["id"] for event in events
+    )
+
+
+def test_broadcaster_delivers_from_other_threads() -> None:
+    broadcaster = ChangeBroadcaster(queue_size=1)
+
+    async def scenario() -> None:
+        subscription = broadcaster.subscribe()
+        thread = threading.Thread(
+            target=broadcaster.publish, args=([{"id": 1}],)
+        )
+        thread.start()
+        assert await asyncio.wait_for(subscription.get(), 1) == [{"id": 1}]
+        thread.join()
+
+        # Очередь на одну пачку: вторая пачка теряется, о чем говорит флаг
+        broadcaster.publish([{"id": 2}])
+        broadcaster.publish([{"id": 3}])
+        await asyncio.sleep(0)
+        assert subscription.overflowed
+        subscription.drain()
+        assert subscription.queue.empty() and not subscription.overflowed
+
+        broadcaster.unsubscribe(subscription)
+        assert broadcaster.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_follow_resumes_and_streams_live(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    first = repo.create(length=1.0, weight=1.0)
+    second = repo.create(length=2.0, weight=2.0)
+    after_id = CoilEventRepository(db_session).since(0, 1)[0]["id"]
+
+    async def scenario() -> List[Any]:
+        received: List[Any] = []
+        # Журнал опрашивается редко: живое событие приходит рассылкой
+        feed = follow(
+            AsyncCoilRepository(db_session),
+            get_broadcaster(),
+            after_id,
+            poll_seconds=30,
+        )
+        async for events in feed:
+            received.extend(events)
+            if len(received) == 1:
+                await asyncio.to_thread(repo.create, 3.0, 3.0)
+            if len(received) == 2:
+                break
+        await feed.aclose()
+        return received
+
+    received = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert received[0]["coil_id"] == second.id
+    assert received[1]["kind"] == "created"
+    assert received[1]["coil_id"] not in (first.id, second.id)
+    assert get_broadcaster().subscribers == 0
+
+
+def test_follow_reports_reset_after_prune(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    for weight in (1.0, 2.0, 3.0):
+        repo.create(length=1.0, weight=weight)
+    log = CoilEventRepository(db_session)
+    first_id = log.since(0, 1)[0]["id"]
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    assert log.prune(future) == 3
+    repo.create(length=1.0, weight=4.0)
+
+    async def scenario() -> List[Any]:
+        feed = follow(
+            AsyncCoilRepository(db_session), ChangeBroadcaster(), first_id
+        )
+        reset = await feed.__anext__()
+        events = await feed.__anext__()
+        await feed.aclose()
+        return reset + events
+
+    reset, event = asyncio.run(scenario())
+
+    assert reset == {"id": first_id, "kind": "reset"}
+    assert event["weight"] == 4.0
+
+
+def _log_event(db_session: Session, event_id: int) -> None:
+    db_session.add(
+        CoilEvent(
+            id=event_id,
+            kind="created",
+            coil_id=event_id,
+            version=1,
+            length=1.0,
+            weight=1.0,
+            occurred_at=datetime(2025, 1, 1),
+        )
+    )
+    db_session.commit()
+
+
+def test_follow_delivers_event_committed_late(db_session: Session) -> None:
+    # Событие 3 зафиксировано раньше события 2 (в PostgreSQL id выдается
+    # при INSERT), событие 5 - раньше 4, а 4 так и не появится
+    _log_event(db_session, 1)
+    _log_event(db_session, 3)
+
+    async def scenario() -> List[Any]:
+        received: List[Any] = []
+        feed = follow(
+            AsyncCoilRepository(db_session),
+            ChangeBroadcaster(),
+            1,
+            poll_seconds=0.01,
+            gap_seconds=0.5,
+        )
+        async for events in feed:
+            received.extend(event["id"] for event in events)
+            if received == [3]:
+                await asyncio.to_thread(_log_event, db_session, 2)
+                await asyncio.to_thread(_log_event, db_session, 5)
+            if len(received) == 3:
+                break
+        await feed.aclose()
+        return received
+
+    received = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert sorted(received) == [2, 3, 5]
+
+
+def test_position_forgets_gaps_after_timeout() -> None:
+    position = _Position(1, gap_seconds=0.05)
+    events = [{"id": event_id} for event_id in (2, 5, 3)]
+    assert position.accept(events) == events
+    assert position.accept([{"id": 3}]) == []
+    assert position.oldest_gap() == 4
+    time.sleep(0.06)
+    # Откаченная транзакция не заполнит пропуск, его перестают ждать
+    assert position.oldest_gap() is None
+    assert position.accept([{"id": 4}]) == []
+
+
+def test_websocket_feed(test_client: TestClient) -> None:
+    url = "/api/v1/coils/"
+    created = test_client.post(url, json={"length": 1.0, "weight": 1.0})
+    coil_id = created.json()["id"]
+
+    feed_url = "/api/v1/coils/events/ws?after_id=0"
+    with test_client.websocket_connect(feed_url) as ws:
+        event = ws.receive_json()
+        assert (event["kind"], event["coil_id"]) == ("created", coil_id)
+
+        test_client.delete(f"{url}{coil_id}")
+        event = ws.receive_json()
+        assert (event["kind"], event["coil_id"]) == ("removed", coil_id)
+        assert event["version"] == 2
+
+
+def test_sse_format() -> None:
+    async def batches() -> AsyncIterator[List[Any]]:
+        yield []
+        yield [{"id": 7, "kind": "removed", "coil_id": 3}]
+
+    async def scenario() -> List[bytes]:
+        return [chunk async for chunk in _sse(batches())]
+
+    keep_alive, message = asyncio.run(scenario())
+
+    assert keep_alive == b": keep-alive\n\n"
+    assert message.startswith(b"id: 7\nevent: removed\ndata: {")
+    assert message.endswith(b"}\n\n")
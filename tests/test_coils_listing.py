@@ -0,0 +1,134 @@
+import json
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+
+
+def _create_coils(
+    test_client: TestClient, coil_payload: Dict[str, Any], count: int
+) -> list[int]:
+    return [
+        test_client.post("/api/v1/coils/", json=coil_payload).json()["id"]
+        for _ in range(count)
+    ]
+
+
+def test_get_coils_keyset_pagination(
+    test_client: TestClient, coil_payload: Dict[str, Any]
+) -> None:
+    ids = _create_coils(test_client, coil_payload, 5)
+
+    response = test_client.get("/api/v1/coils/", params={"limit": 2})
+    assert response.status_code == 200
+    response_json = response.json()
+    assert [coil["id"] for coil in response_json["Coils"]] == ids[:2]
+    assert response_json["NextCursor"] == ids[1]
+
+    seen = []
+    after_id = None
+    while True:
+        params: Dict[str, Any] = {"limit": 2}
+        if after_id is not None:
+            params["after_id"] = after_id
+        response_json = test_client.get(
+            "/api/v1/coils/", params=params
+        ).json()
+        seen.extend(coil["id"] for coil in response_json["Coils"])
+        after_id = response_json["NextCursor"]
+        if after_id is None:
+            break
+    assert seen == ids
+
+
+def test_get_coils_limit_validation(test_client: TestClient) -> None:
+    response = test_client.get("/api/v1/coils/", params={"limit": 0})
+    assert response.status_code == 422
+
+
+def test_get_coils_stream_ndjson(
+    test_client: TestClient, coil_payload: Dict[str, Any]
+) -> None:
+    ids = _create_coils(test_client, coil_payload, 3)
+
+    response = test_client.get(
+        "/api/v1/coils/", params={"stream": True, "after_id": ids[0]}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids[1:]
+    assert rows[0]["weight"] == coil_payload["weight"]
+
+
+def test_get_coils_fast_json_matches_models(
+    test_client: TestClient,
+    coil_payload: Dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ids = _create_coils(test_client, coil_payload, 3)
+    test_client.delete(f"/api/v1/coils/{ids[0]}")
+    test_client.patch(f"/api/v1/coils/{ids[1]}", json={"length": 7.5})
+
+    responses = {}
+    for fast in (True, False):
+        monkeypatch.setattr(get_settings(), "FAST_JSON_ENABLED", fast)
+        page = test_client.get("/api/v1/coils/", params={"limit": 2})
+        stream = test_client.get("/api/v1/coils/", params={"stream": True})
+        responses[fast] = (page.json(), stream.text.splitlines())
+
+    assert responses[True] == responses[False]
+    page, lines = responses[True]
+    assert [coil["id"] for coil in page["Coils"]] == ids[:2]
+    assert page["Coils"][0]["removed_at"] is not None
+    assert [json.loads(line)["id"] for line in lines] == ids
+
+
+def test_get_coils_half_open_ranges(test_client: TestClient) -> None:
+    weights = (100.0, 200.0, 300.0)
+    ids = [
+        test_client.post(
+            "/api/v1/coils/", json={"length": 10.0, "weight": weight}
+        ).json()["id"]
+        for weight in weights
+    ]
+
+    def listed(**params: Any) -> list[int]:
+        response = test_client.get("/api/v1/coils/", params=params)
+        assert response.status_code == 200
+        return [coil["id"] for coil in response.json()["Coils"]]
+
+    # Одна граница раньше молча игнорировалась
+    assert listed(weight_min=200.0) == ids[1:]
+    assert listed(weight_max=200.0) == ids[:2]
+    assert listed(id_min=0, id_max=ids[0]) == ids[:1]
+    assert listed(length_min=20.0) == []
+
+
+def test_get_coils_in_stock_and_order(
+    test_client: TestClient, coil_payload: Dict[str, Any]
+) -> None:
+    ids = _create_coils(test_client, coil_payload, 4)
+    test_client.delete(f"/api/v1/coils/{ids[1]}")
+
+    response = test_client.get("/api/v1/coils/", params={"in_stock": True})
+    assert [coil["id"] for coil in response.json()["Coils"]] == [
+        ids[0],
+        *ids[2:],
+    ]
+
+    # Курсор в обратном порядке ведет к меньшим id
+    seen = []
+    params: Dict[str, Any] = {"order": "desc", "limit": 3}
+    while True:
+        page = test_client.get("/api/v1/coils/", params=params).json()
+        seen.extend(coil["id"] for coil in page["Coils"])
+        if page["NextCursor"] is None:
+            break
+        params["after_id"] = page["NextCursor"]
+    assert seen == ids[::-1]
+
+    response = test_client.get("/api/v1/coils/", params={"order": "up"})
+    assert response.status_code == 422
@@ -143,5 +143,6 @@ def test_get_coils_with_filters(
     )
     assert response.status_code == 200
     response_json = response.json()
-    assert len(response_json) == 1
-    assert response_json[0]["weight"] == coil_payload_updated["weight"]
+    coils = response_json["Coils"]
+    assert len(coils) == 1
+    assert coils[0]["weight"] == coil_payload_updated["weight"]
@@ -0,0 +1,199 @@
+import random
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.domain.models import Base, Coil, CoilDailyStats
+from app.repositories.coil import CoilRepository
+from app.repositories.daily_stats import (
+    ROLLUP_FIELDS,
+    DailyStatsRepository,
+)
+from app.schemas.coil import CoilCreate
+
+BASE = datetime(2025, 1, 1)
+
+
+def _raw_statistics(
+    repo: CoilRepository, start: datetime, end: datetime
+) -> Dict[str, Any]:
+    row = repo.session.execute(*repo._statistics_query(start, end)).one()
+    return dict(row._mapping)
+
+
+def _snapshot(db_session: Session) -> List[Any]:
+    rows = db_session.scalars(
+        select(CoilDailyStats).order_by(CoilDailyStats.day)
+    ).all()
+    return [
+        [getattr(row, field) for field in ("day", *ROLLUP_FIELDS)]
+        for row in rows
+        if row.added_count or row.removed_count
+    ]
+
+
+@pytest.fixture()
+def populated(db_session: Session) -> CoilRepository:
+    rng = random.Random(42)
+    for _ in range(120):
+        added_at = BASE + timedelta(minutes=rng.randint(0, 60 * 24 * 40))
+        removed_at = None
+        if rng.random() < 0.6:
+            removed_at = added_at + timedelta(
+                minutes=rng.randint(1, 60 * 24 * 10)
+            )
+        db_session.add(
+            Coil(
+                length=round(rng.uniform(1, 100), 2),
+                weight=round(rng.uniform(100, 1000), 2),
+                added_at=added_at,
+                removed_at=removed_at,
+            )
+        )
+    db_session.commit()
+
+    repo = CoilRepository(db_session)
+    repo.create_many(
+        [CoilCreate(length=5.0, weight=50.0) for _ in range(3)]
+    )
+    # Изменения и списания после добавления
+    coils = db_session.scalars(select(Coil).order_by(Coil.id)).all()
+    for coil in coils[:20]:
+        repo.update(coil.id, length=coil.length + 1000, weight=1.0)
+    for coil in coils[20:40]:
+        if coil.removed_at is None:
+            coil.removed_at = coil.added_at + timedelta(hours=5)
+            db_session.commit()
+    for coil in coils[40:45]:
+        if coil.removed_at is None:
+            repo.remove(coil.id)
+    return repo
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (
+            BASE + timedelta(days=3, hours=5),
+            BASE + timedelta(days=17, hours=2),
+        ),
+        (BASE, BASE + timedelta(days=40)),
+        (BASE - timedelta(days=30), BASE + timedelta(days=365)),
+        (BASE + timedelta(days=10), BASE + timedelta(days=12)),
+    ],
+)
+def test_rollup_statistics_match_raw_query(
+    populated: CoilRepository, start: datetime, end: datetime
+) -> None:
+    raw = _raw_statistics(populated, start, end)
+    statistics = populated._compute_statistics(start, end)
+
+    assert statistics["added_count"] == raw["added_count"]
+    assert statistics["removed_count"] == raw["removed_count"]
+    for key in ("min_length", "max_length", "min_weight", "max_weight"):
+        assert statistics[key] == raw[key]
+    for key in ("avg_length", "avg_weight", "total_weight"):
+        assert statistics[key] == pytest.approx(raw[key])
+    for key in ("min_storage_time", "max_storage_time"):
+        assert float(statistics[key]) == pytest.approx(
+            raw[key], abs=1e-2
+        )
+
+
+def test_rollup_storage_time_matches_raw_query(
+    db_session: Session,
+) -> None:
+    rng = random.Random(7)
+    # Время хранения с долями миллисекунд, по рулону на день
+    for day in range(200):
+        added_at = BASE + timedelta(
+            days=day, microseconds=rng.randint(0, 10**6)
+        )
+        db_session.add(
+            Coil(
+                length=1.0,
+                weight=1.0,
+                added_at=added_at,
+                removed_at=added_at
+                + timedelta(microseconds=rng.randint(1, 10**6)),
+            )
+        )
+    db_session.commit()
+    repo = CoilRepository(db_session)
+    start, end = BASE, BASE + timedelta(days=200)
+
+    raw = _raw_statistics(repo, start, end)
+    statistics = repo._compute_statistics(start, end)
+    for key in ("min_storage_time", "max_storage_time"):
+        assert float(statistics[key]) == raw[key]
+
+    incremental = _snapshot(db_session)
+    DailyStatsRepository(db_session.connection()).rebuild()
+    assert _snapshot(db_session) == incremental
+
+
+def test_rebuild_matches_incremental_rollup(
+    populated: CoilRepository, db_session: Session
+) -> None:
+    incremental = _snapshot(db_session)
+    DailyStatsRepository(db_session.connection()).rebuild()
+    rebuilt = _snapshot(db_session)
+    assert len(incremental) == len(rebuilt)
+    for left, right in zip(incremental, rebuilt):
+        assert left == pytest.approx(right, abs=1e-2)
+
+
+def test_refresh_keeps_concurrent_increment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'coils.db'}",
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Coil(length=1.0, weight=10.0, added_at=BASE))
+        session.commit()
+
+    collected = threading.Event()
+    created = threading.Event()
+    collect = DailyStatsRepository._collect
+
+    def slow_collect(self: DailyStatsRepository, *args: Any) -> Any:
+        rows = collect(self, *args)
+        collected.set()
+        # Создание того же дня успевает зафиксироваться, если пересчет
+        # не заблокировал строку дня
+        created.wait(0.5)
+        return rows
+
+    def create() -> None:
+        collected.wait()
+        with Session(engine) as session:
+            # Приращение дня делает обработчик flush
+            added_at = BASE + timedelta(hours=1)
+            session.add(Coil(length=2.0, weight=20.0, added_at=added_at))
+            session.commit()
+        created.set()
+
+    monkeypatch.setattr(DailyStatsRepository, "_collect", slow_collect)
+    thread = threading.Thread(target=create)
+    thread.start()
+    with Session(engine) as session:
+        DailyStatsRepository(session.connection()).refresh_days(
+            {BASE.date()}
+        )
+        session.commit()
+    thread.join()
+    monkeypatch.undo()
+
+    with Session(engine) as session:
+        incremental = _snapshot(session)
+        DailyStatsRepository(session.connection()).rebuild()
+        assert incremental == _snapshot(session)
+    engine.dispose()
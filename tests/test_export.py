@@ -0,0 +1,83 @@
+import io
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.export import export_to_file
+from app.repositories.coil import CoilRepository
+from app.schemas.coil import CoilFilter
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _create_coils(
+    test_client: TestClient, coil_payload: Dict[str, Any], count: int
+) -> list[int]:
+    return [
+        test_client.post("/api/v1/coils/", json=coil_payload).json()["id"]
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_export_endpoint(
+    test_client: TestClient, coil_payload: Dict[str, Any], fmt: str
+) -> None:
+    ids = _create_coils(test_client, coil_payload, 4)
+    test_client.delete(f"/api/v1/coils/{ids[0]}")
+
+    response = test_client.get(
+        "/api/v1/coils/export",
+        params={"format": fmt, "id_min": ids[0], "id_max": ids[2]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd")
+
+    if fmt == "arrow":
+        table = pa.ipc.open_stream(response.content).read_all()
+    else:
+        table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("id").to_pylist() == ids[:3]
+    assert table.schema.field("weight").type == pa.float64()
+    assert str(table.schema.field("added_at").type) == "timestamp[us, tz=UTC]"
+    removed = table.column("removed_at").to_pylist()
+    assert removed[0] is not None
+    assert removed[1:] == [None, None]
+    # Версия нужна клиенту выгрузки для If-Match при изменении рулона
+    assert table.schema.field("version").type == pa.int64()
+    assert not table.schema.field("version").nullable
+    assert table.column("version").to_pylist() == [2, 1, 1]
+
+
+def test_export_endpoint_rejects_unknown_format(
+    test_client: TestClient,
+) -> None:
+    response = test_client.get(
+        "/api/v1/coils/export", params={"format": "csv"}
+    )
+    assert response.status_code == 422
+
+
+def test_export_to_file_in_batches(
+    db_session: Session, tmp_path: Path
+) -> None:
+    repo = CoilRepository(db_session)
+    for weight in (100.0, 200.0, 300.0, 400.0, 500.0):
+        repo.create(length=10.0, weight=weight)
+
+    path = tmp_path / "coils.parquet"
+    batches = repo.iter_row_batches(
+        CoilFilter(weight_range=(200.0, 400.0)), batch_size=2
+    )
+    rows = export_to_file(batches, path, "parquet")
+
+    assert rows == 3
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 2
+    assert parquet.metadata.row_group(0).column(0).compression == "ZSTD"
+    table = parquet.read()
+    assert table.column("weight").to_pylist() == [200.0, 300.0, 400.0]
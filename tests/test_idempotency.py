@@ -0,0 +1,98 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import NullCache
+from app.domain.models import Base, Coil
+from app.repositories.coil import CoilRepository
+from app.repositories.idempotency import IdempotencyRepository
+
+URL = "/api/v1/coils/"
+
+
+def _count(session: Session) -> int:
+    return session.scalar(select(func.count()).select_from(Coil))
+
+
+def test_repeated_key_returns_original_response(
+    test_client: TestClient, db_session: Session
+) -> None:
+    headers = {"Idempotency-Key": "scanner-7:0001"}
+    payload = {"length": 12.5, "weight": 340.0}
+
+    first = test_client.post(URL, json=payload, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    # Повтор из кэша и, после его очистки, из таблицы
+    replay = test_client.post(URL, json=payload, headers=headers)
+    IdempotencyRepository(db_session).cache.clear()
+    stored = test_client.post(URL, json=payload, headers=headers)
+
+    for response in (replay, stored):
+        assert response.status_code == 201
+        assert response.headers["Idempotent-Replayed"] == "true"
+        assert response.json() == first.json()
+    assert _count(db_session) == 1
+
+    other = test_client.post(
+        URL, json=payload, headers={"Idempotency-Key": "scanner-7:0002"}
+    )
+    assert other.json()["id"] != first.json()["id"]
+
+
+def test_key_reused_with_other_payload(test_client: TestClient) -> None:
+    headers = {"Idempotency-Key": "scanner-7:0003"}
+    test_client.post(URL, json={"length": 1.0, "weight": 1.0}, headers=headers)
+
+    response = test_client.post(
+        URL, json={"length": 2.0, "weight": 1.0}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_concurrent_duplicate_submissions(tmp_path: Path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'coils.db'}",
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    results: List[Tuple[int, bool]] = []
+    barrier = threading.Barrier(8)
+
+    def submit() -> None:
+        with Session(engine) as session:
+            repo = CoilRepository(
+                session, coil_cache=NullCache(), statistics_cache=NullCache()
+            )
+            # Без кэша все повторы проходят через таблицу
+            repo.idempotency.cache = NullCache()
+            barrier.wait()
+            coil, replayed = repo.create_idempotent(1.0, 2.0, "retry")
+            results.append((coil.id, replayed))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({coil_id for coil_id, _ in results}) == 1
+    assert sorted(replayed for _, replayed in results) == [False] + [True] * 7
+    with Session(engine) as session:
+        assert _count(session) == 1
+    engine.dispose()
+
+
+def test_prune_expired_keys(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    repo.create_idempotent(1.0, 1.0, "old")
+    keys = IdempotencyRepository(db_session)
+
+    assert keys.prune(datetime.now(timezone.utc) - timedelta(hours=1)) == 0
+    assert keys.prune(datetime.now(timezone.utc) + timedelta(hours=1)) == 1
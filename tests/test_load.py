@@ -0,0 +1,108 @@
+import asyncio
+import random
+from typing import Any, Dict
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from benchmarks.load import (
+    OPERATIONS,
+    PROFILES,
+    Warehouse,
+    format_stage,
+    parse_mix,
+    percentile,
+    run_ramp,
+    run_stage,
+    saturation_point,
+)
+
+
+def test_percentile() -> None:
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 95) == 0.0
+
+
+def test_mix_and_profiles() -> None:
+    assert parse_mix("create=40, get=60") == {"create": 40.0, "get": 60.0}
+    with pytest.raises(ValueError):
+        parse_mix("launch=1")
+    with pytest.raises(ValueError):
+        parse_mix("create=0")
+    for profile in PROFILES.values():
+        assert set(profile) == set(OPERATIONS)
+    assert sum(PROFILES["shift"].values()) == pytest.approx(100)
+
+
+def test_warehouse_take_removes_coil() -> None:
+    warehouse = Warehouse(random.Random(1))
+    for coil_id in range(5):
+        warehouse.add(coil_id)
+    taken = {warehouse.take() for _ in range(5)}
+    assert taken == set(range(5))
+    assert warehouse.take() is None
+    assert warehouse.pick() is None
+
+
+def test_saturation_point() -> None:
+    def stage(concurrency: int, throughput: float) -> Dict[str, Any]:
+        return {
+            "concurrency": concurrency,
+            "operations": {"all": {"throughput": throughput}},
+        }
+
+    stages = [stage(1, 100), stage(2, 180), stage(4, 196), stage(8, 200)]
+    assert saturation_point(stages) == 4
+    assert saturation_point([]) is None
+
+
+def test_run_ramp_in_process(test_client: TestClient) -> None:
+    async def ramp() -> Dict[str, Any]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            # Сессия тестов одна на все запросы, поэтому без параллельности
+            return await run_ramp(
+                client, PROFILES["shift"], [1], duration=0.5, seed_coils=20
+            )
+
+    result = asyncio.run(ramp())
+
+    assert result["saturation"] == 1
+    operations = result["stages"][0]["operations"]
+    assert operations["all"]["requests"] > 0
+    assert operations["all"]["errors"] == 0
+    assert operations["all"]["p99_ms"] >= operations["all"]["p50_ms"]
+    assert "Параллельность 1" in format_stage(result["stages"][0])
+
+
+def test_empty_warehouse_fallback_counted_as_create(
+    test_client: TestClient,
+) -> None:
+    async def stage() -> Dict[str, Any]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            # Каждое второе списание застает склад пустым
+            warehouse = Warehouse(random.Random(1))
+            return await run_stage(
+                client, warehouse, {"delete": 1.0}, 1, duration=0.3
+            )
+
+    operations = asyncio.run(stage())["operations"]
+
+    fallbacks = operations["delete"]["fallbacks"]
+    assert fallbacks > 0
+    assert operations["create"]["requests"] == fallbacks
+    assert operations["create"]["fallbacks"] == 0
+    assert operations["all"]["fallbacks"] == fallbacks
+    assert operations["all"]["requests"] == (
+        operations["delete"]["requests"] + fallbacks
+    )
@@ -0,0 +1,82 @@
+import re
+from typing import Dict
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import InstrumentationMiddleware
+from app.core.metrics import MetricsRegistry, RequestStats, get_registry
+
+
+def test_server_timing_counts_queries(
+    test_client: TestClient, coil_payload: Dict[str, float]
+) -> None:
+    response = test_client.post("/api/v1/coils/", json=coil_payload)
+    coil_id = response.json()["id"]
+
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    assert response.status_code == 200
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("app;dur=")
+    queries = re.search(r'desc="(\d+) queries"', server_timing)
+    assert queries is not None
+    assert int(queries.group(1)) >= 1
+
+
+def test_metrics_endpoint_uses_route_templates(
+    test_client: TestClient, coil_payload: Dict[str, float]
+) -> None:
+    response = test_client.post("/api/v1/coils/", json=coil_payload)
+    coil_id = response.json()["id"]
+    test_client.get(f"/api/v1/coils/{coil_id}")
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'route="/api/v1/coils/{coil_id}"' in body
+    assert f'route="/api/v1/coils/{coil_id}"' not in body
+    assert "http_request_db_queries_total" in body
+    assert "db_queries_total" in body
+    assert 'db_pool{stat="checkouts"}' in body
+
+
+def test_registry_renders_histogram() -> None:
+    registry = MetricsRegistry([0.1, 1.0])
+    stats = RequestStats()
+    stats.queries = 3
+    stats.db_seconds = 0.02
+    registry.observe_request("GET", "/items", 200, 0.05, stats)
+    registry.observe_request("GET", "/items", 200, 0.5)
+
+    body = registry.render()
+    labels = 'method="GET",route="/items"'
+    assert f'http_requests_total{{{labels},status="200"}} 2' in body
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in (
+        body
+    )
+    assert f'http_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in (
+        body
+    )
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in (
+        body
+    )
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in body
+    assert f"http_request_db_queries_total{{{labels}}} 3" in body
+
+
+def test_server_timing_can_be_disabled() -> None:
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, server_timing=False)
+
+    @app.get("/ping")
+    def ping() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    before = get_registry().render()
+    response = TestClient(app).get("/ping")
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    assert 'route="/ping"' not in before
+    assert 'route="/ping"' in get_registry().render()
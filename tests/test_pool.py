@@ -0,0 +1,71 @@
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import Settings
+from app.core.database import engine_options, set_sqlite_pragmas
+from app.core.pool import PoolStats, pool_status, track_pool
+
+
+def test_pool_metrics_endpoint(test_client: TestClient) -> None:
+    response = test_client.get("/api/v1/monitoring/pool")
+    assert response.status_code == 200
+    response_json = response.json()
+    assert "pool_class" in response_json
+    assert "waits" in response_json
+
+
+def test_sqlite_file_engine_tuning(tmp_path: Path) -> None:
+    url = f"sqlite:///{tmp_path / 'coils.db'}"
+    settings = Settings(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=0.2)
+    stats = PoolStats()
+    engine = create_engine(url, **engine_options(url, settings, stats))
+    track_pool(engine, stats)
+    set_sqlite_pragmas(engine, settings)
+
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode"))
+        assert journal_mode.scalar() == "wal"
+        status = pool_status(engine.pool, stats)
+        assert status["checked_out"] == 1
+
+        # Единственное соединение занято: второй запрос ждет и падает
+        errors = []
+
+        def checkout() -> None:
+            try:
+                engine.connect()
+            except PoolTimeoutError as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=checkout)
+        thread.start()
+        thread.join()
+        assert len(errors) == 1
+
+    status = pool_status(engine.pool, stats)
+    assert status["size"] == 1
+    assert status["checked_out"] == 0
+    assert status["connects"] == 1
+    assert status["waits"] == 1
+    assert status["timeouts"] == 1
+    assert status["wait_seconds"] >= 0.2
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "url, key",
+    [
+        ("postgresql://user@db/severstal", "options"),
+        ("postgresql+asyncpg://user@db/severstal", "server_settings"),
+    ],
+)
+def test_postgresql_statement_timeout(url: str, key: str) -> None:
+    settings = Settings(DB_STATEMENT_TIMEOUT_MS=5000)
+    options = engine_options(url, settings, PoolStats())
+    assert "5000" in str(options["connect_args"][key])
+    assert options["pool_size"] == settings.DB_POOL_SIZE
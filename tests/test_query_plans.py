@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import Select
+
+from app.repositories.coil import CoilRepository
+from app.schemas.coil import CoilFilter
+
+
+def _query_plan(
+    db_session: Session, query: Select, params: Dict[str, Any]
+) -> str:
+    # Запросы закэшированы с параметрами: значения подставляются в текст
+    compiled = query.params(params).compile(
+        bind=db_session.get_bind(), compile_kwargs={"literal_binds": True}
+    )
+    rows = db_session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled}"
+    )
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_statistics_query_uses_covering_index(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    plan = _query_plan(
+        db_session,
+        *repo._statistics_query(datetime(2025, 1, 1), datetime(2025, 2, 1)),
+    )
+    assert "COVERING INDEX ix_coils_added_at_period" in plan
+    assert "SCAN coils" not in plan
+
+
+def test_range_filters_use_indexes(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    cases = {
+        "ix_coils_weight": CoilFilter(weight_range=(100.0, 200.0)),
+        "ix_coils_length": CoilFilter(length_range=(10.0, 20.0)),
+        "ix_coils_added_at_period": CoilFilter(
+            added_at_range=(datetime(2025, 1, 1), datetime(2025, 2, 1))
+        ),
+        "ix_coils_removed_at_period": CoilFilter(
+            removed_at_range=(datetime(2025, 1, 1), datetime(2025, 2, 1))
+        ),
+    }
+    for index_name, filters in cases.items():
+        plan = _query_plan(db_session, *repo._keyset_query(filters, None))
+        assert f"INDEX {index_name}" in plan, plan
+
+
+def test_half_open_ranges_use_indexes(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    cases = {
+        "ix_coils_weight": CoilFilter(weight_range=(100.0, None)),
+        "ix_coils_length": CoilFilter(length_range=(None, 20.0)),
+        "ix_coils_added_at_period": CoilFilter(
+            added_at_range=(datetime(2025, 1, 1), None)
+        ),
+        "ix_coils_removed_at_period": CoilFilter(
+            removed_at_range=(None, datetime(2025, 2, 1)), order="desc"
+        ),
+    }
+    for index_name, filters in cases.items():
+        for query in (
+            repo._keyset_query(filters, None, limit=101),
+            repo._rows_query(filters, None, limit=101),
+        ):
+            plan = _query_plan(db_session, *query)
+            assert f"INDEX {index_name}" in plan, plan
+            assert "SCAN coils" not in plan, plan
+
+
+def test_in_stock_filter_uses_index(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    filters = CoilFilter(
+        in_stock=True, added_at_range=(datetime(2025, 1, 1), None)
+    )
+    plan = _query_plan(db_session, *repo._keyset_query(filters, None))
+    assert "USING INDEX" in plan, plan
+    assert "SCAN coils" not in plan, plan
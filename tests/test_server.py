@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from app import jobs, server
+from app.core import database as database_module
+from app.core.config import Settings
+from app.core.database import Database
+from app.main import _lifespan
+
+
+def _args(**overrides: object) -> argparse.Namespace:
+    args = server.build_parser(Settings()).parse_args([])
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+
+def test_default_workers() -> None:
+    assert server.default_workers(Settings(SERVER_WORKERS=3)) == 3
+    assert server.default_workers(Settings(SERVER_WORKERS=0)) >= 1
+
+
+def test_fast_loop_and_parser_when_available(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(server, "_available", lambda module: True)
+    options = server.uvicorn_options(_args(workers=2), Settings())
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["workers"] == 2
+
+    monkeypatch.setattr(server, "_available", lambda module: False)
+    options = server.uvicorn_options(_args(), Settings())
+    assert options["loop"] == "asyncio"
+    assert options["http"] == "h11"
+    assert options["limit_max_requests"] is None
+
+
+def test_gunicorn_command() -> None:
+    settings = Settings(SERVER_GRACEFUL_TIMEOUT=15, SERVER_MAX_REQUESTS=1000)
+    command = server.gunicorn_command(
+        _args(workers=4, port=9000, preload=True), settings
+    )
+    assert command[:2] == ["gunicorn", server.APP]
+    assert command[command.index("--workers") + 1] == "4"
+    assert command[command.index("--bind") + 1] == "0.0.0.0:9000"
+    assert command[command.index("--graceful-timeout") + 1] == "15"
+    assert command[command.index("--max-requests-jitter") + 1] == "100"
+    assert "--preload" in command
+
+
+def test_workers_count_passed_to_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("SERVER_WORKERS", "0")
+    commands: List[List[str]] = []
+
+    def execvp(file: str, command: List[str]) -> None:
+        commands.append(command)
+        raise SystemExit(0)
+
+    monkeypatch.setattr(server.os, "execvp", execvp)
+    with pytest.raises(SystemExit):
+        server.main(["--manager", "gunicorn", "--workers", "3"])
+    assert commands[0][commands[0].index("--workers") + 1] == "3"
+    assert os.environ["SERVER_WORKERS"] == "3"
+
+
+class _Database:
+    async def dispose(self) -> None:
+        pass
+
+
+@pytest.mark.parametrize("workers,started", [(1, 3), (4, 0)])
+def test_background_jobs_only_in_single_worker(
+    monkeypatch: pytest.MonkeyPatch, workers: int, started: int
+) -> None:
+    calls: List[float] = []
+
+    async def job(interval: float, settings: Settings) -> None:
+        calls.append(interval)
+
+    for name in (
+        "archive_periodically",
+        "prune_events_periodically",
+        "prune_idempotency_keys_periodically",
+    ):
+        monkeypatch.setattr(jobs, name, job)
+    monkeypatch.setattr(database_module, "get_database", _Database)
+    settings = Settings(SERVER_WORKERS=workers, ARCHIVE_INTERVAL_SECONDS=60)
+
+    async def run() -> None:
+        lifespan = _lifespan(settings)
+        async with lifespan(None):  # type: ignore[arg-type]
+            # Задачи начинают выполняться на первой точке ожидания
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert len(calls) == started
+
+
+def test_engine_created_on_first_use(tmp_path: Path) -> None:
+    url = f"sqlite:///{tmp_path / 'coils.db'}"
+    database = Database(Settings(DATABASE_URL=url))
+    assert database._engine is None
+
+    engine = database.engine
+    assert database.engine is engine
+    assert database.session_factory.kw["bind"] is engine
+    database.engine.dispose()
+
+
+def test_engine_recreated_after_fork(tmp_path: Path) -> None:
+    url = f"sqlite:///{tmp_path / 'coils.db'}"
+    database = Database(Settings(DATABASE_URL=url))
+    inherited = database.engine
+
+    # Так выглядит объект в дочернем процессе после fork
+    database._pid = os.getpid() + 1
+
+    assert database.engine is not inherited
+    assert database.session_factory.kw["bind"] is database.engine
+    database.engine.dispose()
+    inherited.dispose()
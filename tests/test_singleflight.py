@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.metrics import get_registry
+from app.core.singleflight import SingleFlight
+from app.repositories.coil import AsyncCoilRepository, CoilRepository
+
+
+def _counter(name: str, call: str) -> int:
+    prefix = f'{name}{{call="{call}"}} '
+    for line in get_registry().render().splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix) :])
+    return 0
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight = SingleFlight("test-shared")
+    calls: List[int] = []
+
+    async def compute() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def scenario() -> List[int]:
+        return await asyncio.gather(
+            *(flight.do("key", compute) for _ in range(10))
+        )
+
+    assert asyncio.run(scenario()) == [42] * 10
+    assert len(calls) == 1
+    assert flight.in_flight == 0
+    assert _counter("singleflight_executions_total", "test-shared") == 1
+    assert _counter("singleflight_coalesced_total", "test-shared") == 9
+
+
+def test_error_is_shared_and_not_cached() -> None:
+    flight = SingleFlight("test-error")
+    calls: List[int] = []
+
+    async def fail() -> None:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("ошибка")
+
+    async def scenario() -> List[Any]:
+        return await asyncio.gather(
+            *(flight.do("key", fail) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 1
+    # Ошибка не запоминается: следующий запрос вычисляет заново
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_followers_recompute_when_leader_cancelled() -> None:
+    flight = SingleFlight("test-cancel")
+    calls: List[int] = []
+
+    async def compute() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scenario() -> int:
+        leader = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    # Ожидавший запрос не получает чужую отмену, а считает сам
+    assert asyncio.run(scenario()) == 2
+
+
+def test_statistics_coalesced_by_normalised_period(
+    db_session: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    repo = CoilRepository(db_session)
+    for weight in (100.0, 200.0, 300.0):
+        repo.create(length=10.0, weight=weight)
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    end = start + timedelta(days=2)
+    # Тот же период, записанный в другом часовом поясе
+    moscow = timezone(timedelta(hours=3))
+    periods = [
+        (start, end),
+        (start.astimezone(moscow), end.astimezone(moscow)),
+    ]
+    computed: List[int] = []
+    compute = CoilRepository._compute_statistics
+
+    def counting(self: CoilRepository, *args: Any) -> Any:
+        computed.append(1)
+        return compute(self, *args)
+
+    async def scenario() -> List[Any]:
+        return await asyncio.gather(
+            *(
+                AsyncCoilRepository(db_session).get_statistics(*period)
+                for period in periods * 4
+            )
+        )
+
+    before = _counter("singleflight_coalesced_total", "statistics")
+    monkeypatch.setattr(CoilRepository, "_compute_statistics", counting)
+    results = asyncio.run(scenario())
+
+    assert len(computed) == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["added_count"] == 3
+    assert _counter("singleflight_coalesced_total", "statistics") == (
+        before + 7
+    )
@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+
+from app.core.cache import NullCache, cache_stats
+from app.core.config import Settings, get_settings
+from app.core.database import configure_database, get_database
+from app.domain.models import Base, CoilEvent
+from app.main import create_app
+from app.repositories.coil import CoilRepository
+from benchmarks.startup import SCENARIOS, import_times
+
+# Тяжелые модули, которые не нужны до первого запроса или выгрузки
+HEAVY = ("fastapi", "pyarrow", "numpy", "sqlalchemy.ext.asyncio")
+
+
+def _loaded(times: Dict[str, int], modules: Tuple[str, ...]) -> List[str]:
+    return [module for module in modules if module in times]
+
+
+def test_cli_and_module_import_are_light() -> None:
+    for scenario in ("cli", "main"):
+        times = import_times(SCENARIOS[scenario])
+        assert not _loaded(times, HEAVY), scenario
+        assert "app.repositories.coil" not in times
+        assert "app.api.endpoints.coils" not in times
+
+
+def test_create_app_defers_engine_and_optional_packages() -> None:
+    statement = (
+        SCENARIOS["app"] + "\n"
+        "from app.core.database import get_database\n"
+        "assert get_database()._engine is None\n"
+    )
+    times = import_times(statement)
+    assert "app.api.endpoints.coils" in times
+    assert not _loaded(times, ("pyarrow", "numpy"))
+
+
+def _coil_hits() -> int:
+    return int(cache_stats().get("coils", {}).get("hits", 0))
+
+
+def test_create_app_uses_given_settings(tmp_path: Path) -> None:
+    url = f"sqlite:///{tmp_path / 'coils.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    settings = Settings(
+        DATABASE_URL=url,
+        METRICS_ENABLED=False,
+        PAGE_SIZE_MAX=5,
+        CHANGE_FEED_ENABLED=False,
+        CACHE_ENABLED=False,
+    )
+    try:
+        app = create_app(settings)
+        assert app.state.settings is settings
+        assert get_database().settings is settings
+        assert "/api/v1/coils/" in app.openapi()["paths"]
+        with TestClient(app) as client:
+            assert client.get("/metrics").status_code == 404
+            coils = "/api/v1/coils/"
+            assert client.get(coils, params={"limit": 100}).status_code == 422
+            assert client.get(coils, params={"limit": 5}).status_code == 200
+
+            hits = _coil_hits()
+            coil = client.post(coils, json={"length": 1.0, "weight": 1.0})
+            for _ in range(2):
+                client.get(f"{coils}{coil.json()['id']}")
+            assert _coil_hits() == hits
+
+            assert client.get(f"{coils}events").status_code == 404
+        with get_database().session_factory() as session:
+            assert session.scalar(select(func.count(CoilEvent.id))) == 0
+            assert isinstance(CoilRepository(session).coil_cache, NullCache)
+        get_database().engine.dispose()
+    finally:
+        configure_database(get_settings())
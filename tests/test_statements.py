@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.repositories.coil import CoilRepository
+from app.repositories.statements import (
+    filter_params,
+    filter_shape,
+    listing_query,
+    statistics_query,
+)
+from app.schemas.coil import CoilFilter
+
+
+def test_filter_shape_ignores_values() -> None:
+    narrow = CoilFilter(weight_range=(100.0, None), in_stock=True)
+    wide = CoilFilter(weight_range=(5.0, None), in_stock=True)
+
+    assert filter_shape(narrow) == filter_shape(wide)
+    assert filter_shape(narrow) == ("weight_min", "in_stock")
+    assert filter_params(narrow) == {"weight_min": 100.0}
+    assert filter_shape(CoilFilter(weight_range=(None, 5.0))) != (
+        filter_shape(narrow)
+    )
+    assert filter_shape(None) == ()
+
+
+def test_cached_statements_take_values_per_call(db_session: Session) -> None:
+    repo = CoilRepository(db_session)
+    ids = [repo.create(length=10.0, weight=weight).id for weight in (1, 2, 3)]
+    listing_query.cache_clear()
+
+    # Один запрос из кэша, значения границ у каждого вызова свои
+    for low, expected in ((2.0, ids[1:]), (3.0, ids[2:]), (9.0, [])):
+        coils, _ = repo.get_page(CoilFilter(weight_range=(low, None)))
+        assert [coil.id for coil in coils] == expected
+    assert listing_query.cache_info().misses == 1
+    assert listing_query.cache_info().hits == 2
+
+    assert repo.get_by_id(ids[0]).weight == 1
+    assert repo.get_by_id(ids[2]).weight == 3
+
+    statistics_query.cache_clear()
+    now = datetime.now(timezone.utc)
+    day_ago = now - timedelta(days=1)
+    before = repo.get_statistics(day_ago - timedelta(hours=1), day_ago)
+    during = repo.get_statistics(now - timedelta(hours=1), now)
+    assert before["added_count"] == 0
+    assert during["added_count"] == 3
+    assert statistics_query.cache_info().misses == 1
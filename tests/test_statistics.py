@@ -0,0 +1,320 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.domain.models import Coil
+from app.repositories.coil import CoilRepository
+
+
+def _add_coil(
+    db_session: Session,
+    length: float,
+    weight: float,
+    added_at: datetime,
+    removed_at: datetime | None = None,
+) -> None:
+    db_session.add(
+        Coil(
+            length=length,
+            weight=weight,
+            added_at=added_at,
+            removed_at=removed_at,
+        )
+    )
+    db_session.commit()
+
+
+def test_statistics_empty_period(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/api/v1/coils/statistics/",
+        json={
+            "start_date": "2020-01-01T00:00:00",
+            "end_date": "2020-01-31T00:00:00",
+        },
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["added_count"] == 0
+    assert response_json["total_weight"] == 0
+    assert response_json["min_storage_time"] is None
+
+
+def test_statistics_aggregates(
+    test_client: TestClient, db_session: Session
+) -> None:
+    # На складе до периода и удален внутри периода
+    _add_coil(
+        db_session,
+        10.0,
+        100.0,
+        datetime(2024, 12, 20),
+        datetime(2025, 1, 10),
+    )
+    # Добавлен в периоде и все еще на складе
+    _add_coil(db_session, 20.0, 300.0, datetime(2025, 1, 5))
+    # Добавлен и удален внутри периода
+    _add_coil(
+        db_session,
+        30.0,
+        200.0,
+        datetime(2025, 1, 7),
+        datetime(2025, 1, 7, 1),
+    )
+    # Удален до начала периода - не учитывается
+    _add_coil(
+        db_session,
+        99.0,
+        999.0,
+        datetime(2024, 11, 1),
+        datetime(2024, 12, 1),
+    )
+
+    response = test_client.post(
+        "/api/v1/coils/statistics/",
+        json={
+            "start_date": "2025-01-01T00:00:00",
+            "end_date": "2025-01-31T00:00:00",
+        },
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["added_count"] == 2
+    assert response_json["removed_count"] == 2
+    assert response_json["avg_length"] == 20.0
+    assert response_json["avg_weight"] == 200.0
+    assert response_json["min_length"] == 10.0
+    assert response_json["max_length"] == 30.0
+    assert response_json["min_weight"] == 100.0
+    assert response_json["max_weight"] == 300.0
+    assert response_json["total_weight"] == 600.0
+    assert response_json["min_storage_time"] == "3600.0"
+    assert response_json["max_storage_time"] == str(21 * 86400.0)
+
+
+def test_statistics_period_with_timezone(db_session: Session) -> None:
+    # 22:00 UTC - это 01:00 следующих суток по Москве
+    _add_coil(db_session, 10.0, 100.0, datetime(2025, 1, 1, 22))
+    moscow = timezone(timedelta(hours=3))
+
+    statistics = CoilRepository(db_session).get_statistics(
+        datetime(2025, 1, 2, tzinfo=moscow),
+        datetime(2025, 1, 2, 2, tzinfo=moscow),
+    )
+    assert statistics["added_count"] == 1
+
+
+def test_statistics_series_by_day(
+    test_client: TestClient, db_session: Session
+) -> None:
+    # На складе до периода, удален во второй день
+    _add_coil(
+        db_session,
+        10.0,
+        100.0,
+        datetime(2024, 12, 20),
+        datetime(2025, 1, 2, 12),
+    )
+    # Добавлены в первый день, один удален в третий
+    _add_coil(db_session, 20.0, 300.0, datetime(2025, 1, 1, 8))
+    _add_coil(
+        db_session,
+        30.0,
+        200.0,
+        datetime(2025, 1, 1, 9),
+        datetime(2025, 1, 3, 1),
+    )
+    # Добавлен после периода - не учитывается
+    _add_coil(db_session, 40.0, 999.0, datetime(2025, 1, 5))
+
+    response = test_client.post(
+        "/api/v1/coils/statistics/series",
+        json={
+            "start_date": "2025-01-01T00:00:00",
+            "end_date": "2025-01-04T00:00:00",
+            "bucket": "day",
+        },
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["bucket"] == "day"
+    series = response_json["series"]
+    assert [point["start"] for point in series] == [
+        "2025-01-01T00:00:00",
+        "2025-01-02T00:00:00",
+        "2025-01-03T00:00:00",
+    ]
+    assert [point["added_count"] for point in series] == [2, 0, 0]
+    assert [point["added_weight"] for point in series] == [500.0, 0.0, 0.0]
+    assert [point["removed_count"] for point in series] == [0, 1, 1]
+    assert [point["removed_weight"] for point in series] == [0.0, 100.0, 200.0]
+    assert [point["in_stock_count"] for point in series] == [3, 2, 1]
+    assert [point["in_stock_weight"] for point in series] == [
+        600.0,
+        500.0,
+        300.0,
+    ]
+
+
+def test_statistics_series_partial_week(
+    test_client: TestClient, db_session: Session
+) -> None:
+    _add_coil(db_session, 10.0, 100.0, datetime(2025, 1, 8, 10))
+
+    response = test_client.post(
+        "/api/v1/coils/statistics/series",
+        json={
+            # Среда - вторник: неделя начинается с понедельника 6 января
+            "start_date": "2025-01-08T00:00:00",
+            "end_date": "2025-01-14T00:00:00",
+            "bucket": "week",
+        },
+    )
+    assert response.status_code == 200
+    series = response.json()["series"]
+    assert [(point["start"], point["end"]) for point in series] == [
+        ("2025-01-08T00:00:00", "2025-01-13T00:00:00"),
+        ("2025-01-13T00:00:00", "2025-01-14T00:00:00"),
+    ]
+    assert [point["added_count"] for point in series] == [1, 0]
+    assert [point["in_stock_count"] for point in series] == [1, 1]
+
+
+def test_statistics_series_validation(test_client: TestClient) -> None:
+    url = "/api/v1/coils/statistics/series"
+    response = test_client.post(
+        url,
+        json={
+            "start_date": "2020-01-01T00:00:00",
+            "end_date": "2025-01-01T00:00:00",
+            "bucket": "hour",
+        },
+    )
+    assert response.status_code == 400
+
+    response = test_client.post(
+        url,
+        json={
+            "start_date": "2025-01-01T00:00:00",
+            "end_date": "2025-01-02T00:00:00",
+            "bucket": "month",
+        },
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "url", ["/api/v1/coils/statistics/", "/api/v1/coils/statistics/series"]
+)
+def test_statistics_mixed_timezone_bounds(
+    test_client: TestClient, db_session: Session, url: str
+) -> None:
+    _add_coil(db_session, 10.0, 100.0, datetime(2025, 1, 1, 10))
+
+    # Начало с часовым поясом (7:00 UTC), конец - без него, в UTC
+    response = test_client.post(
+        url,
+        json={
+            "start_date": "2025-01-01T10:00:00+03:00",
+            "end_date": "2025-01-02T00:00:00",
+        },
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    if "series" in response_json:
+        assert response_json["series"][0]["start"] == "2025-01-01T07:00:00"
+        assert response_json["series"][0]["added_count"] == 1
+    else:
+        assert response_json["added_count"] == 1
+
+    # В UTC конец раньше начала
+    response = test_client.post(
+        url,
+        json={
+            "start_date": "2025-01-01T10:00:00-03:00",
+            "end_date": "2025-01-01T12:00:00",
+        },
+    )
+    assert response.status_code == 400
+
+
+def test_inventory_mixed_timezone_bounds(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/api/v1/coils/inventory",
+        json={
+            "start_date": "2025-01-01T00:00:00+03:00",
+            "end_date": "2025-01-03",
+        },
+    )
+    assert response.status_code == 200
+    assert len(response.json()["days"]) == 3
+
+
+@pytest.mark.parametrize("sql_window", [True, False], ids=["sql", "numpy"])
+def test_inventory_by_day(
+    test_client: TestClient,
+    db_session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    sql_window: bool,
+) -> None:
+    monkeypatch.setattr(get_settings(), "INVENTORY_SQL_WINDOW", sql_window)
+    # На складе до периода, удален во второй день
+    _add_coil(
+        db_session,
+        10.0,
+        100.0,
+        datetime(2024, 12, 20),
+        datetime(2025, 1, 2, 12),
+    )
+    _add_coil(db_session, 20.0, 300.0, datetime(2025, 1, 1, 8))
+    # Добавлен и удален в третий день - в остаток на конец дня не входит
+    _add_coil(
+        db_session,
+        30.0,
+        900.0,
+        datetime(2025, 1, 3, 1),
+        datetime(2025, 1, 3, 2),
+    )
+    _add_coil(db_session, 40.0, 50.0, datetime(2025, 1, 4, 23))
+
+    response = test_client.post(
+        "/api/v1/coils/inventory",
+        json={"start_date": "2025-01-01", "end_date": "2025-01-05"},
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    days = response_json["days"]
+    assert [day["day"] for day in days] == [
+        "2025-01-01",
+        "2025-01-02",
+        "2025-01-03",
+        "2025-01-04",
+        "2025-01-05",
+    ]
+    assert [day["count"] for day in days] == [2, 1, 1, 2, 2]
+    assert [day["total_weight"] for day in days] == [
+        400.0,
+        300.0,
+        300.0,
+        350.0,
+        350.0,
+    ]
+    assert [day["total_length"] for day in days] == [
+        30.0,
+        20.0,
+        20.0,
+        60.0,
+        60.0,
+    ]
+    assert response_json["max_day"]["day"] == "2025-01-01"
+    assert response_json["min_day"]["day"] == "2025-01-02"
+
+
+def test_inventory_validation(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/api/v1/coils/inventory",
+        json={"start_date": "2025-01-05", "end_date": "2025-01-01"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,167 @@
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import NullCache
+from app.domain.models import Base, Coil
+from app.repositories.coil import CoilRepository, VersionConflictError
+
+
+def _create_coil(test_client: TestClient, payload: Dict[str, float]) -> int:
+    return test_client.post("/api/v1/coils/", json=payload).json()["id"]
+
+
+def test_get_coil_returns_etag(
+    test_client: TestClient, coil_payload: Dict[str, float]
+) -> None:
+    coil_id = _create_coil(test_client, coil_payload)
+
+    response = test_client.get(f"/api/v1/coils/{coil_id}")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1"'
+    assert response.json()["Coil"]["version"] == 1
+
+
+def test_update_with_if_match(
+    test_client: TestClient,
+    coil_payload: Dict[str, float],
+    coil_payload_updated: Dict[str, float],
+) -> None:
+    coil_id = _create_coil(test_client, coil_payload)
+    url = f"/api/v1/coils/{coil_id}"
+
+    response = test_client.patch(
+        url, json=coil_payload_updated, headers={"If-Match": '"1"'}
+    )
+    assert response.status_code == 202
+    assert response.headers["ETag"] == '"2"'
+    response_json = response.json()
+    assert response_json["Coil"]["version"] == 2
+    assert response_json["Coil"]["length"] == coil_payload_updated["length"]
+    assert response_json["Coil"]["updated_at"] is not None
+
+    # Второй оператор правит по устаревшей версии
+    response = test_client.patch(
+        url, json={"weight": 1.0}, headers={"If-Match": '"1"'}
+    )
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"2"'
+    coil = test_client.get(url).json()["Coil"]
+    assert coil["weight"] == coil_payload_updated["weight"]
+
+    # Без If-Match изменение безусловное, версия все равно растет
+    response = test_client.patch(url, json={"weight": 1.0})
+    assert response.status_code == 202
+    assert response.headers["ETag"] == '"3"'
+
+    response = test_client.patch(
+        url, json={"weight": 2.0}, headers={"If-Match": '"2", "3"'}
+    )
+    assert response.status_code == 202
+    assert response.headers["ETag"] == '"4"'
+
+
+def test_update_with_weak_if_match(
+    test_client: TestClient, coil_payload: Dict[str, float]
+) -> None:
+    coil_id = _create_coil(test_client, coil_payload)
+    url = f"/api/v1/coils/{coil_id}"
+
+    # Слабый тег не проходит строгое сравнение, даже если версия та же
+    for header in ('W/"1"', 'W/"1", W/"2"', '"W/1"'):
+        response = test_client.patch(
+            url, json={"weight": 1.0}, headers={"If-Match": header}
+        )
+        assert response.status_code == 412
+    assert test_client.get(url).headers["ETag"] == '"1"'
+
+    response = test_client.patch(
+        url, json={"weight": 1.0}, headers={"If-Match": 'W/"1", "1"'}
+    )
+    assert response.status_code == 202
+
+
+def test_update_with_malformed_if_match(
+    test_client: TestClient, coil_payload: Dict[str, float]
+) -> None:
+    coil_id = _create_coil(test_client, coil_payload)
+    response = test_client.patch(
+        f"/api/v1/coils/{coil_id}",
+        json={"weight": 1.0},
+        headers={"If-Match": "garbage"},
+    )
+    assert response.status_code == 412
+
+
+def test_update_missing_coil_with_if_match(test_client: TestClient) -> None:
+    response = test_client.patch(
+        "/api/v1/coils/999999",
+        json={"weight": 1.0},
+        headers={"If-Match": '"1"'},
+    )
+    assert response.status_code == 404
+
+
+def test_remove_with_if_match(
+    test_client: TestClient, coil_payload: Dict[str, float]
+) -> None:
+    coil_id = _create_coil(test_client, coil_payload)
+    url = f"/api/v1/coils/{coil_id}"
+    test_client.patch(url, json={"weight": 1.0})
+
+    response = test_client.delete(url, headers={"If-Match": '"1"'})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"2"'
+    assert test_client.get(url).json()["Coil"]["removed_at"] is None
+
+    response = test_client.delete(url, headers={"If-Match": '"2"'})
+    assert response.status_code == 202
+    assert response.headers["ETag"] == '"3"'
+
+    response = test_client.delete(url, headers={"If-Match": '"3"'})
+    assert response.status_code == 400
+
+
+def test_concurrent_updates_with_same_version(tmp_path: Path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'coils.db'}",
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        coil_id = CoilRepository(session).create(length=1.0, weight=1.0).id
+
+    results: List[str] = []
+    barrier = threading.Barrier(8)
+
+    def update(weight: float) -> None:
+        with Session(engine) as session:
+            repo = CoilRepository(
+                session, coil_cache=NullCache(), statistics_cache=NullCache()
+            )
+            barrier.wait()
+            try:
+                repo.update(coil_id, weight=weight, if_match=[1])
+                results.append("updated")
+            except VersionConflictError:
+                results.append("conflict")
+
+    threads = [
+        threading.Thread(target=update, args=(float(i + 2),))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ["conflict"] * 7 + ["updated"]
+    with Session(engine) as session:
+        coil = session.get(Coil, coil_id)
+        assert coil is not None
+        assert coil.version == 2
+    engine.dispose()